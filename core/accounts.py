@@ -0,0 +1,322 @@
+"""
+Multiple wallets in one runner.
+
+Every configured account gets its own auth session (`TradingClient`),
+`RiskEngine`, `PositionBook`, order queue and `MarketManager`, while all of
+them share the one market-data pipeline: the feed publishes to the bus once
+and each account subscribes to it. Accounts are supervised independently —
+a failed login, REST call or strategy crash restarts that account with
+backoff and never touches the others. A restarted account first cancels
+the orders its previous session left live and adopts the ones it can't.
+
+Config (`config/settings.yaml`):
+
+    accounts:
+      - name: main
+        key_env: PRIVATE_KEY          # env var holding the key; keys never go in YAML
+      - name: alt
+        key_env: PRIVATE_KEY_ALT
+        risk: {max_wallet_exposure: 5000}
+        strategy: {markets: [0xabc...], gamma: 0.1, k: 100, base_size: 10}
+        order_builder: mypkg.orders:build_order   # quote -> signed-order struct
+
+Without an `accounts:` list a single "default" account uses PRIVATE_KEY.
+`strategy` runs a `KernelStrategy` on the listed markets. Orders are only
+sent when the account has an `order_builder` (or `start_accounts` got a
+`build_order`); otherwise its manager runs dry and the account only tracks
+positions.
+"""
+
+import asyncio
+import importlib
+import logging
+import os
+import time
+
+from core.event_bus import bus, PRICES
+from core.market_manager_async import MarketManager, EVENT_QUEUE_SIZE
+from core.position_book import PositionBook
+from core.risk import RiskEngine, RiskLimits
+
+ORDER_BATCH = int(os.getenv("ACCOUNT_ORDER_BATCH", "50"))
+RESTART_BACKOFF = (1, 2, 5, 15, 60)  # seconds between restarts of a failed account
+
+
+class AccountConfig:
+    __slots__ = ("name", "key_env", "risk", "enabled", "strategy", "order_builder")
+
+    def __init__(self, name, key_env="PRIVATE_KEY", risk=None, enabled=True, strategy=None, order_builder=None):
+        self.name = name
+        self.key_env = key_env
+        self.risk = risk or {}
+        self.enabled = enabled
+        self.strategy = strategy  # KernelStrategy settings: markets + QuoteParams fields
+        self.order_builder = order_builder  # "module:function" building an order struct from a Quote
+
+    @property
+    def private_key(self):
+        return os.getenv(self.key_env)
+
+
+def load_accounts(cfg):
+    """AccountConfig list from cfg["accounts"]; account `risk` overrides the global `risk` section."""
+    base_risk = cfg.get("risk") or {}
+    entries = cfg.get("accounts") or [{"name": "default", "key_env": "PRIVATE_KEY"}]
+    accounts, seen = [], set()
+    for i, a in enumerate(entries):
+        name = a.get("name") or f"account{i + 1}"
+        if name in seen:
+            raise ValueError(f"duplicate account name in config: {name}")
+        seen.add(name)
+        accounts.append(AccountConfig(name, a.get("key_env", "PRIVATE_KEY"),
+                                      dict(base_risk, **(a.get("risk") or {})), a.get("enabled", True),
+                                      a.get("strategy"), a.get("order_builder")))
+    return accounts
+
+
+def load_order_builder(path):
+    """Resolve "package.module:function" to the callable."""
+    module, _, attr = path.partition(":")
+    if not attr:
+        raise ValueError(f"order_builder must look like 'module:function', got {path!r}")
+    return getattr(importlib.import_module(module), attr)
+
+
+def build_strategy(config):
+    """KernelStrategy for an account's `strategy` section, or None."""
+    scfg = dict(config.strategy or {})
+    markets = scfg.pop("markets", None)
+    if not markets:
+        return None
+    from core.models import market_catalog
+    from core.quoting import KernelStrategy, QuoteParams
+    expiration = {m: market_catalog.get(m).expiration_ts for m in markets if market_catalog.get(m) is not None}
+    return KernelStrategy(markets, QuoteParams(**scfg), name=f"{config.name}:kernel", expiration_ts=expiration)
+
+
+class OrderQueue:
+    """Per-account order path with the `TradingClient` async surface MarketManager uses.
+
+    Concurrent `submit_orders` calls are queued and coalesced by one worker
+    into batches of up to ORDER_BATCH, so an account never has more than one
+    batch in flight and a slow or failing account only backs up its own queue.
+    """
+
+    def __init__(self, client, batch=ORDER_BATCH):
+        self.client = client
+        self.batch = batch
+        self.queue = asyncio.Queue()
+        self.sent = 0
+        self.failed = 0
+
+    async def submit_orders(self, orders):
+        orders = list(orders)
+        if not orders:
+            return []
+        fut = asyncio.get_running_loop().create_future()
+        await self.queue.put(("submit", orders, fut))
+        return await fut
+
+    async def cancel_order(self, order_id):
+        fut = asyncio.get_running_loop().create_future()
+        await self.queue.put(("cancel", order_id, fut))
+        return await fut
+
+    async def run(self):
+        while True:
+            jobs = [await self.queue.get()]
+            while not self.queue.empty() and sum(len(j[1]) for j in jobs if j[0] == "submit") < self.batch:
+                jobs.append(self.queue.get_nowait())
+            # Cancels first: they free risk headroom for the new orders
+            for kind, order_id, fut in (j for j in jobs if j[0] == "cancel"):
+                try:
+                    result = await self.client.cancel_order(order_id)
+                except Exception as e:
+                    if not fut.done():  # the caller may have been cancelled meanwhile
+                        fut.set_exception(e)
+                else:
+                    if not fut.done():
+                        fut.set_result(result)
+            submits = [j for j in jobs if j[0] == "submit"]
+            if not submits:
+                continue
+            flat = [o for _, orders, _ in submits for o in orders]
+            try:
+                results = await self.client.submit_orders(flat)
+            except Exception as e:
+                results = [{"ok": False, "error": f"send: {type(e).__name__}: {e}"}] * len(flat)
+            self.sent += sum(1 for r in results if r and r["ok"])
+            self.failed += sum(1 for r in results if not r or not r["ok"])
+            start = 0
+            for _, orders, fut in submits:
+                if not fut.done():
+                    fut.set_result(results[start:start + len(orders)])
+                start += len(orders)
+
+
+class AccountRunner:
+    """One wallet: auth session, risk, positions, order queue and strategies."""
+
+    def __init__(self, config, positions_api=None, build_order=None, fallback_interval=5.0):
+        self.config = config
+        self.name = config.name
+        self.positions_api = positions_api  # shared LimitlessApiClient (REST positions by address)
+        self.build_order = build_order
+        self.fallback_interval = fallback_interval
+        self.risk = RiskEngine(RiskLimits.from_config(config.risk))
+        # Position changes are the fills of this account's open orders
+        self.book = PositionBook(on_change=self.risk.on_position_change, on_seed=self.risk.seed_positions)
+        self.client = None
+        self.orders = None
+        self.manager = MarketManager(None, build_order)
+        self.address = None
+        self.status = "starting"
+        self.error = None
+        self.restarts = 0
+        self._strategies = []
+
+    def register(self, strategy):
+        self._strategies.append(strategy)
+        return self.manager.register(strategy)
+
+    def _fetch_positions(self):
+        return self.positions_api.get_positions(self.address) if self.positions_api else []
+
+    async def _login(self):
+        from core.trading import TradingClient
+        key = self.config.private_key
+        if not key:
+            raise RuntimeError(f"{self.config.key_env} not set")
+        client = TradingClient(key, risk=self.risk)
+        await asyncio.to_thread(client.authenticate)
+        self.client = client
+        self.address = client.account.address
+        resting = await self._cancel_previous(client)
+        self.orders = OrderQueue(client)
+        self.manager = MarketManager(self.orders, self.build_order)
+        for s in self._strategies:
+            self.manager.register(s)
+            self.manager.live[s.name].update(resting.get(s.name, {}))
+
+    async def _cancel_previous(self, client):
+        """Cancel the orders the previous session left live; return the ones still resting
+        ({strategy name: {key: LiveOrder}}) for the new manager to adopt. Reservations of
+        orders that are neither adopted nor cancelled are released."""
+        from core.trading import OrderRejected
+        resting = {}
+        previous = [] if self.manager.dry_run else [
+            (name, key, o) for name, live in self.manager.live.items() for key, o in live.items()]
+        if previous:
+            results = await asyncio.gather(*(client.cancel_order(o.order_id) for _, _, o in previous),
+                                           return_exceptions=True)
+            for (name, key, o), res in zip(previous, results):
+                # A rejected cancel means the venue doesn't have it resting (filled / already gone)
+                if isinstance(res, Exception) and not isinstance(res, OrderRejected):
+                    resting.setdefault(name, {})[key] = o
+            logging.info(f"[LLMM] Account {self.name}: cancelled {len(previous) - sum(map(len, resting.values()))} "
+                         f"orders of the previous session, {sum(map(len, resting.values()))} still resting")
+        kept = {o.order_id for live in resting.values() for o in live.values()}
+        stale = [order_id for order_id in list(self.risk.orders) if order_id not in kept]
+        if stale:
+            logging.warning(f"[LLMM] Account {self.name}: releasing {len(stale)} risk reservations "
+                            f"of untracked orders from the previous session")
+            for order_id in stale:
+                self.risk.on_cancel(order_id)
+        return resting
+
+    async def _session(self):
+        """Everything one account runs; any exception ends the session and is restarted by `run`."""
+        self.status = "login"
+        await self._login()
+        if self.positions_api is not None:
+            self.book.seed(await asyncio.to_thread(self._fetch_positions))
+        # Shared feed: one subscription per account on the process-wide bus
+        prices = bus.subscribe(PRICES, name=f"{self.name}:positions", maxsize=EVENT_QUEUE_SIZE)
+        manager_feed = bus.subscribe(PRICES, name=f"{self.name}:market_manager", maxsize=EVENT_QUEUE_SIZE)
+
+        async def mark_positions():
+            async for _topic, event in prices:
+                market = event.get("market")
+                if self.book.holds(market):
+                    self.book.on_price(market, event.get("prices", event.get("price")))
+
+        tasks = [asyncio.create_task(self.orders.run(), name=f"{self.name}-orders"),
+                 asyncio.create_task(self.manager.run(manager_feed), name=f"{self.name}-manager"),
+                 asyncio.create_task(mark_positions(), name=f"{self.name}-marks")]
+        if self.positions_api is not None:
+            tasks.append(asyncio.create_task(self.book.run_fallback(self._fetch_positions, self.fallback_interval),
+                                             name=f"{self.name}-positions"))
+        self.status = "running"
+        self.error = None
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for t in done:
+                t.result()  # re-raise the failure
+        finally:
+            for t in tasks:
+                t.cancel()
+            prices.close()
+            manager_feed.close()
+
+    async def run(self):
+        """Run the account forever; failures restart it with backoff, isolated from other accounts."""
+        while True:
+            t0 = time.monotonic()
+            try:
+                await self._session()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.error = f"{type(e).__name__}: {e}"
+                logging.error(f"[LLMM] Account {self.name} failed: {self.error}")
+            if self.client is not None:
+                try:
+                    await self.client.close()
+                except Exception:
+                    pass
+                self.client = None
+            # A session that ran for a while resets the backoff
+            if time.monotonic() - t0 > RESTART_BACKOFF[-1]:
+                self.restarts = 0
+            delay = RESTART_BACKOFF[min(self.restarts, len(RESTART_BACKOFF) - 1)]
+            self.restarts += 1
+            self.status = f"restarting in {delay}s"
+            await asyncio.sleep(delay)
+
+    def summary(self):
+        return {
+            "name": self.name,
+            "address": self.address,
+            "status": self.status,
+            "error": self.error,
+            "positions": len(self.book.positions),
+            "exposure": self.book.total_exposure,
+            "pnl": self.book.total_pnl,
+            "orders_sent": self.orders.sent if self.orders else 0,
+            "orders_failed": self.orders.failed if self.orders else 0,
+            "live_orders": sum(len(v) for v in self.manager.live.values()),
+        }
+
+
+async def start_accounts(cfg, build_order=None):
+    """Create and start an AccountRunner per enabled account. Returns {name: AccountRunner}."""
+    configs = [a for a in load_accounts(cfg) if a.enabled]
+    positions_api = None
+    key = next((a.private_key for a in configs if a.private_key), None)
+    if key:
+        try:
+            from core.limitless_client import LimitlessApiClient
+            positions_api = await asyncio.to_thread(LimitlessApiClient, private_key=key)
+        except Exception as e:
+            logging.warning(f"[LLMM] Positions REST client unavailable ({e}); accounts run without REST positions")
+    runners = {}
+    for a in configs:
+        builder = load_order_builder(a.order_builder) if a.order_builder else build_order
+        runner = runners[a.name] = AccountRunner(a, positions_api, builder)
+        strategy = build_strategy(a)
+        if strategy is not None:
+            runner.register(strategy)
+        if builder is None:
+            logging.info(f"[LLMM] Account {a.name}: no order_builder, positions only (strategies run dry)")
+        asyncio.create_task(runner.run(), name=f"account-{a.name}")
+    return runners
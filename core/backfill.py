@@ -0,0 +1,287 @@
+"""
+Historical backfill into a partitioned Parquet store.
+
+Walks every category in `CATEGORY_MAP` concurrently through
+`LimitlessApiClient`, normalizes market and price rows, and writes them
+as Parquet files partitioned by category and date:
+
+    <root>/markets/category=<slug>/date=<YYYY-MM-DD>/part-*.parquet
+    <root>/prices/category=<slug>/date=<YYYY-MM-DD>/part-*.parquet
+
+Progress (last page per category, markets whose history is stored) is
+checkpointed in `<root>/_checkpoint.json` after every page, so an
+interrupted run resumes where it stopped. A page is marked pending before
+its part files are written; on resume the files of a pending page are
+deleted and the page is written again, so a crash never duplicates rows.
+Both tables have a fixed schema (`SCHEMAS`), so pages where a column is
+all null still read back with the same types. `query` / `price_summary` read
+the store back with predicate pushdown for research without the live API.
+"""
+
+import glob
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from core.categories import CATEGORY_MAP
+from core.models import parse_expiration, parse_prices
+from core.rate_limiter import SCAN
+
+# Optional: only needed to write/read the columnar store
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except Exception:
+    pa = pc = ds = pq = None
+
+BACKFILL_ROOT = os.getenv("BACKFILL_ROOT", os.path.join("data", "backfill"))
+PAGE_SIZE = 25
+PARTITIONS = ["category", "date"]
+
+if pa is not None:
+    SCHEMAS = {
+        "markets": pa.schema([
+            ("condition_id", pa.string()), ("id", pa.int64()), ("slug", pa.string()), ("title", pa.string()),
+            ("status", pa.string()), ("expiration_ts", pa.float64()), ("volume", pa.float64()),
+            ("yes", pa.float64()), ("no", pa.float64()), ("observed_at", pa.float64()),
+            ("category", pa.string()), ("date", pa.string()),
+        ]),
+        "prices": pa.schema([
+            ("condition_id", pa.string()), ("ts", pa.float64()), ("yes", pa.float64()), ("no", pa.float64()),
+            ("category", pa.string()), ("date", pa.string()),
+        ]),
+    }
+    PARTITIONING = ds.partitioning(pa.schema([("category", pa.string()), ("date", pa.string())]), flavor="hive")
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise RuntimeError("pyarrow not available; install pyarrow to use the backfill store")
+
+
+def _day(ts):
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%d") if ts else "unknown"
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def market_row(m, category, observed_at):
+    expiration_ts = parse_expiration(m)
+    prices = parse_prices(m.get("prices"))
+    return {
+        "condition_id": m.get("conditionId"),
+        "id": _int(m.get("id")),
+        "slug": m.get("slug"),
+        "title": m.get("title"),
+        "status": m.get("status"),
+        "expiration_ts": expiration_ts,
+        "volume": _float(m.get("volume")),
+        "yes": prices[0] if prices else None,
+        "no": prices[1] if len(prices) > 1 else None,
+        "observed_at": observed_at,
+        "category": category,
+        "date": _day(expiration_ts or observed_at),
+    }
+
+
+def price_rows(m, category, history, observed_at):
+    """Rows from a price-history payload, or one row from the market's current prices."""
+    cid = m.get("conditionId")
+    rows = []
+    for point in history or []:
+        if isinstance(point, dict):
+            ts = point.get("timestamp") or point.get("ts") or point.get("time")
+            price = point.get("price", point.get("value"))
+        elif isinstance(point, (list, tuple)) and len(point) >= 2:
+            ts, price = point[0], point[1]
+        else:
+            continue
+        ts, price = _float(ts), _float(price)
+        if ts is None or price is None:
+            continue
+        ts = ts / 1000.0 if ts > 1e12 else ts
+        rows.append({"condition_id": cid, "ts": ts, "yes": price, "no": 1.0 - price,
+                     "category": category, "date": _day(ts)})
+    if not rows:
+        prices = parse_prices(m.get("prices"))
+        if prices:
+            rows.append({"condition_id": cid, "ts": observed_at, "yes": prices[0],
+                         "no": prices[1] if len(prices) > 1 else 1.0 - prices[0],
+                         "category": category, "date": _day(observed_at)})
+    return rows
+
+
+class Checkpoint:
+    """{"categories": {slug: {"page": n, "done": bool, "pending": tag}}, "markets": ["<slug>:<conditionId>", ...]},
+    saved atomically. `pending` names the part files of a page being written."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+        self.categories = state.get("categories", {})
+        self.markets = set(state.get("markets", []))
+
+    def page_pending(self, category, tag):
+        with self._lock:
+            self.categories.setdefault(category, {"page": 0, "done": False})["pending"] = tag
+            self._save()
+
+    def page_done(self, category, page, done=False, cids=()):
+        """Advance `category` past `page` and record its markets in one save."""
+        with self._lock:
+            self.markets.update(cids)
+            self.categories[category] = {"page": page, "done": done}
+            self._save()
+
+    def _save(self):
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"categories": self.categories, "markets": sorted(self.markets)}, f)
+        os.replace(tmp, self.path)
+
+
+class Backfill:
+    def __init__(self, client, root=BACKFILL_ROOT, categories=None, workers=4, history=True, max_pages=None):
+        _require_pyarrow()
+        self.client = client
+        self.root = root
+        self.categories = categories or list(CATEGORY_MAP)
+        self.workers = workers
+        self.history = history
+        self.max_pages = max_pages
+        self.run_id = uuid.uuid4().hex[:8]
+        os.makedirs(root, exist_ok=True)
+        self.checkpoint = Checkpoint(os.path.join(root, "_checkpoint.json"))
+        self.counts = {"markets": 0, "prices": 0}
+        self._count_lock = threading.Lock()
+
+    def _write(self, table_name, rows, tag):
+        if not rows:
+            return
+        pq.write_to_dataset(
+            pa.Table.from_pylist(rows, schema=SCHEMAS[table_name]),
+            root_path=os.path.join(self.root, table_name),
+            partition_cols=PARTITIONS,
+            basename_template=f"part-{tag}-{{i}}.parquet",
+        )
+        with self._count_lock:
+            self.counts[table_name] += len(rows)
+
+    def _history(self, pool, markets, category, observed_at):
+        def fetch(m):
+            if not self.history or not m.get("slug"):
+                return m, []
+            try:
+                return m, self.client.get_price_history(m["slug"], priority=SCAN)
+            except Exception as e:
+                logging.warning(f"[LLMM] Price history for {m.get('slug')} failed: {e}")
+                return m, []
+        rows = []
+        for m, hist in pool.map(fetch, markets):
+            rows.extend(price_rows(m, category, hist, observed_at))
+        return rows
+
+    def _discard(self, category, tag):
+        """Delete the part files of a page an interrupted run didn't finish."""
+        for table in SCHEMAS:
+            for path in glob.glob(os.path.join(self.root, table, f"category={category}", "*", f"part-{tag}-*.parquet")):
+                os.remove(path)
+
+    def backfill_category(self, category, pool):
+        state = self.checkpoint.categories.get(category, {})
+        if state.get("pending"):
+            self._discard(category, state["pending"])
+        if state.get("done"):
+            print(f"[LLMM] Backfill {category}: already complete, skipping")
+            return
+        page = state.get("page", 0) + 1
+        cat_id = CATEGORY_MAP[category]
+        while self.max_pages is None or page <= self.max_pages:
+            markets = self.client.get_category_markets(cat_id, page=page, limit=PAGE_SIZE, priority=SCAN)
+            if not markets:
+                self.checkpoint.page_done(category, page - 1, done=True)
+                break
+            observed_at = time.time()
+            fresh = [m for m in markets if f"{category}:{m.get('conditionId')}" not in self.checkpoint.markets]
+            tag = f"{self.run_id}-p{page}"
+            self.checkpoint.page_pending(category, tag)
+            self._write("markets", [market_row(m, category, observed_at) for m in fresh], tag)
+            self._write("prices", self._history(pool, fresh, category, observed_at), tag)
+            self.checkpoint.page_done(category, page, done=len(markets) < PAGE_SIZE,
+                                      cids=[f"{category}:{m['conditionId']}" for m in fresh if m.get("conditionId")])
+            print(f"[LLMM] Backfill {category}: page {page} → {len(fresh)} new markets")
+            if len(markets) < PAGE_SIZE:
+                break
+            page += 1
+
+    def run(self):
+        t0 = time.perf_counter()
+        # Categories walk their pages in parallel; price-history calls share a second pool.
+        with ThreadPoolExecutor(max_workers=self.workers) as history_pool, \
+                ThreadPoolExecutor(max_workers=len(self.categories)) as category_pool:
+            futures = {c: category_pool.submit(self.backfill_category, c, history_pool) for c in self.categories}
+            for c, fut in futures.items():
+                try:
+                    fut.result()
+                except Exception as e:
+                    print(f"[LLMM] Backfill {c} stopped: {e} (resume picks up from the checkpoint)")
+        print(f"[LLMM] Backfill wrote {self.counts['markets']} market rows, {self.counts['prices']} price rows "
+              f"in {time.perf_counter() - t0:.1f}s → {self.root}")
+        return self.counts
+
+
+# --- research helpers --------------------------------------------------------
+
+def query(root=BACKFILL_ROOT, table="prices", categories=None, start=None, end=None, columns=None):
+    """Load rows from the store as a pyarrow Table, filtering partitions (category, date) and ts/expiry."""
+    _require_pyarrow()
+    dataset = ds.dataset(os.path.join(root, table), schema=SCHEMAS[table], format="parquet", partitioning=PARTITIONING)
+    expr = None
+
+    def both(a, b):
+        return b if a is None else a & b
+    if categories:
+        expr = both(expr, ds.field("category").isin(list(categories)))
+    if start is not None:
+        expr = both(expr, ds.field("date") >= _day(start))
+    if end is not None:
+        expr = both(expr, ds.field("date") <= _day(end))
+    tbl = dataset.to_table(columns=columns, filter=expr)
+    if table == "prices" and (start is not None or end is not None):
+        mask = pc.and_(pc.greater_equal(tbl["ts"], start if start is not None else float("-inf")),
+                       pc.less_equal(tbl["ts"], end if end is not None else float("inf")))
+        tbl = tbl.filter(mask)
+    return tbl
+
+
+def price_summary(root=BACKFILL_ROOT, **filters):
+    """Per-market count/mean/min/max/last of YES prices, computed columnar in one group_by."""
+    tbl = query(root, "prices", columns=["condition_id", "category", "ts", "yes"], **filters)
+    tbl = tbl.sort_by([("condition_id", "ascending"), ("ts", "ascending")])
+    return tbl.group_by(["condition_id", "category"], use_threads=False).aggregate([
+        ("yes", "count"), ("yes", "mean"), ("yes", "min"), ("yes", "max"), ("yes", "last"),
+    ])
@@ -0,0 +1,346 @@
+"""
+Deterministic backtester.
+
+Replays recorded market events through the same `Strategy` interface the
+live runtime (`run_market_manager`) hosts. Quotes are diffed against the
+simulated resting orders with `MarketManager.diff`, exactly as live, and
+filled against the recorded YES prices:
+
+    latency        seconds before a placement or cancel takes effect
+    queue_touches  price touches at our level before a resting order fills
+                   (0 = first touch fills, None = only trade-throughs fill)
+    fee            per-share fee charged on every fill
+
+A BUY fills at its price when the recorded price trades below it (or has
+touched it `queue_touches` times); a SELL when it trades above. Each fill
+is fed back to the strategy as a position event. Event time is simulated,
+so a run takes as long as the strategy code does, not as long as the
+recording; `run_grid` sweeps parameter sets on a process pool.
+
+Event sources:
+
+    JSONL      one price event per line: {"kind": "price", "market", "prices": [yes, no], "ts"}
+               (written by `record_events` from the live bus)
+    backfill   price rows from the Parquet store (`core.backfill.query`)
+"""
+
+import json
+import logging
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from core.event_bus import PRICES
+from core.market_manager_async import LiveOrder, MarketManager
+from core.models import parse_prices, parse_ts
+
+PRICE_EPS = 1e-9
+MARK_INTERVAL = 60.0
+
+
+# --- event sources ---------------------------------------------------------
+
+def load_events(path):
+    """Recorded events from a JSONL file, sorted by event time (`ts` normalized to epoch seconds)."""
+    events = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                e = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(e, dict):
+                ts = parse_ts(e.get("ts"))
+                if ts is not None:
+                    e["ts"] = ts
+                    events.append(e)
+    events.sort(key=lambda e: e["ts"])
+    return events
+
+
+def events_from_backfill(root=None, **filters):
+    """Price events from the backfill store (see `core.backfill.query` for filters)."""
+    from core.backfill import BACKFILL_ROOT, query
+    tbl = query(root or BACKFILL_ROOT, "prices", columns=["condition_id", "ts", "yes", "no"], **filters)
+    tbl = tbl.sort_by([("ts", "ascending")])
+    cols = tbl.to_pydict()
+    return [{"kind": "price", "market": m, "prices": [y, n], "ts": ts}
+            for m, ts, y, n in zip(cols["condition_id"], cols["ts"], cols["yes"], cols["no"])]
+
+
+async def record_events(subscription, path, flush_every=100):
+    """Append every price event from a bus subscription to `path` as JSONL with an epoch `ts`."""
+    n = 0
+    with open(path, "a") as f:
+        async for topic, event in subscription:
+            if topic != PRICES:
+                continue
+            row = {k: v for k, v in event.items() if k != "t_recv"}
+            ts = parse_ts(row.get("ts") or row.get("timestamp"))  # feeds send ms or ISO strings too
+            row["ts"] = time.time() if ts is None else ts
+            f.write(json.dumps(row, separators=(",", ":"), default=str) + "\n")
+            n += 1
+            if n % flush_every == 0:
+                f.flush()
+
+
+# --- simulation --------------------------------------------------------------
+
+class SimParams:
+    __slots__ = ("latency", "queue_touches", "fee", "mark_interval")
+
+    def __init__(self, latency=0.05, queue_touches=1, fee=0.0, mark_interval=MARK_INTERVAL):
+        self.latency = latency
+        self.queue_touches = queue_touches
+        self.fee = fee
+        self.mark_interval = mark_interval
+
+
+class SimOrder:
+    __slots__ = ("order_id", "quote", "active_at", "cancel_at", "remaining", "touches")
+
+    def __init__(self, order_id, quote, active_at):
+        self.order_id = order_id
+        self.quote = quote
+        self.active_at = active_at
+        self.cancel_at = None
+        self.remaining = quote.size
+        self.touches = 0
+
+
+class Fill:
+    __slots__ = ("ts", "market", "side", "price", "size")
+
+    def __init__(self, ts, market, side, price, size):
+        self.ts = ts
+        self.market = market
+        self.side = side
+        self.price = price
+        self.size = size
+
+
+class BacktestResult:
+    def __init__(self, name, params):
+        self.name = name
+        self.params = params
+        self.events = 0
+        self.fills = []
+        self.pnl_path = []  # (ts, mark-to-market PnL)
+        self.inventory_path = []  # (ts, market, inventory) after each fill
+        self.inventory = {}
+        self.cash = 0.0
+        self.wall_seconds = 0.0
+        self.span_seconds = 0.0
+
+    @property
+    def pnl(self):
+        return self.pnl_path[-1][1] if self.pnl_path else 0.0
+
+    @property
+    def max_drawdown(self):
+        peak, dd = -math.inf, 0.0
+        for _, v in self.pnl_path:
+            peak = max(peak, v)
+            dd = max(dd, peak - v)
+        return dd
+
+    @property
+    def speedup(self):
+        return self.span_seconds / self.wall_seconds if self.wall_seconds else None
+
+    def summary(self):
+        return {
+            "strategy": self.name,
+            "params": self.params,
+            "events": self.events,
+            "fills": len(self.fills),
+            "volume": sum(f.size for f in self.fills),
+            "pnl": round(self.pnl, 6),
+            "max_drawdown": round(self.max_drawdown, 6),
+            "max_inventory": max((abs(q) for _, _, q in self.inventory_path), default=0.0),
+            "final_inventory": {m: q for m, q in self.inventory.items() if q},
+            "wall_seconds": round(self.wall_seconds, 3),
+            "speedup": round(self.speedup, 1) if self.speedup else None,
+        }
+
+
+class Backtest:
+    """Replay `events` through one strategy. Deterministic: same events + params → same result."""
+
+    def __init__(self, strategy, sim=None, params=None):
+        self.strategy = strategy
+        self.sim = sim or SimParams()
+        self.manager = MarketManager()
+        self.manager.register(strategy)
+        self.live = self.manager.live[strategy.name]
+        self.orders = {}  # market -> {order_id: SimOrder}
+        self.mids = {}
+        self.avg = {}
+        self.result = BacktestResult(strategy.name, params)
+        self._next_id = 0
+        self._last_mark = None
+
+    # --- order handling (mirrors MarketManager.reconcile, minus the network) ---
+
+    def _apply(self, quotes, ts):
+        if quotes is None:
+            return
+        quotes = list(quotes)
+        if not quotes:
+            return
+        to_place, to_cancel = self.manager.diff(self.strategy, quotes)
+        for order in to_cancel:
+            self.live.pop(order.quote.key, None)
+            sim = self.orders.get(order.quote.market, {}).get(order.order_id)
+            if sim is not None and sim.cancel_at is None:
+                sim.cancel_at = ts + self.sim.latency
+        for q in to_place:
+            self._next_id += 1
+            oid = f"bt-{self._next_id}"
+            self.live[q.key] = LiveOrder(q, oid)
+            self.orders.setdefault(q.market, {})[oid] = SimOrder(oid, q, ts + self.sim.latency)
+
+    def _call(self, callback, *args, ts):
+        try:
+            quotes = callback(*args)
+        except Exception as e:
+            logging.error(f"[LLMM] {self.strategy.name}.{callback.__name__} failed: {e}")
+            return
+        self._apply(quotes, ts)
+
+    # --- fills ---------------------------------------------------------------
+
+    def _match(self, market, price, ts):
+        book = self.orders.get(market)
+        if not book:
+            return []
+        fills = []
+        for oid, o in list(book.items()):
+            if o.cancel_at is not None and o.cancel_at <= ts:
+                del book[oid]
+                continue
+            if o.active_at > ts:
+                continue
+            buy = o.quote.side.upper() in ("BUY", "BID")
+            through = price < o.quote.price - PRICE_EPS if buy else price > o.quote.price + PRICE_EPS
+            touch = abs(price - o.quote.price) <= PRICE_EPS
+            if touch:
+                o.touches += 1
+            queue = self.sim.queue_touches
+            if through or (touch and queue is not None and o.touches > queue):
+                fills.append(Fill(ts, market, "BUY" if buy else "SELL", o.quote.price, o.remaining))
+                del book[oid]
+                live = self.live.get(o.quote.key)
+                if live is not None and live.order_id == oid:
+                    del self.live[o.quote.key]
+        return fills
+
+    def _book_fill(self, fill):
+        r = self.result
+        qty = fill.size if fill.side == "BUY" else -fill.size
+        prev = r.inventory.get(fill.market, 0.0)
+        inv = prev + qty
+        r.cash -= qty * fill.price + self.sim.fee * fill.size
+        if inv == 0 or prev * inv < 0:
+            self.avg[fill.market] = fill.price if inv else 0.0
+        elif abs(inv) > abs(prev):
+            self.avg[fill.market] = (self.avg.get(fill.market, 0.0) * abs(prev) + fill.price * abs(qty)) / abs(inv)
+        r.inventory[fill.market] = inv
+        r.fills.append(fill)
+        r.inventory_path.append((fill.ts, fill.market, inv))
+        return {"kind": "position", "market": fill.market, "side": "YES", "size": inv,
+                "avgPrice": self.avg.get(fill.market, 0.0), "markPrice": self.mids.get(fill.market),
+                "fill": {"side": fill.side, "price": fill.price, "size": fill.size}, "ts": fill.ts}
+
+    def _mark(self, ts, force=False):
+        if not force and self._last_mark is not None and ts - self._last_mark < self.sim.mark_interval:
+            return
+        r = self.result
+        value = r.cash + sum(q * self.mids.get(m, 0.0) for m, q in r.inventory.items())
+        r.pnl_path.append((ts, value))
+        self._last_mark = ts
+
+    # --- replay --------------------------------------------------------------
+
+    def run(self, events):
+        s = self.strategy
+        r = self.result
+        t0 = time.perf_counter()
+        first = last = next_timer = None
+        for e in events:
+            ts = e["ts"]
+            if first is None:
+                first = ts
+                next_timer = ts + s.timer_interval if s.timer_interval else None
+            while next_timer is not None and next_timer <= ts:
+                self._call(s.on_timer, next_timer, ts=next_timer)
+                next_timer += s.timer_interval
+            last = ts
+            r.events += 1
+            # Recorded account positions are not replayed: inventory comes from simulated fills
+            if e.get("kind", "price") != "price":
+                continue
+            market = e.get("market")
+            prices = parse_prices(e.get("prices"))
+            if not market or not prices or prices[0] != prices[0]:
+                continue
+            self.mids[market] = prices[0]
+            fills = self._match(market, prices[0], ts)
+            for fill in fills:
+                self._call(s.on_position, self._book_fill(fill), ts=ts)
+            if s.wants(market):
+                self._call(s.on_price, market, e, ts=ts)
+            self._mark(ts, force=bool(fills))
+        if last is not None:
+            self._mark(last, force=True)
+        r.span_seconds = (last - first) if first is not None else 0.0
+        r.wall_seconds = time.perf_counter() - t0
+        return r
+
+
+# --- parameter sweeps --------------------------------------------------------
+
+def kernel_strategy(markets, name="kernel", sigma=None, **params):
+    """Factory for `run_grid`: a KernelStrategy over `markets` with QuoteParams(**params)."""
+    from core.quoting import KernelStrategy, QuoteParams
+    return KernelStrategy(markets, QuoteParams(**params), name=name, sigma=sigma)
+
+
+_worker_events = None
+
+
+def _init_worker(source):
+    global _worker_events
+    _worker_events = _resolve(source)
+
+
+def _resolve(source):
+    if isinstance(source, str):
+        return load_events(source)
+    return source
+
+
+def _run_one(factory, params, sim):
+    strategy = factory(**params)
+    return Backtest(strategy, SimParams(**sim), params).run(_worker_events).summary()
+
+
+def run_grid(factory, grid, source, sim=None, workers=None):
+    """Backtest `factory(**params)` for every params dict in `grid` on a process pool.
+
+    `factory` must be importable (module-level) so workers can unpickle it.
+    `source` is a JSONL path (each worker loads it once) or a list of events.
+    Returns one summary dict per params set, in grid order.
+    """
+    sim = sim or {}
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(grid) == 1:
+        _init_worker(source)
+        return [_run_one(factory, p, sim) for p in grid]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(source,)) as pool:
+        futures = [pool.submit(_run_one, factory, p, sim) for p in grid]
+        return [f.result() for f in futures]
@@ -0,0 +1,375 @@
+"""
+Real-time OHLCV bars.
+
+`BarAggregator` folds normalized price events (from the bus) into 1s, 1m
+and 5m bars per market. Each resolution is one `BarRing`: NumPy arrays of
+shape (markets, depth) holding start/open/high/low/close/volume/ticks, used
+as a ring per market. A tick is O(1) (a few scalar updates of the open bar)
+no matter how many markets are tracked.
+
+Bars are finalized on a clock: `on_clock(now)` (run every second by
+`run_clock`) rolls every market whose open bar has ended, in one vectorized
+pass, carrying the close forward into flat zero-volume bars when no tick
+arrived. `last(market, n)` / `last_many(markets, n)` read the newest `n`
+closed bars as arrays without copying per bar.
+
+Memory is proportional to the markets tracked: arrays start at
+INITIAL_MARKETS rows, double as markets appear and shrink again when
+`prune()` drops expired or idle markets (swap-removing their rows).
+
+Volume: `volume` on price events is the market's cumulative volume; bars get
+its increase. A per-trade `size` is added as is.
+"""
+
+import asyncio
+import logging
+import time
+
+import numpy as np
+
+from core.event_bus import PRICES
+from core.models import parse_prices
+
+RESOLUTIONS = (1, 60, 300)  # seconds
+DEFAULT_DEPTH = {1: 600, 60: 1440, 300: 576}  # 10 minutes, 1 day, 2 days
+FIELDS = ("start", "open", "high", "low", "close", "volume", "ticks")
+INITIAL_MARKETS = 16
+IDLE_AFTER = 3600.0  # seconds without a tick before a market's bars are dropped
+NAN = float("nan")
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class BarRing:
+    """Bars of one resolution for every market. Row = market, column = ring slot.
+
+    The open bar of each market lives in plain lists (cheapest scalar
+    updates per tick) and is written into its ring slot when it closes, or
+    on demand for reads that include it.
+    """
+
+    def __init__(self, resolution, depth, capacity=INITIAL_MARKETS):
+        self.resolution = resolution
+        self.depth = depth
+        self.start = np.zeros((capacity, depth), dtype=np.int64)  # bar start, epoch seconds
+        self.ohlc = np.full((4, capacity, depth), np.nan)
+        self.volume = np.zeros((capacity, depth))
+        self.ticks = np.zeros((capacity, depth), dtype=np.int64)
+        self.head = np.zeros(capacity, dtype=np.int64)  # slot of the open bar
+        self.closed = np.zeros(capacity, dtype=np.int64)  # closed bars available (≤ depth - 1)
+        # open bar per row; bucket -1 = no bar yet
+        self.bucket, self.o, self.h, self.l, self.c, self.v, self.n = [], [], [], [], [], [], []
+        self.late = 0
+
+    def add_row(self):
+        capacity = len(self.head)
+        if len(self.bucket) >= capacity:
+            self._resize(capacity * 2)
+        for lst, value in ((self.bucket, -1), (self.o, NAN), (self.h, NAN), (self.l, NAN),
+                           (self.c, NAN), (self.v, 0.0), (self.n, 0)):
+            lst.append(value)
+
+    def move_row(self, src, dst):
+        """Copy row `src` over row `dst` (swap-remove of `dst`; the caller pops the last row)."""
+        self.start[dst] = self.start[src]
+        self.ohlc[:, dst] = self.ohlc[:, src]
+        self.volume[dst] = self.volume[src]
+        self.ticks[dst] = self.ticks[src]
+        self.head[dst] = self.head[src]
+        self.closed[dst] = self.closed[src]
+        for lst in (self.bucket, self.o, self.h, self.l, self.c, self.v, self.n):
+            lst[dst] = lst[src]
+
+    def pop_row(self):
+        row = len(self.bucket) - 1
+        self.start[row] = 0
+        self.ohlc[:, row] = np.nan
+        self.volume[row] = 0.0
+        self.ticks[row] = 0
+        self.head[row] = self.closed[row] = 0
+        for lst in (self.bucket, self.o, self.h, self.l, self.c, self.v, self.n):
+            lst.pop()
+
+    def compact(self, minimum=INITIAL_MARKETS):
+        """Halve the arrays while at most a quarter of the rows are in use."""
+        capacity = len(self.head)
+        while capacity > minimum and len(self.bucket) <= capacity // 4:
+            capacity //= 2
+        if capacity < len(self.head):
+            self._resize(max(capacity, minimum))
+
+    def _resize(self, capacity):
+        n = len(self.head)
+
+        def fit(a, fill, axis=0):
+            if capacity <= n:
+                return a.take(range(capacity), axis=axis).copy()
+            shape = list(a.shape)
+            shape[axis] = capacity - n
+            return np.concatenate([a, np.full(shape, fill, dtype=a.dtype)], axis=axis)
+        self.start = fit(self.start, 0)
+        self.ohlc = fit(self.ohlc, np.nan, axis=1)
+        self.volume = fit(self.volume, 0.0)
+        self.ticks = fit(self.ticks, 0)
+        self.head = fit(self.head, 0)
+        self.closed = fit(self.closed, 0)
+
+    # --- writes --------------------------------------------------------------
+
+    def _store(self, row, slot):
+        """Write the open bar of `row` into ring slot `slot`."""
+        self.start[row, slot] = self.bucket[row] * self.resolution
+        self.ohlc[0, row, slot] = self.o[row]
+        self.ohlc[1, row, slot] = self.h[row]
+        self.ohlc[2, row, slot] = self.l[row]
+        self.ohlc[3, row, slot] = self.c[row]
+        self.volume[row, slot] = self.v[row]
+        self.ticks[row, slot] = self.n[row]
+
+    def _advance(self, row, bucket):
+        """Close the open bar of `row`, store flat bars for skipped buckets, open `bucket`."""
+        steps = min(bucket - self.bucket[row], self.depth)
+        slot = int(self.head[row])
+        self._store(row, slot)
+        close = self.c[row]
+        self.o[row] = self.h[row] = self.l[row] = close
+        self.v[row] = 0.0
+        self.n[row] = 0
+        for b in range(bucket - steps + 1, bucket):
+            slot = (slot + 1) % self.depth
+            self.bucket[row] = b
+            self._store(row, slot)
+        self.head[row] = (slot + 1) % self.depth
+        self.bucket[row] = bucket
+        self.closed[row] = min(self.closed[row] + steps, self.depth - 1)
+
+    def tick(self, row, ts, price, volume=0.0):
+        bucket = int(ts // self.resolution)
+        cur = self.bucket[row]
+        if bucket != cur:
+            if cur < 0:
+                self.bucket[row] = bucket
+                self.n[row] = 0
+            elif bucket > cur:
+                self._advance(row, bucket)
+            else:
+                self.late += 1  # older than the open bar: already finalized, drop
+                return
+        if self.n[row] == 0:
+            self.o[row] = self.h[row] = self.l[row] = price
+        elif price > self.h[row]:
+            self.h[row] = price
+        elif price < self.l[row]:
+            self.l[row] = price
+        self.c[row] = price
+        self.v[row] += volume
+        self.n[row] += 1
+
+    def roll(self, now):
+        """Finalize every open bar that ended before `now`. Vectorized over markets; returns rows rolled."""
+        bucket = int(now // self.resolution)
+        cur = np.array(self.bucket, dtype=np.int64)
+        rows = np.flatnonzero((cur >= 0) & (cur < bucket))
+        if not len(rows):
+            return rows
+        steps = np.minimum(bucket - cur[rows], self.depth)
+        head = self.head[rows]
+        close = np.array(self.c)[rows]
+        # close the open bars
+        self.start[rows, head] = cur[rows] * self.resolution
+        self.ohlc[:, rows, head] = np.array([self.o, self.h, self.l, self.c])[:, rows]
+        self.volume[rows, head] = np.array(self.v)[rows]
+        self.ticks[rows, head] = np.array(self.n)[rows]
+        # flat bars for buckets nobody ticked in (all but the new open one)
+        for k in range(1, int(steps.max())):
+            sel = steps > k
+            r = rows[sel]
+            head[sel] = (head[sel] + 1) % self.depth
+            h = head[sel]
+            self.start[r, h] = (bucket - steps[sel] + k) * self.resolution
+            self.ohlc[:, r, h] = close[sel]
+            self.volume[r, h] = 0.0
+            self.ticks[r, h] = 0
+        self.head[rows] = (head + 1) % self.depth
+        self.closed[rows] = np.minimum(self.closed[rows] + steps, self.depth - 1)
+        for row, c in zip(rows.tolist(), close.tolist()):
+            self.bucket[row] = bucket
+            self.o[row] = self.h[row] = self.l[row] = c
+            self.v[row] = 0.0
+            self.n[row] = 0
+        return rows
+
+    # --- reads ---------------------------------------------------------------
+
+    def window(self, rows, n, include_open=False):
+        """dict field → array of shape (len(rows), n), oldest first; bars that don't exist yet are NaN / 0."""
+        rows = np.asarray(rows, dtype=np.int64)
+        n = min(n, self.depth)
+        if include_open:
+            for row in rows.tolist():
+                if self.bucket[row] >= 0:
+                    self._store(row, int(self.head[row]))
+        end = self.head[rows] + (1 if include_open else 0)
+        slots = (end[:, None] - np.arange(n, 0, -1)) % self.depth
+        r = rows[:, None]
+        opened = np.array([self.bucket[row] >= 0 for row in rows.tolist()], dtype=bool)
+        available = np.where(opened, self.closed[rows] + (1 if include_open else 0), 0)
+        missing = np.arange(n, 0, -1)[None, :] > available[:, None]
+        out = {"start": np.where(missing, 0, self.start[r, slots])}
+        for i, f in enumerate(("open", "high", "low", "close")):
+            out[f] = np.where(missing, np.nan, self.ohlc[i][r, slots])
+        out["volume"] = np.where(missing, 0.0, self.volume[r, slots])
+        out["ticks"] = np.where(missing, 0, self.ticks[r, slots])
+        return out
+
+
+class BarAggregator:
+    def __init__(self, resolutions=RESOLUTIONS, depth=None, capacity=INITIAL_MARKETS, idle_after=IDLE_AFTER):
+        depth = depth or {}
+        self.capacity = capacity
+        self.rings = {res: BarRing(res, depth.get(res, DEFAULT_DEPTH.get(res, 600)), capacity)
+                      for res in resolutions}
+        self.index = {}  # market -> row
+        self.markets = []
+        self.cum_volume = {}
+        self.last_tick = {}  # market -> wall-clock time of its last tick
+        self.idle_after = idle_after
+
+    def _row(self, market):
+        row = self.index.get(market)
+        if row is None:
+            row = self.index[market] = len(self.markets)
+            self.markets.append(market)
+            for ring in self.rings.values():
+                ring.add_row()
+        return row
+
+    def on_tick(self, market, price, ts=None, volume=0.0):
+        ts = time.time() if ts is None else ts
+        row = self._row(market)
+        self.last_tick[market] = time.time()
+        for ring in self.rings.values():
+            ring.tick(row, ts, price, volume)
+
+    def on_event(self, event, ts=None):
+        """Fold one normalized price event ({"market", "prices" | "price", "volume"?, "size"?, "ts"?})."""
+        market = event.get("market")
+        if not market:
+            return False
+        prices = parse_prices(event.get("prices"))
+        price = prices[0] if prices else _float(event.get("price"))
+        if price is None or price != price:
+            return False
+        volume = _float(event.get("size")) or 0.0
+        cum = _float(event.get("volume"))
+        if cum is not None:
+            prev = self.cum_volume.get(market)
+            self.cum_volume[market] = cum
+            if prev is not None and cum > prev:
+                volume += cum - prev
+        self.on_tick(market, price, event.get("ts") or ts, volume)
+        return True
+
+    def on_clock(self, now=None):
+        now = time.time() if now is None else now
+        for ring in self.rings.values():
+            ring.roll(now)
+
+    # --- eviction ------------------------------------------------------------
+
+    def remove(self, market):
+        """Drop a market's bars; the last row moves into its slot."""
+        row = self.index.pop(market, None)
+        if row is None:
+            return False
+        last = len(self.markets) - 1
+        if row != last:
+            moved = self.markets[row] = self.markets[last]
+            self.index[moved] = row
+            for ring in self.rings.values():
+                ring.move_row(last, row)
+        self.markets.pop()
+        for ring in self.rings.values():
+            ring.pop_row()
+        self.cum_volume.pop(market, None)
+        self.last_tick.pop(market, None)
+        return True
+
+    def prune(self, now=None, idle_after=None, keep=None):
+        """Drop markets that expired (per the shared catalog) or had no tick for
+        `idle_after` seconds; then keep at most `keep`, most recently ticked first."""
+        from core.models import market_catalog
+        now = time.time() if now is None else now
+        idle_after = self.idle_after if idle_after is None else idle_after
+        drop = []
+        for market in self.markets:
+            m = market_catalog.get(market)
+            if (m is not None and m.expiration_ts is not None and m.expiration_ts <= now) \
+                    or now - self.last_tick.get(market, now) > idle_after:
+                drop.append(market)
+        for market in drop:
+            self.remove(market)
+        if keep is not None and len(self.markets) > keep:
+            by_age = sorted(self.markets, key=lambda m: self.last_tick.get(m, 0.0))
+            for market in by_age[:len(self.markets) - keep]:
+                self.remove(market)
+                drop.append(market)
+        for ring in self.rings.values():
+            ring.compact(self.capacity)
+        return drop
+
+    def evictor(self, max_markets):
+        """MemoryWatchdog evictor: prune idle markets sooner and cap the count to `max_markets * ratio`."""
+        def evict(ratio):
+            self.prune(idle_after=self.idle_after * ratio, keep=max(int(max_markets * ratio), 1))
+        return evict
+
+    # --- reads ---------------------------------------------------------------
+
+    def last(self, market, n, resolution=60, include_open=False):
+        """Newest `n` closed bars of `market` (oldest first) as dict field → 1-D array, or None."""
+        row = self.index.get(market)
+        if row is None:
+            return None
+        return {f: a[0] for f, a in self.rings[resolution].window([row], n, include_open).items()}
+
+    def last_many(self, markets, n, resolution=60, include_open=False):
+        """Newest `n` bars for several markets at once: dict field → (len(markets), n) array.
+        Unknown markets come back as NaN rows."""
+        known = [self.index.get(m, -1) for m in markets]
+        rows = np.array([r if r >= 0 else 0 for r in known], dtype=np.int64)
+        out = self.rings[resolution].window(rows, n, include_open)
+        unknown = np.array([r < 0 for r in known])
+        if unknown.any():
+            for f, a in out.items():
+                a[unknown] = np.nan if f in ("open", "high", "low", "close") else 0
+        return out
+
+    # --- feed ----------------------------------------------------------------
+
+    async def run(self, subscription):
+        """Consume (topic, event) pairs from a bus subscription."""
+        async for topic, event in subscription:
+            if topic == PRICES:
+                try:
+                    self.on_event(event)
+                except Exception as e:
+                    logging.warning(f"[LLMM] Bar aggregator dropped event: {e}")
+
+    async def run_clock(self, interval=1.0, prune_every=60.0):
+        """Finalize bars on wall-clock boundaries even when no ticks arrive; prune every `prune_every` s."""
+        next_prune = time.time() + prune_every
+        while True:
+            now = time.time()
+            await asyncio.sleep(interval - now % interval)
+            self.on_clock()
+            if time.time() >= next_prune:
+                next_prune = time.time() + prune_every
+                dropped = self.prune()
+                if dropped:
+                    logging.info(f"[LLMM] Bars: dropped {len(dropped)} expired/idle markets")
@@ -0,0 +1,110 @@
+"""
+Incremental catalog sync.
+
+Keeps the last known version of every market (its `updatedAt` plus a
+digest of the fields we act on) and turns each poll of an active-markets
+list into typed deltas: added, changed (with the fields that moved) and
+removed. Unchanged records are skipped after one dict lookup and a digest
+compare. Consumers subscribe to deltas instead of re-reading full lists.
+"""
+
+import hashlib
+import json
+import logging
+
+from core.models import market_key
+
+ADDED, CHANGED, REMOVED = "added", "changed", "removed"
+WATCHED_FIELDS = ("status", "prices", "title", "expirationDate", "expirationTimestamp",
+                  "volume", "categories", "updatedAt")
+
+
+class CatalogDelta:
+    __slots__ = ("kind", "key", "market", "previous", "fields")
+
+    def __init__(self, kind, key, market=None, previous=None, fields=()):
+        self.kind = kind
+        self.key = key
+        self.market = market
+        self.previous = previous
+        self.fields = fields
+
+    def __repr__(self):
+        extra = f" {list(self.fields)}" if self.fields else ""
+        return f"CatalogDelta({self.kind} {self.key}{extra})"
+
+
+def record_version(record, fields=WATCHED_FIELDS):
+    """Short digest of the watched fields of one market record."""
+    watched = [record.get(f) for f in fields]
+    return hashlib.blake2b(json.dumps(watched, sort_keys=True, default=str).encode(), digest_size=8).digest()
+
+
+class CatalogSync:
+    def __init__(self, key=market_key, fields=WATCHED_FIELDS):
+        self.key = key
+        self.fields = fields
+        self.versions = {}
+        self.records = {}
+        self.subscribers = []
+        self.skipped = 0
+
+    def subscribe(self, callback, kinds=(ADDED, CHANGED, REMOVED)):
+        """Call `callback(deltas)` with each non-empty batch of deltas of the given kinds."""
+        self.subscribers.append((callback, frozenset(kinds)))
+        return callback
+
+    def update(self, records, complete=True):
+        """Diff one poll against the last known state and notify subscribers.
+
+        `complete=True` means `records` is the full list for this sync's scope,
+        so anything missing from it is reported as removed.
+        """
+        deltas = []
+        seen = set()
+        for r in records or []:
+            k = self.key(r)
+            if k is None:
+                continue
+            seen.add(k)
+            version = record_version(r, self.fields)
+            old_version = self.versions.get(k)
+            if old_version == version:
+                self.skipped += 1
+                continue
+            prev = self.records.get(k)
+            self.versions[k] = version
+            self.records[k] = r
+            if prev is None:
+                deltas.append(CatalogDelta(ADDED, k, r))
+            else:
+                moved = tuple(f for f in self.fields if prev.get(f) != r.get(f))
+                deltas.append(CatalogDelta(CHANGED, k, r, prev, moved))
+        if complete:
+            for k in [k for k in self.records if k not in seen]:
+                deltas.append(CatalogDelta(REMOVED, k, None, self.records.pop(k)))
+                del self.versions[k]
+        if deltas:
+            self._publish(deltas)
+        return deltas
+
+    def _publish(self, deltas):
+        for callback, kinds in self.subscribers:
+            batch = [d for d in deltas if d.kind in kinds]
+            if not batch:
+                continue
+            try:
+                callback(batch)
+            except Exception as e:
+                logging.error(f"[LLMM] Catalog subscriber {getattr(callback, '__name__', callback)} failed: {e}")
+
+
+def apply_to_catalog(catalog):
+    """Subscriber that mirrors deltas into a MarketCatalog (e.g. `core.models.market_catalog`)."""
+    def apply(deltas):
+        for d in deltas:
+            if d.kind == REMOVED:
+                catalog.remove(d.key)
+            else:
+                catalog.upsert(d.market)
+    return apply
@@ -0,0 +1,22 @@
+"""
+Limitless market categories: slug → API category id (`/markets/active/<id>`).
+"""
+
+CATEGORY_MAP = {
+    "hourly": 29,
+    "daily": 30,
+    "weekly": 31,
+    "30-min": 33,
+    "crypto": 2,
+    "economy": 23,
+    "company-news": 19,
+    "other": 5,
+    "chinese": 39,
+    "korean": 42,
+    "billions-network-tge": 43,
+}
+
+
+def category_slug(name):
+    """Normalize an API category label ("Company News", "30 min") to a CATEGORY_MAP key."""
+    return "-".join(str(name).lower().replace("_", " ").split())
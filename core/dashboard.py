@@ -1,3 +1,20 @@
 def render_dashboard_rows(session_state):
     trades = session_state.get("trades", [])
-    return trades[-10:]  # show last 10 trades
+    rows = trades[-10:]  # show last 10 trades
+    bars = session_state.get("bars")
+    if bars is not None and bars.markets:
+        markets = bars.markets[:10]
+        w = bars.last_many(markets, 5, resolution=60, include_open=True)
+        rows.append("--- 5m (1m bars) ---")
+        for i, m in enumerate(markets):
+            first, last = w["open"][i][0], w["close"][i][-1]
+            if first != first:  # fewer than 5 bars yet: start from the oldest one we have
+                opens = w["open"][i]
+                first = opens[opens == opens][0] if (opens == opens).any() else last
+            rows.append(f"{m} close={last:.3f} chg={last - first:+.3f} vol={w['volume'][i].sum():g}")
+    for name, acct in (session_state.get("accounts") or {}).items():
+        a = acct.summary()
+        status = a["status"] if not a["error"] or a["status"] == "running" else f"{a['status']} ({a['error']})"
+        rows.append(f"[{name}] {status} | {a['positions']} positions exposure={a['exposure']:.2f} "
+                    f"PnL={a['pnl']:+.2f} | orders ok={a['orders_sent']} failed={a['orders_failed']}")
+    return rows
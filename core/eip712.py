@@ -0,0 +1,145 @@
+"""
+Cached EIP-712 hashing for the order hot path.
+
+`encode_structured_data` re-parses the type definitions and re-hashes the
+static domain on every call. For a fixed exchange contract only the
+message changes, so `TypedDataEncoder` compiles the types once (type hash
+plus a per-field encoder list) and caches the domain separator; each order
+then costs one struct hash and one keccak over 66 bytes.
+"""
+
+import json
+import re
+
+from eth_utils import keccak, to_bytes
+
+_ARRAY_RE = re.compile(r"^(.*)\[(\d*)\]$")
+
+DOMAIN_FIELDS = (
+    ("name", "string"),
+    ("version", "string"),
+    ("chainId", "uint256"),
+    ("verifyingContract", "address"),
+    ("salt", "bytes32"),
+)
+
+
+def _to_int(value):
+    if isinstance(value, int):
+        return value
+    if isinstance(value, (bytes, bytearray)):
+        return int.from_bytes(value, "big")
+    if isinstance(value, str):
+        return int(value, 16) if value.startswith("0x") else int(value)
+    return int(value)
+
+
+def _to_raw(value):
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value)
+    if isinstance(value, str) and value.startswith("0x"):
+        return to_bytes(hexstr=value)
+    if isinstance(value, str):
+        return value.encode()
+    return bytes(value)
+
+
+def _atomic_encoder(typ):
+    """Return a function value -> 32-byte word for an atomic/dynamic Solidity type."""
+    if typ == "address":
+        return lambda v: _to_raw(v).rjust(32, b"\0")
+    if typ == "bool":
+        return lambda v: (1 if v else 0).to_bytes(32, "big")
+    if typ == "string":
+        return lambda v: keccak(v.encode() if isinstance(v, str) else _to_raw(v))
+    if typ == "bytes":
+        return lambda v: keccak(_to_raw(v))
+    if typ.startswith("uint"):
+        return lambda v: _to_int(v).to_bytes(32, "big")
+    if typ.startswith("int"):
+        return lambda v: _to_int(v).to_bytes(32, "big", signed=True)
+    if typ.startswith("bytes"):
+        return lambda v: _to_raw(v).ljust(32, b"\0")
+    raise ValueError(f"Unsupported EIP-712 type: {typ}")
+
+
+class TypedDataEncoder:
+    """Precompiled encoder for one set of EIP-712 `types`."""
+
+    def __init__(self, types):
+        self.types = {k: list(v) for k, v in types.items() if k != "EIP712Domain"}
+        self._type_hash = {}
+        self._fields = {}
+        for name in self.types:
+            self._type_hash[name] = keccak(text=self.encode_type(name))
+        for name in self.types:
+            self._fields[name] = [(f["name"], self._field_encoder(f["type"])) for f in self.types[name]]
+        self._domain_cache = {}
+
+    # --- type compilation -------------------------------------------------
+
+    def _deps(self, primary, found=None):
+        found = found if found is not None else []
+        if primary in found or primary not in self.types:
+            return found
+        found.append(primary)
+        for field in self.types[primary]:
+            base = _ARRAY_RE.sub(r"\1", field["type"])
+            while _ARRAY_RE.match(base):
+                base = _ARRAY_RE.sub(r"\1", base)
+            self._deps(base, found)
+        return found
+
+    def encode_type(self, primary):
+        deps = self._deps(primary)
+        deps = [primary] + sorted(d for d in deps if d != primary)
+        return "".join(
+            f"{name}(" + ",".join(f"{f['type']} {f['name']}" for f in self.types[name]) + ")"
+            for name in deps
+        )
+
+    def _field_encoder(self, typ):
+        m = _ARRAY_RE.match(typ)
+        if m:
+            inner = self._field_encoder(m.group(1))
+            return lambda v: keccak(b"".join(inner(x) for x in v))
+        if typ in self.types:
+            return lambda v: self.hash_struct(typ, v)
+        return _atomic_encoder(typ)
+
+    # --- hashing ----------------------------------------------------------
+
+    def hash_struct(self, primary, message):
+        parts = [self._type_hash[primary]]
+        for name, enc in self._fields[primary]:
+            parts.append(enc(message[name]))
+        return keccak(b"".join(parts))
+
+    def domain_separator(self, domain):
+        """keccak(encodeData(EIP712Domain, domain)), cached per domain."""
+        key = tuple((k, str(domain.get(k))) for k, _ in DOMAIN_FIELDS if k in domain)
+        sep = self._domain_cache.get(key)
+        if sep is None:
+            fields = [(k, t) for k, t in DOMAIN_FIELDS if k in domain]
+            type_str = "EIP712Domain(" + ",".join(f"{t} {k}" for k, t in fields) + ")"
+            parts = [keccak(text=type_str)]
+            parts.extend(_atomic_encoder(t)(domain[k]) for k, t in fields)
+            sep = keccak(b"".join(parts))
+            self._domain_cache[key] = sep
+        return sep
+
+    def digest(self, domain, primary, message):
+        """The 32-byte hash that gets signed: keccak(0x1901 ‖ domainSeparator ‖ hashStruct)."""
+        return keccak(b"\x19\x01" + self.domain_separator(domain) + self.hash_struct(primary, message))
+
+
+_ENCODERS = {}
+
+
+def get_encoder(types):
+    """Return the cached encoder for this `types` definition (one per exchange contract schema)."""
+    key = json.dumps(types, sort_keys=True)
+    enc = _ENCODERS.get(key)
+    if enc is None:
+        enc = _ENCODERS[key] = TypedDataEncoder(types)
+    return enc
@@ -0,0 +1,159 @@
+"""
+In-process event bus with topic fan-out.
+
+WS ingestion decodes each event once and publishes it to a topic
+("prices", "positions", "system", "orderbook", and "market:<id>" for a
+single market). Every subscriber owns a bounded queue with its own
+overflow policy, so a slow dashboard or recorder drops its own backlog
+instead of stalling the feed or the other consumers:
+
+    drop_oldest  discard the oldest queued event (default: latest state wins)
+    drop_newest  discard the incoming event (keep the backlog in order)
+    block        `publish_async` waits for room; `publish` falls back to drop_newest
+
+Publishing from another thread is safe: events are handed to the
+subscriber's loop with `call_soon_threadsafe`.
+"""
+
+import asyncio
+import threading
+
+from core.metrics import metrics
+
+PRICES, POSITIONS, SYSTEM, ORDERBOOK = "prices", "positions", "system", "orderbook"
+DROP_OLDEST, DROP_NEWEST, BLOCK = "drop_oldest", "drop_newest", "block"
+DEFAULT_QUEUE = 1000
+
+
+def market_topic(market):
+    return f"market:{market}"
+
+
+def _running_loop():
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+class Subscription:
+    def __init__(self, bus, name, topics, maxsize=DEFAULT_QUEUE, policy=DROP_OLDEST):
+        self.bus = bus
+        self.name = name
+        self.topics = frozenset(topics)
+        self.policy = policy
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.loop = _running_loop()
+        self.dropped = 0
+
+    def offer(self, item):
+        """Non-blocking enqueue applying the overflow policy. Call on the subscriber's loop."""
+        q = self.queue
+        try:
+            q.put_nowait(item)
+            return True
+        except asyncio.QueueFull:
+            pass
+        if self.policy == DROP_OLDEST:
+            try:
+                q.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+            q.put_nowait(item)
+        self.dropped += 1
+        metrics.dropped(f"bus:{self.name}")
+        return False
+
+    async def get(self):
+        """Next (topic, event)."""
+        return await self.queue.get()
+
+    def drain(self, limit=None):
+        """All (topic, event) pairs queued right now, without waiting."""
+        out = []
+        while not self.queue.empty() and (limit is None or len(out) < limit):
+            out.append(self.queue.get_nowait())
+        return out
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.queue.get()
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+
+class EventBus:
+    def __init__(self):
+        self.by_topic = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, topics, name="subscriber", maxsize=DEFAULT_QUEUE, policy=DROP_OLDEST):
+        """Create a subscription to one topic or an iterable of topics. Call from the consumer's loop."""
+        if isinstance(topics, str):
+            topics = (topics,)
+        sub = Subscription(self, name, topics, maxsize, policy)
+        with self._lock:
+            for t in sub.topics:
+                self.by_topic[t] = self.by_topic.get(t, ()) + (sub,)
+        metrics.set_gauge("llmm_bus_subscribers", sum(len(s) for s in self.by_topic.values()))
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            for t in sub.topics:
+                remaining = tuple(s for s in self.by_topic.get(t, ()) if s is not sub)
+                if remaining:
+                    self.by_topic[t] = remaining
+                else:
+                    self.by_topic.pop(t, None)
+
+    def _targets(self, topic, market):
+        subs = self.by_topic.get(topic, ())
+        if market is not None:
+            per_market = self.by_topic.get(market_topic(market), ())
+            if per_market:
+                subs = subs + tuple(s for s in per_market if s not in subs)
+        return subs
+
+    def publish(self, topic, event, market=None):
+        """Fan `event` out to subscribers of `topic` (and of `market:<market>`). Never blocks."""
+        subs = self._targets(topic, market)
+        if not subs:
+            return 0
+        loop = _running_loop()
+        item = (topic, event)
+        for sub in subs:
+            if sub.loop is None or sub.loop is loop:
+                sub.offer(item)
+            elif not sub.loop.is_closed():
+                sub.loop.call_soon_threadsafe(sub.offer, item)
+        return len(subs)
+
+    async def publish_async(self, topic, event, market=None):
+        """Like `publish`, but waits for room in `block` subscribers on this loop."""
+        subs = self._targets(topic, market)
+        loop = _running_loop()
+        item = (topic, event)
+        for sub in subs:
+            if sub.policy == BLOCK and sub.loop is loop:
+                await sub.queue.put(item)
+            elif sub.loop is None or sub.loop is loop:
+                sub.offer(item)
+            elif not sub.loop.is_closed():
+                sub.loop.call_soon_threadsafe(sub.offer, item)
+        return len(subs)
+
+    def stats(self):
+        seen = {}
+        for subs in self.by_topic.values():
+            for s in subs:
+                seen[id(s)] = s
+        return {s.name: {"queued": s.queue.qsize(), "dropped": s.dropped, "policy": s.policy}
+                for s in seen.values()}
+
+
+bus = EventBus()
+
@@ -0,0 +1,90 @@
+"""
+Hour-boundary scheduler on the monotonic clock.
+
+The wall clock is read once per cycle to find the next boundary, which is
+then converted to a `time.monotonic()` deadline; all sleeping happens on
+the monotonic clock (coarse sleep, then short sleeps for the last stretch),
+so NTP steps or DST changes can't stretch or skip a wake-up.
+
+`HourRollover` runs the rollover sequence for hourly markets:
+  boundary - lead   → prewarm() connections, pre-discover the next market
+  boundary          → poll discover() fast until the new market lists
+  listed            → subscribe() immediately, report the rollover gap
+                      (0 when it listed early and was subscribed before the boundary)
+"""
+
+import asyncio
+import logging
+import time
+
+from core.metrics import metrics
+
+HOUR = 3600.0
+
+
+def next_boundary(period=HOUR, offset=0.0, now=None):
+    """(wall_ts, monotonic_deadline) of the next `period` boundary (+ `offset` seconds)."""
+    wall = time.time() if now is None else now
+    mono = time.monotonic()
+    boundary = (wall // period + 1) * period + offset
+    if boundary - wall <= 0:
+        boundary += period
+    return boundary, mono + (boundary - wall)
+
+
+async def sleep_until(deadline, spin=0.05):
+    """Sleep until monotonic `deadline`; the last `spin` seconds in 1ms steps."""
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        await asyncio.sleep(remaining - spin if remaining > spin * 2 else min(remaining, 0.001))
+
+
+class HourRollover:
+    def __init__(self, prewarm, discover, subscribe, period=HOUR, lead=30.0, poll=0.25, timeout=120.0):
+        self.prewarm = prewarm  # async () -> None
+        self.discover = discover  # async (boundary_wall_ts) -> market or None
+        self.subscribe = subscribe  # async (market) -> None
+        self.period = period
+        self.lead = lead
+        self.poll = poll
+        self.timeout = timeout
+        self.gaps_ms = []
+
+    async def roll(self, boundary, deadline):
+        """Run one rollover around the boundary; returns the gap in ms (None if it never listed)."""
+        await sleep_until(deadline - self.lead)
+        try:
+            await self.prewarm()
+        except Exception as e:
+            logging.warning(f"[LLMM] Rollover prewarm failed: {e}")
+        market = None
+        while market is None and time.monotonic() - deadline < self.timeout:
+            try:
+                market = await self.discover(boundary)
+            except Exception as e:
+                logging.warning(f"[LLMM] Rollover discovery failed: {e}")
+            if market is None:
+                # Slow polling while pre-discovering, fast once the boundary has passed
+                before = deadline - time.monotonic()
+                await (sleep_until(deadline) if 0 < before < 1.0 else
+                       asyncio.sleep(1.0 if before > 0 else self.poll))
+        if market is None:
+            logging.error(f"[LLMM] No market listed {self.timeout:.0f}s after the boundary")
+            return None
+        await self.subscribe(market)
+        gap = max(time.monotonic() - deadline, 0.0)  # listed early → subscribed before the boundary
+        metrics.observe("llmm_rollover_gap_seconds", gap)
+        self.gaps_ms.append(gap * 1000)
+        print(f"[LLMM] Rollover gap {gap * 1000:.1f}ms (boundary → subscribed)")
+        return gap * 1000
+
+    async def run(self, cycles=None):
+        n = 0
+        while cycles is None or n < cycles:
+            boundary, deadline = next_boundary(self.period)
+            if deadline - time.monotonic() < self.lead:
+                boundary, deadline = boundary + self.period, deadline + self.period
+            await self.roll(boundary, deadline)
+            n += 1
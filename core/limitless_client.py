@@ -3,6 +3,7 @@ import requests
 from eth_account import Account
 from web3 import Web3
 from dotenv import load_dotenv
+from core.rate_limiter import scheduler, MARKET_DATA, POSITIONS
 
 load_dotenv()
 
@@ -21,6 +22,7 @@ class LimitlessApiClient:
         self.account = Account.from_key(private_key)
         self.web3 = Web3(Web3.HTTPProvider(rpc_url))
         self.chain_id = chain_id
+        self.http = requests.Session()
 
         print(f"[LLMM] Wallet address: {self.account.address}")
         print(f"[LLMM] Connected to chain {self.chain_id}, block {self.web3.eth.block_number}")
@@ -34,20 +36,45 @@ class LimitlessApiClient:
             "rpc_url": self.web3.provider.endpoint_uri,
         }
 
-    def get_active_markets(self, page=1, limit=10, sort="newest"):
+    # Market-data calls take `priority`: bulk crawls pass SCAN so they queue behind live data.
+
+    def get_active_markets(self, page=1, limit=10, sort="newest", priority=MARKET_DATA):
         """Fetch active markets."""
         url = f"{self.api_url}/markets/active?page={page}&limit={limit}&sortBy={sort}"
-        resp = requests.get(url)
+        resp = scheduler.request("GET", url, priority, session=self.http)
         resp.raise_for_status()
         return resp.json().get("data", [])
 
-    def get_market(self, market_id: int):
+    def get_market(self, market_id: int, priority=MARKET_DATA):
         """Fetch a single market by ID."""
         url = f"{self.api_url}/markets/{market_id}"
-        resp = requests.get(url)
+        resp = scheduler.request("GET", url, priority, session=self.http)
         resp.raise_for_status()
         return resp.json()
 
+    def get_category_markets(self, category_id, page=1, limit=25, priority=MARKET_DATA):
+        """Fetch one page of active markets in a category (see core.categories.CATEGORY_MAP)."""
+        url = f"{self.api_url}/markets/active/{category_id}?page={page}&limit={limit}"
+        resp = scheduler.request("GET", url, priority, session=self.http)
+        resp.raise_for_status()
+        payload = resp.json()
+        return payload.get("markets", []) or payload.get("data", [])
+
+    def get_price_history(self, slug, interval="1h", priority=MARKET_DATA):
+        """
+        Fetch historical YES prices for a market.
+        NOTE: This endpoint may not exist in the public API — safe fallback included.
+        """
+        url = f"{self.api_url}/markets/{slug}/historical-price?interval={interval}"
+        resp = scheduler.request("GET", url, priority, session=self.http)
+        if resp.status_code == 404:
+            return []
+        resp.raise_for_status()
+        payload = resp.json()
+        if isinstance(payload, dict):
+            payload = payload.get("prices") or payload.get("data") or []
+        return payload
+
     def get_positions(self, address=None):
         """
         Fetch positions for a given wallet address (defaults to client wallet).
@@ -55,7 +82,7 @@ class LimitlessApiClient:
         """
         addr = address or self.account.address
         url = f"{self.api_url}/positions/{addr}"
-        resp = requests.get(url)
+        resp = scheduler.request("GET", url, POSITIONS, session=self.http)
 
         if resp.status_code == 404:
             print(f"[LLMM] Positions endpoint not found for {addr}.")
@@ -64,12 +91,12 @@ class LimitlessApiClient:
         resp.raise_for_status()
         return resp.json().get("data", [])
 
-    def get_hourly_markets(self, page=1, limit=10, sort="newest"):
+    def get_hourly_markets(self, page=1, limit=10, sort="newest", priority=MARKET_DATA):
         """Fetch active markets and filter for those tagged as Hourly."""
-        data = self.get_active_markets(page=page, limit=limit, sort=sort)
+        data = self.get_active_markets(page=page, limit=limit, sort=sort, priority=priority)
         return [m for m in data if "Hourly" in m.get("tags", []) or "Hourly" in m.get("categories", [])]
 
-    def get_daily_markets(self, page=1, limit=10, sort="newest"):
+    def get_daily_markets(self, page=1, limit=10, sort="newest", priority=MARKET_DATA):
         """Fetch active markets and filter for those tagged as Daily."""
-        data = self.get_active_markets(page=page, limit=limit, sort=sort)
+        data = self.get_active_markets(page=page, limit=limit, sort=sort, priority=priority)
         return [m for m in data if "Daily" in m.get("tags", []) or "Daily" in m.get("categories", [])]
@@ -0,0 +1,96 @@
+"""
+Event-loop lag monitor.
+
+A coroutine sleeps for a fixed interval and records how late it wakes up
+(scheduling delay) into `llmm_loop_lag_seconds`. A watchdog thread watches
+the coroutine's heartbeat; when the loop stalls past the threshold it
+captures the loop thread's stack and the running task, so blocking calls
+(e.g. `requests` inside a coroutine) show up in the log with their origin.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+
+from core.metrics import metrics
+
+
+class LoopLagMonitor:
+    def __init__(self, interval=0.1, threshold=0.25, loop=None):
+        self.interval = interval
+        self.threshold = threshold
+        self.loop = loop
+        self.max_lag = 0.0
+        self.stalls = 0
+        self._beat = time.monotonic()
+        self._loop_thread_id = None
+        self._reported_beat = None
+        self._stop = threading.Event()
+        self._watchdog = None
+
+    async def run(self):
+        """Sample scheduling delay forever; start this as a task on the monitored loop."""
+        self.loop = self.loop or asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._start_watchdog()
+        try:
+            while True:
+                t0 = time.perf_counter()
+                await asyncio.sleep(self.interval)
+                lag = max(0.0, time.perf_counter() - t0 - self.interval)
+                self._beat = time.monotonic()
+                metrics.observe("llmm_loop_lag_seconds", lag)
+                metrics.set_gauge("llmm_loop_lag_last_seconds", round(lag, 6))
+                if lag > self.max_lag:
+                    self.max_lag = lag
+                if lag > self.threshold:
+                    self.stalls += 1
+                    metrics.inc("llmm_loop_stalls_total")
+                    logging.warning(f"[LLMM] Event loop lagged {lag * 1000:.1f}ms "
+                                    f"(threshold {self.threshold * 1000:.0f}ms)")
+        finally:
+            self._stop.set()
+
+    def _start_watchdog(self):
+        if self._watchdog and self._watchdog.is_alive():
+            return
+        self._stop.clear()
+        self._watchdog = threading.Thread(target=self._watch, name="llmm-loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    def _watch(self):
+        poll = max(self.interval / 2, 0.01)
+        while not self._stop.wait(poll):
+            beat = self._beat
+            stalled = time.monotonic() - beat - self.interval
+            if stalled > self.threshold and self._reported_beat != beat:
+                self._reported_beat = beat
+                self._report_stall(stalled)
+
+    def _report_stall(self, stalled):
+        """Log the loop thread's stack while it is still blocked."""
+        frame = sys._current_frames().get(self._loop_thread_id)
+        try:
+            task = asyncio.current_task(self.loop)
+        except RuntimeError:
+            task = None
+        task_name = task.get_name() if task else "<no task / loop internals>"
+        stack = "".join(traceback.format_stack(frame)) if frame else "  <stack unavailable>\n"
+        logging.warning(f"[LLMM] Event loop blocked for {stalled * 1000:.0f}ms+ in task {task_name}:\n{stack}")
+
+
+def install_event_loop_policy(use_uvloop):
+    """Switch asyncio to uvloop when requested and installed. Returns the loop name in use."""
+    if use_uvloop:
+        try:
+            import uvloop
+        except ImportError:
+            logging.warning("[LLMM] uvloop requested but not installed; using asyncio default loop")
+            return "asyncio"
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        return "uvloop"
+    return "asyncio"
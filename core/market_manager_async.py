@@ -1,4 +1,238 @@
+"""
+Event-driven strategy runtime.
+
+Strategies register `on_price` / `on_position` / `on_timer` callbacks and
+return the quotes they want resting. The runtime diffs those against the
+live orders it placed for that strategy and sends only the changes
+(new, replaced, cancelled) through `TradingClient`. Tick-to-order latency
+(feed receipt → last order call of the reconcile) is recorded per strategy
+in `llmm_tick_to_order_seconds`; reconciles slower than the budget are
+counted in `llmm_latency_budget_exceeded_total` and logged.
+
+Without a TradingClient (or an order builder) the runtime runs dry: diffs
+are computed, timed and logged, nothing is sent. Reconciles of one strategy
+are serialized (feed and timer callbacks never diff the same live orders
+concurrently), and a failing order build or send is logged, never fatal.
+"""
+
 import asyncio
-async def run_market_manager(session_state):
-    while True:
-        await asyncio.sleep(10)
+import itertools
+import logging
+import os
+import time
+
+from core.event_bus import bus, PRICES, POSITIONS
+from core.metrics import metrics
+
+TICK_TO_ORDER_BUDGET_MS = float(os.getenv("TICK_TO_ORDER_BUDGET_MS", "50"))
+EVENT_QUEUE_SIZE = int(os.getenv("MARKET_EVENT_QUEUE", "10000"))
+PRICE_TOLERANCE = 1e-9
+
+
+class Quote:
+    """One resting order a strategy wants: side is "BUY"/"SELL" (or outcome-specific labels)."""
+
+    __slots__ = ("market", "side", "price", "size")
+
+    def __init__(self, market, side, price, size):
+        self.market = market
+        self.side = side
+        self.price = price
+        self.size = size
+
+    @property
+    def key(self):
+        return (self.market, self.side)
+
+    def same_as(self, other):
+        return abs(self.price - other.price) <= PRICE_TOLERANCE and abs(self.size - other.size) <= PRICE_TOLERANCE
+
+    def __repr__(self):
+        return f"Quote({self.market}, {self.side}, {self.price}, {self.size})"
+
+
+class Withdraw:
+    """Quote-list entry meaning "no orders in `market`": cancels everything resting there."""
+
+    __slots__ = ("market",)
+
+    def __init__(self, market):
+        self.market = market
+
+    def __repr__(self):
+        return f"Withdraw({self.market})"
+
+
+class Strategy:
+    """Base strategy. Callbacks return an iterable of Quote / Withdraw (full desired
+    set for the markets they mention), or None to leave live orders untouched."""
+
+    name = "strategy"
+    markets = None  # None = every market; otherwise a set of market ids
+    timer_interval = None  # seconds between on_timer calls, None = never
+
+    def wants(self, market):
+        return self.markets is None or market in self.markets
+
+    def on_price(self, market, update):
+        return None
+
+    def on_position(self, update):
+        return None
+
+    def on_timer(self, now):
+        return None
+
+
+class LiveOrder:
+    __slots__ = ("quote", "order_id")
+
+    def __init__(self, quote, order_id):
+        self.quote = quote
+        self.order_id = order_id
+
+
+class MarketManager:
+    def __init__(self, client=None, build_order=None, budget_ms=TICK_TO_ORDER_BUDGET_MS):
+        self.client = client
+        self.build_order = build_order
+        self.budget = budget_ms / 1000
+        self.strategies = []
+        self.live = {}  # strategy name -> {(market, side): LiveOrder}
+        self.locks = {}  # strategy name -> asyncio.Lock serializing its reconciles
+        self._dry_ids = itertools.count(1)
+
+    @property
+    def dry_run(self):
+        return self.client is None or self.build_order is None
+
+    def register(self, strategy):
+        self.strategies.append(strategy)
+        self.live.setdefault(strategy.name, {})
+        self.locks.setdefault(strategy.name, asyncio.Lock())
+        return strategy
+
+    # --- diff & submit -------------------------------------------------------
+
+    def diff(self, strategy, quotes):
+        """(to_place, to_cancel) for the markets covered by `quotes` (Quote or Withdraw entries)."""
+        live = self.live[strategy.name]
+        desired = {q.key: q for q in quotes if not isinstance(q, Withdraw)}
+        markets = {q.market for q in quotes}
+        to_place, to_cancel = [], []
+        for key, q in desired.items():
+            cur = live.get(key)
+            if cur is None or not cur.quote.same_as(q):
+                to_place.append(q)
+                if cur is not None:
+                    to_cancel.append(cur)
+        for key, cur in live.items():
+            if key[0] in markets and key not in desired:
+                to_cancel.append(cur)
+        return to_place, to_cancel
+
+    async def reconcile(self, strategy, quotes, t_tick):
+        quotes = list(quotes)
+        if not quotes:
+            return
+        async with self.locks[strategy.name]:
+            await self._reconcile(strategy, quotes, t_tick)
+
+    async def _reconcile(self, strategy, quotes, t_tick):
+        to_place, to_cancel = self.diff(strategy, quotes)
+        if not to_place and not to_cancel:
+            return
+        live = self.live[strategy.name]
+
+        async def cancel(order):
+            if not self.dry_run and order.order_id is not None:
+                await self.client.cancel_order(order.order_id)
+            # Only once the venue confirmed: a failed cancel leaves the order live and tracked
+            if live.get(order.quote.key) is order:
+                del live[order.quote.key]
+
+        failed = set()
+        for order, res in zip(to_cancel, await asyncio.gather(*(cancel(o) for o in to_cancel), return_exceptions=True)):
+            if isinstance(res, Exception):
+                failed.add(order.quote.key)
+                logging.warning(f"[LLMM] {strategy.name}: cancel {order.order_id} failed: {res}")
+        # Don't stack a replacement on top of an order that is still resting
+        to_place = [q for q in to_place if q.key not in failed]
+
+        if self.dry_run:
+            for q in to_place:
+                live[q.key] = LiveOrder(q, f"dry-{next(self._dry_ids)}")
+        elif to_place:
+            try:
+                orders = [self.build_order(q) for q in to_place]
+                for q, o in zip(to_place, orders):
+                    o.setdefault("market", q.market)  # conditionId for the risk checks
+                results = await self.client.submit_orders(orders)
+            except Exception as e:
+                logging.error(f"[LLMM] {strategy.name}: submitting {len(to_place)} orders failed: "
+                              f"{type(e).__name__}: {e}")
+                results = []
+            for q, r in zip(to_place, results):
+                resp = r.get("response") if isinstance(r.get("response"), dict) else {}
+                order_id = resp.get("id") or resp.get("orderId")
+                if r["ok"] and order_id is not None:
+                    live[q.key] = LiveOrder(q, order_id)
+                elif r["ok"]:
+                    logging.warning(f"[LLMM] {strategy.name}: order {q} acked without an id; "
+                                    f"not tracked, it can't be cancelled: {r['response']}")
+                else:
+                    logging.warning(f"[LLMM] {strategy.name}: order {q} failed: {r['error']}")
+
+        elapsed = time.perf_counter() - t_tick
+        metrics.observe("llmm_tick_to_order_seconds", elapsed, strategy=strategy.name)
+        if elapsed > self.budget:
+            metrics.inc("llmm_latency_budget_exceeded_total", strategy=strategy.name)
+            logging.warning(f"[LLMM] {strategy.name}: tick-to-order {elapsed * 1000:.1f}ms "
+                            f"over budget {self.budget * 1000:.0f}ms ({len(to_place)} new, {len(to_cancel)} cancelled)")
+        elif self.dry_run:
+            logging.debug(f"[LLMM] {strategy.name} (dry run): {len(to_place)} new, {len(to_cancel)} cancelled")
+
+    # --- dispatch ------------------------------------------------------------
+
+    async def _call(self, strategy, callback, *args, t_tick):
+        try:
+            quotes = callback(*args)
+        except Exception as e:
+            logging.error(f"[LLMM] {strategy.name}.{callback.__name__} failed: {e}")
+            return
+        if quotes is not None:
+            await self.reconcile(strategy, quotes, t_tick)
+
+    async def dispatch(self, event):
+        """Route one normalized feed event: {"kind": "price"|"position", "market", ..., "t_recv"}."""
+        t_tick = event.get("t_recv") or time.perf_counter()
+        kind = event.get("kind")
+        for s in self.strategies:
+            if kind == "price" and s.wants(event.get("market")):
+                await self._call(s, s.on_price, event["market"], event, t_tick=t_tick)
+            elif kind == "position":
+                await self._call(s, s.on_position, event, t_tick=t_tick)
+
+    async def _timer(self, strategy):
+        while True:
+            await asyncio.sleep(strategy.timer_interval)
+            await self._call(strategy, strategy.on_timer, time.time(), t_tick=time.perf_counter())
+
+    async def run(self, subscription):
+        timers = [asyncio.create_task(self._timer(s), name=f"timer-{s.name}")
+                  for s in self.strategies if s.timer_interval]
+        try:
+            async for _topic, event in subscription:
+                await self.dispatch(event)
+        finally:
+            for t in timers:
+                t.cancel()
+
+
+async def run_market_manager(session_state, strategies=(), client=None, build_order=None,
+                             budget_ms=TICK_TO_ORDER_BUDGET_MS):
+    manager = MarketManager(client, build_order, budget_ms)
+    for s in strategies:
+        manager.register(s)
+    session_state["market_manager"] = manager
+    await manager.run(bus.subscribe((PRICES, POSITIONS), name="market_manager", maxsize=EVENT_QUEUE_SIZE))
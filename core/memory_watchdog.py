@@ -0,0 +1,173 @@
+"""
+Memory budget watchdog.
+
+Samples process RSS and the top tracemalloc allocation sites at an
+interval, publishes the size of every registered structure as
+`llmm_structure_items{structure=...}`, and when RSS crosses the configured
+budget asks each registered cache to evict/compact itself.
+"""
+
+import asyncio
+import gc
+import logging
+import os
+import sys
+import time
+import tracemalloc
+
+from core.metrics import metrics
+
+MEMORY_BUDGET_MB = int(os.getenv("MEMORY_BUDGET_MB", "512"))
+MEMORY_CHECK_INTERVAL = int(os.getenv("MEMORY_CHECK_INTERVAL", "30"))
+
+
+def current_rss():
+    """Resident set size in bytes (0 if the platform gives no way to read it)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except Exception:
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is KiB on Linux, bytes on macOS; it is a peak, not current.
+        return peak if sys.platform == "darwin" else peak * 1024
+    except Exception:
+        return 0
+
+
+# --- evictors for the structures we keep in memory -----------------------
+
+def trim_list(lst, keep):
+    """Evictor for append-only lists: keep the newest `keep * ratio` items in place."""
+    def evict(ratio):
+        n = max(int(keep * ratio), 1)
+        if len(lst) > n:
+            del lst[:-n]
+    return evict
+
+
+def trim_dict(d, keep, protect=None):
+    """Evictor for insertion-ordered dicts: drop oldest keys not in `protect()`."""
+    def evict(ratio):
+        n = max(int(keep * ratio), 1)
+        excess = len(d) - n
+        if excess <= 0:
+            return
+        keep_keys = set(protect()) if protect else set()
+        for k in [k for k in d if k not in keep_keys][:excess]:
+            del d[k]
+    return evict
+
+
+def trim_catalog(catalog, keep, protect=None):
+    """Evictor for a `MarketCatalog`: remove expired markets, then the oldest
+    beyond `keep * ratio`; keys in `protect()` (subscriptions, positions) stay."""
+    def evict(ratio):
+        keep_keys = set(protect()) if protect else set()
+        now = time.time()
+        for m in [m for m in catalog if m.expiration_ts is not None and m.expiration_ts <= now]:
+            if m.condition_id not in keep_keys:
+                catalog.remove(m.condition_id)
+        excess = len(catalog) - max(int(keep * ratio), 1)
+        if excess > 0:
+            for k in [k for k in catalog.by_key if k not in keep_keys][:excess]:
+                catalog.remove(k)
+    return evict
+
+
+def put_drop_oldest(q, item, source="queue"):
+    """Put on a bounded asyncio.Queue, discarding the oldest item when full."""
+    while True:
+        try:
+            q.put_nowait(item)
+            return
+        except asyncio.QueueFull:
+            try:
+                q.get_nowait()
+                metrics.dropped(source)
+            except asyncio.QueueEmpty:
+                pass
+
+
+class MemoryWatchdog:
+    def __init__(self, budget_mb=MEMORY_BUDGET_MB, interval=MEMORY_CHECK_INTERVAL, top_n=10,
+                 trace_frames=1, evict_ratio=0.5):
+        self.budget = budget_mb * 1024 * 1024
+        self.interval = interval
+        self.top_n = top_n
+        self.trace_frames = trace_frames
+        self.evict_ratio = evict_ratio
+        self.structures = {}
+        self.last_top = []
+        self.evictions = 0
+
+    def register(self, name, obj=None, evict=None, size=None):
+        """Track `obj` (anything with len()) or a `size()` callable under `name`.
+
+        `evict(ratio)` is called when the budget is crossed; it should shrink
+        the structure to roughly `ratio` of its normal cap.
+        """
+        size = size or (lambda: len(obj))
+        self.structures[name] = (size, evict)
+        return self
+
+    def sizes(self):
+        out = {}
+        for name, (size, _) in self.structures.items():
+            try:
+                out[name] = size()
+            except Exception:
+                out[name] = -1
+        return out
+
+    def check(self):
+        """Take one sample; evict if over budget. Returns (rss, sizes)."""
+        rss = current_rss()
+        sizes = self.sizes()
+        metrics.set_gauge("llmm_rss_bytes", rss)
+        metrics.set_gauge("llmm_memory_budget_bytes", self.budget)
+        for name, n in sizes.items():
+            metrics.set_gauge("llmm_structure_items", n, structure=name)
+        if tracemalloc.is_tracing():
+            traced, peak = tracemalloc.get_traced_memory()
+            metrics.set_gauge("llmm_traced_bytes", traced)
+            metrics.set_gauge("llmm_traced_peak_bytes", peak)
+            self.last_top = tracemalloc.take_snapshot().statistics("lineno")[:self.top_n]
+
+        if self.budget and rss > self.budget:
+            self._evict(rss, sizes)
+        return rss, sizes
+
+    def _evict(self, rss, sizes):
+        logging.warning(f"[LLMM] Memory {rss / 2**20:.0f}MB over budget {self.budget / 2**20:.0f}MB; "
+                        f"compacting {len(self.structures)} caches {sizes}")
+        for stat in self.last_top:
+            logging.warning(f"[LLMM]   top alloc {stat.traceback[0]}: {stat.size / 1024:.0f}KiB in {stat.count} blocks")
+        for name, (_, evict) in self.structures.items():
+            if evict is None:
+                continue
+            try:
+                evict(self.evict_ratio)
+            except Exception as e:
+                logging.error(f"[LLMM] Evicting {name} failed: {e}")
+        gc.collect()
+        self.evictions += 1
+        metrics.inc("llmm_memory_evictions_total")
+        logging.warning(f"[LLMM] After compaction: {self.sizes()}")
+
+    async def run(self):
+        if self.trace_frames and not tracemalloc.is_tracing():
+            tracemalloc.start(self.trace_frames)
+        while True:
+            try:
+                self.check()
+            except Exception as e:
+                logging.error(f"[LLMM] Memory watchdog error: {e}")
+            await asyncio.sleep(self.interval)
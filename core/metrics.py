@@ -0,0 +1,287 @@
+"""
+Latency and throughput metrics for the LLMM pipeline.
+
+Every feed event is stamped as it moves through the stages
+receive -> decode -> normalize -> consume -> render, and each hop is recorded in a
+log-bucketed (HDR-style) histogram per stage and per event type. Counters
+track events, reconnects and dropped updates. `serve_metrics()` exposes the
+registry in Prometheus text format on a local HTTP port.
+"""
+
+import asyncio
+import logging
+import math
+import threading
+import time
+
+from core.models import parse_ts
+
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = 9464
+
+
+class LatencyHistogram:
+    """Log-bucketed histogram with a bounded relative error (HDR style).
+
+    Values are in seconds; bucket boundaries grow geometrically from
+    `lowest` so that any recorded value is reproduced within
+    `1 / sub_buckets` of its true size.
+    """
+
+    __slots__ = ("lowest", "_log_base", "counts", "count", "total", "min", "max")
+
+    def __init__(self, lowest=1e-6, highest=3600.0, sub_buckets=64):
+        self.lowest = lowest
+        self._log_base = math.log1p(1.0 / sub_buckets)
+        size = int(math.log(highest / lowest) / self._log_base) + 2
+        self.counts = [0] * size
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def record(self, value):
+        if value < 0:
+            value = 0.0
+        if value <= self.lowest:
+            idx = 0
+        else:
+            idx = min(int(math.log(value / self.lowest) / self._log_base) + 1, len(self.counts) - 1)
+        self.counts[idx] += 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def _bucket_value(self, idx):
+        if idx == 0:
+            return self.lowest
+        return self.lowest * math.exp(idx * self._log_base)
+
+    def percentile(self, q):
+        """Return the value at quantile `q` (0..1), or 0.0 when empty."""
+        if not self.count:
+            return 0.0
+        target = max(1, math.ceil(q * self.count))
+        seen = 0
+        for idx, c in enumerate(self.counts):
+            seen += c
+            if seen >= target:
+                return min(self._bucket_value(idx), self.max)
+        return self.max
+
+    def reset(self):
+        self.counts = [0] * len(self.counts)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+
+class RateMeter:
+    """Events per second over a sliding window of one-second slots."""
+
+    __slots__ = ("window", "_slots")
+
+    def __init__(self, window=10):
+        self.window = window
+        self._slots = {}
+
+    def mark(self, n=1, now=None):
+        sec = int(now if now is not None else time.time())
+        self._slots[sec] = self._slots.get(sec, 0) + n
+        if len(self._slots) > self.window + 2:
+            cutoff = sec - self.window
+            for k in [k for k in self._slots if k <= cutoff]:
+                del self._slots[k]
+
+    def rate(self, now=None):
+        sec = int(now if now is not None else time.time())
+        # Only completed seconds count, so a scrape early in a second does not dip.
+        total = sum(c for k, c in self._slots.items() if sec - self.window <= k < sec)
+        return total / self.window
+
+
+class EventTrace:
+    """Timestamps (perf_counter seconds) of one event through the pipeline."""
+
+    __slots__ = ("event_type", "t_recv", "t_decode", "t_normalize", "server_ts", "wall_recv")
+
+    def __init__(self, event_type="unknown", t_recv=None):
+        self.event_type = event_type
+        self.t_recv = t_recv if t_recv is not None else time.perf_counter()
+        self.wall_recv = time.time()
+        self.t_decode = None
+        self.t_normalize = None
+        self.server_ts = None
+
+
+class MetricsRegistry:
+    """Process-wide store for histograms, counters and gauges."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}
+        self.rates = {}
+        self.started = time.time()
+
+    def histogram(self, name, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        h = self.histograms.get(key)
+        if h is None:
+            with self._lock:
+                h = self.histograms.setdefault(key, LatencyHistogram())
+        return h
+
+    def observe(self, name, seconds, **labels):
+        self.histogram(name, **labels).record(seconds)
+
+    def inc(self, name, n=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + n
+
+    def set_gauge(self, name, value, **labels):
+        self.gauges[(name, tuple(sorted(labels.items())))] = value
+
+    def mark_event(self, event_type):
+        meter = self.rates.get(event_type)
+        if meter is None:
+            meter = self.rates.setdefault(event_type, RateMeter())
+        meter.mark()
+        self.inc("llmm_events_total", type=event_type)
+
+    # --- pipeline helpers -------------------------------------------------
+
+    def trace(self, event_type="unknown"):
+        """Start a trace at socket receive."""
+        return EventTrace(event_type)
+
+    def decoded(self, trace, event_type=None):
+        trace.t_decode = time.perf_counter()
+        if event_type:
+            trace.event_type = event_type
+        self.observe("llmm_stage_seconds", trace.t_decode - trace.t_recv,
+                     stage="decode", type=trace.event_type)
+
+    def normalized(self, trace, server_ts=None):
+        trace.t_normalize = time.perf_counter()
+        start = trace.t_decode or trace.t_recv
+        self.observe("llmm_stage_seconds", trace.t_normalize - start,
+                     stage="normalize", type=trace.event_type)
+        ts = parse_ts(server_ts)
+        if ts is not None:
+            trace.server_ts = ts
+            self.observe("llmm_stage_seconds", trace.wall_recv - ts,
+                         stage="exchange_lag", type=trace.event_type)
+
+    def consumed(self, trace):
+        now = time.perf_counter()
+        start = trace.t_normalize or trace.t_decode or trace.t_recv
+        self.observe("llmm_stage_seconds", now - start, stage="consume", type=trace.event_type)
+        self.observe("llmm_stage_seconds", now - trace.t_recv, stage="end_to_end", type=trace.event_type)
+        self.mark_event(trace.event_type)
+
+    def rendered(self, trace):
+        """Record how stale the newest event was when a frame was drawn."""
+        self.observe("llmm_stage_seconds", time.perf_counter() - trace.t_recv,
+                     stage="render", type=trace.event_type)
+
+    def reconnect(self, source):
+        self.inc("llmm_reconnects_total", source=source)
+
+    def dropped(self, source, n=1):
+        self.inc("llmm_dropped_updates_total", n, source=source)
+
+    # --- exposition -------------------------------------------------------
+
+    def render_prometheus(self):
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = []
+
+        def fmt_labels(labels, extra=()):
+            items = list(labels) + list(extra)
+            if not items:
+                return ""
+            body = ",".join(f'{k}="{str(v)}"' for k, v in items)
+            return "{" + body + "}"
+
+        with self._lock:
+            histograms = list(self.histograms.items())
+            counters = list(self.counters.items())
+        gauges = list(self.gauges.items())
+
+        seen_types = set()
+        for (name, labels), h in sorted(histograms):
+            if name not in seen_types:
+                lines.append(f"# TYPE {name} summary")
+                seen_types.add(name)
+            for q in (0.5, 0.9, 0.99, 0.999):
+                lines.append(f"{name}{fmt_labels(labels, [('quantile', q)])} {h.percentile(q):.9f}")
+            lines.append(f"{name}_sum{fmt_labels(labels)} {h.total:.9f}")
+            lines.append(f"{name}_count{fmt_labels(labels)} {h.count}")
+
+        for (name, labels), v in sorted(counters):
+            if name not in seen_types:
+                lines.append(f"# TYPE {name} counter")
+                seen_types.add(name)
+            lines.append(f"{name}{fmt_labels(labels)} {v}")
+
+        lines.append("# TYPE llmm_events_per_second gauge")
+        for event_type, meter in sorted(self.rates.items()):
+            lines.append(f'llmm_events_per_second{{type="{event_type}"}} {meter.rate():.3f}')
+
+        for (name, labels), v in sorted(gauges):
+            if name not in seen_types:
+                lines.append(f"# TYPE {name} gauge")
+                seen_types.add(name)
+            lines.append(f"{name}{fmt_labels(labels)} {v}")
+
+        lines.append("# TYPE llmm_uptime_seconds gauge")
+        lines.append(f"llmm_uptime_seconds {time.time() - self.started:.1f}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+async def _handle_http(reader, writer, registry):
+    try:
+        request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+        # Drain headers; we only care about the path.
+        while True:
+            line = await asyncio.wait_for(reader.readline(), timeout=5)
+            if line in (b"\r\n", b"\n", b""):
+                break
+        parts = request_line.decode("latin-1").split()
+        path = parts[1] if len(parts) > 1 else "/"
+        if path.startswith("/metrics"):
+            status, body = "200 OK", registry.render_prometheus().encode()
+        elif path.startswith("/healthz"):
+            status, body = "200 OK", b"ok\n"
+        else:
+            status, body = "404 Not Found", b"not found\n"
+        writer.write(
+            f"HTTP/1.1 {status}\r\n"
+            "Content-Type: text/plain; version=0.0.4\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+    except Exception as e:
+        logging.debug(f"[LLMM] Metrics request failed: {e}")
+    finally:
+        writer.close()
+
+
+async def serve_metrics(host=METRICS_HOST, port=METRICS_PORT, registry=metrics):
+    """Start the Prometheus text endpoint on the running loop and return the server."""
+    server = await asyncio.start_server(
+        lambda r, w: _handle_http(r, w, registry), host, port
+    )
+    logging.info(f"[LLMM] Metrics endpoint on http://{host}:{port}/metrics")
+    return server
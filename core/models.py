@@ -0,0 +1,222 @@
+"""
+Compact market model shared by the REST scanners, WS clients and dashboards.
+
+API responses carry dozens of fields per market; every component only reads
+a handful. `Market` keeps just those in `__slots__`, with repeated strings
+(slugs, titles, categories, dates) interned so thousands of markets share
+one copy of each. `market_catalog` is the process-wide registry: parse a
+payload once with `market_catalog.upsert(payload)` and every reader gets the
+same object.
+"""
+
+import sys
+from datetime import datetime, timezone
+
+_intern = sys.intern
+
+
+def _istr(value):
+    return _intern(value) if isinstance(value, str) else value
+
+
+def parse_prices(raw):
+    """Normalize `prices` payloads ([yes, no], "0.5", {"yes":..}) to a float tuple."""
+    if raw is None:
+        return ()
+    if isinstance(raw, dict):
+        raw = [raw.get("yes", raw.get("YES")), raw.get("no", raw.get("NO"))]
+    elif not isinstance(raw, (list, tuple)):
+        raw = [raw]
+    out = []
+    for p in raw:
+        try:
+            out.append(float(p))
+        except (TypeError, ValueError):
+            out.append(float("nan"))
+    return tuple(out)
+
+
+def parse_expiration(payload):
+    """Epoch seconds from `expirationTimestamp` (ms) or `expirationDate`, else None."""
+    ts = payload.get("expirationTimestamp")
+    if isinstance(ts, (int, float)):
+        return ts / 1000.0 if ts > 1e12 else float(ts)
+    date = payload.get("expirationDate")
+    if not isinstance(date, str):
+        return None
+    try:
+        dt = datetime.fromisoformat(date.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            dt = datetime.strptime(date, "%b %d, %Y")
+        except ValueError:
+            return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def parse_ts(value):
+    """Epoch seconds from an event timestamp: seconds, milliseconds, a numeric string or ISO-8601; else None."""
+    if isinstance(value, str):
+        try:
+            value = float(value)
+        except ValueError:
+            try:
+                dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+            except ValueError:
+                return None
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=timezone.utc)
+            return dt.timestamp()
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value != value:
+        return None
+    return value / 1000.0 if value > 1e12 else float(value)
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class Market:
+    __slots__ = ("id", "slug", "condition_id", "title", "prices", "expiration_date",
+                 "expiration_ts", "volume", "categories", "status")
+
+    def __init__(self, id=None, slug=None, condition_id=None, title=None, prices=(),
+                 expiration_date=None, expiration_ts=None, volume=0.0, categories=(), status=None):
+        self.id = id
+        self.slug = _istr(slug)
+        self.condition_id = _istr(condition_id)
+        self.title = _istr(title)
+        self.prices = prices
+        self.expiration_date = _istr(expiration_date)
+        self.expiration_ts = expiration_ts
+        self.volume = volume
+        self.categories = categories
+        self.status = _istr(status)
+
+    @classmethod
+    def from_payload(cls, d):
+        """Build from a REST `/markets` record or a WS market/price payload."""
+        cats = d.get("categories") or ()
+        return cls(
+            id=d.get("id"),
+            slug=d.get("slug"),
+            condition_id=market_key(d),
+            title=d.get("title"),
+            prices=parse_prices(d.get("prices")),
+            expiration_date=d.get("expirationDate"),
+            expiration_ts=parse_expiration(d),
+            volume=_to_float(d.get("volume")),
+            categories=tuple(_intern(c) for c in cats if isinstance(c, str)),
+            status=d.get("status"),
+        )
+
+    def update(self, d):
+        """Merge a (possibly partial) payload into this market in place."""
+        if "prices" in d:
+            self.prices = parse_prices(d["prices"])
+        if d.get("volume") is not None:
+            self.volume = _to_float(d["volume"])
+        if d.get("title"):
+            self.title = _intern(d["title"])
+        if d.get("slug") and not self.slug:
+            self.slug = _intern(d["slug"])
+        if d.get("id") is not None and self.id is None:
+            self.id = d["id"]
+        if d.get("status"):
+            self.status = _intern(d["status"])
+        if d.get("categories"):
+            self.categories = tuple(_intern(c) for c in d["categories"] if isinstance(c, str))
+        if "expirationDate" in d or "expirationTimestamp" in d:
+            self.expiration_date = _istr(d.get("expirationDate", self.expiration_date))
+            self.expiration_ts = parse_expiration(d)
+        return self
+
+    @property
+    def yes(self):
+        return self.prices[0] if self.prices else None
+
+    @property
+    def no(self):
+        return self.prices[1] if len(self.prices) > 1 else None
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "slug": self.slug,
+            "conditionId": self.condition_id,
+            "title": self.title,
+            "prices": list(self.prices),
+            "expirationDate": self.expiration_date,
+            "volume": self.volume,
+            "categories": list(self.categories),
+            "status": self.status,
+        }
+
+    def __repr__(self):
+        return f"Market({self.condition_id or self.slug or self.id!r}, {self.title!r}, prices={self.prices})"
+
+
+def market_key(d):
+    """The identifier the WS feed uses for a market (conditionId / address), falling back to slug/id."""
+    return (d.get("conditionId") or d.get("condition_id") or d.get("marketAddress")
+            or d.get("address") or d.get("slug") or d.get("id"))
+
+
+class MarketCatalog:
+    """Registry of `Market` objects keyed by conditionId, with slug and id indexes."""
+
+    def __init__(self):
+        self.by_key = {}
+        self.by_slug = {}
+        self.by_id = {}
+
+    def __len__(self):
+        return len(self.by_key)
+
+    def __contains__(self, key):
+        return key in self.by_key
+
+    def __iter__(self):
+        return iter(self.by_key.values())
+
+    def get(self, key, default=None):
+        return self.by_key.get(key) or self.by_slug.get(key) or self.by_id.get(key) or default
+
+    def upsert(self, payload):
+        """Parse `payload` once and return the shared Market (created or updated)."""
+        key = market_key(payload)
+        m = self.get(key) if key is not None else None
+        if m is None:
+            m = Market.from_payload(payload)
+            if m.condition_id is None:
+                return m
+            self.by_key[m.condition_id] = m
+        else:
+            m.update(payload)
+        if m.slug:
+            self.by_slug[m.slug] = m
+        if m.id is not None:
+            self.by_id[m.id] = m
+        return m
+
+    def upsert_many(self, payloads):
+        return [self.upsert(p) for p in payloads]
+
+    def title(self, key, default=None):
+        m = self.get(key)
+        return m.title if m and m.title else default
+
+    def remove(self, key):
+        m = self.by_key.pop(key, None)
+        if m is not None:
+            self.by_slug.pop(m.slug, None)
+            self.by_id.pop(m.id, None)
+        return m
+
+
+market_catalog = MarketCatalog()
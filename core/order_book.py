@@ -0,0 +1,247 @@
+"""
+Incremental L2 order book per market.
+
+Each side keeps a sorted array of price levels plus a {price: size} map:
+level updates are a bisect (O(log n)) into the array, best bid/ask and
+spread are O(1) reads of the array ends, and depth queries never touch
+REST. Books are fed from snapshot + delta events on the `/markets`
+namespace; a sequence gap marks the book stale and asks the caller to
+resnapshot it (`request_market_snapshot`). One resnapshot per book is in
+flight at a time; a reply without a book drops the stale levels and backs
+off (1s doubling to 60s) before the next request, while deltas keep being
+ignored until a real snapshot arrives.
+"""
+
+import bisect
+import logging
+import threading
+import time
+
+from core.models import market_key
+
+RESNAPSHOT_BACKOFF = 1.0
+RESNAPSHOT_BACKOFF_MAX = 60.0
+
+
+def _num(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_levels(levels):
+    """[(price, size)] from [[p, s], ...], [{"price": p, "size": s}, ...] or {p: s}."""
+    if isinstance(levels, dict):
+        levels = levels.items()
+    out = []
+    for lvl in levels or []:
+        if isinstance(lvl, dict):
+            price, size = lvl.get("price"), lvl.get("size", lvl.get("quantity", lvl.get("amount")))
+        elif isinstance(lvl, (list, tuple)) and len(lvl) >= 2:
+            price, size = lvl[0], lvl[1]
+        else:
+            continue
+        price, size = _num(price), _num(size)
+        if price is not None and size is not None:
+            out.append((price, size))
+    return out
+
+
+def event_seq(data):
+    for k in ("seq", "sequence", "seqNum", "nonce"):
+        if data.get(k) is not None:
+            try:
+                return int(data[k])
+            except (TypeError, ValueError):
+                return None
+    return None
+
+
+class BookSide:
+    """One side of a book: ascending price array + size map."""
+
+    __slots__ = ("prices", "sizes")
+
+    def __init__(self):
+        self.prices = []
+        self.sizes = {}
+
+    def clear(self):
+        self.prices = []
+        self.sizes = {}
+
+    def set(self, price, size):
+        """Set the resting size at `price`; size <= 0 removes the level."""
+        if size <= 0:
+            if self.sizes.pop(price, None) is not None:
+                i = bisect.bisect_left(self.prices, price)
+                del self.prices[i]
+            return
+        if price not in self.sizes:
+            bisect.insort(self.prices, price)
+        self.sizes[price] = size
+
+    def load(self, levels):
+        self.sizes = {p: s for p, s in levels if s > 0}
+        self.prices = sorted(self.sizes)
+
+    def __len__(self):
+        return len(self.prices)
+
+
+class OrderBook:
+    def __init__(self, market):
+        self.market = market
+        self.bids = BookSide()
+        self.asks = BookSide()
+        self.seq = None
+        self.stale = True
+        self.resnapshot_inflight = False
+        self.resnapshot_failures = 0
+        self.resnapshot_after = 0.0  # monotonic time before which no resnapshot is requested
+
+    # --- O(1) top of book ----------------------------------------------------
+
+    @property
+    def best_bid(self):
+        return self.bids.prices[-1] if self.bids.prices else None
+
+    @property
+    def best_ask(self):
+        return self.asks.prices[0] if self.asks.prices else None
+
+    @property
+    def spread(self):
+        bid, ask = self.best_bid, self.best_ask
+        return None if bid is None or ask is None else ask - bid
+
+    @property
+    def mid(self):
+        bid, ask = self.best_bid, self.best_ask
+        return None if bid is None or ask is None else (bid + ask) / 2
+
+    # --- depth ---------------------------------------------------------------
+
+    def _side(self, side):
+        return self.bids if str(side).lower() in ("bid", "bids", "buy") else self.asks
+
+    def depth_at(self, side, price):
+        """Resting size at exactly `price` on `side` ("bid"/"ask")."""
+        return self._side(side).sizes.get(float(price), 0.0)
+
+    def depth_to(self, side, price):
+        """Cumulative size from the top of `side` through `price` (inclusive)."""
+        s = self._side(side)
+        if s is self.bids:
+            levels = s.prices[bisect.bisect_left(s.prices, float(price)):]
+        else:
+            levels = s.prices[:bisect.bisect_right(s.prices, float(price))]
+        return sum(s.sizes[p] for p in levels)
+
+    def levels(self, side, n=10):
+        """Top `n` (price, size) levels of `side`, best first."""
+        s = self._side(side)
+        prices = s.prices[::-1][:n] if s is self.bids else s.prices[:n]
+        return [(p, s.sizes[p]) for p in prices]
+
+    # --- feed ----------------------------------------------------------------
+
+    def apply_snapshot(self, data):
+        self.bids.load(parse_levels(data.get("bids")))
+        self.asks.load(parse_levels(data.get("asks")))
+        self.seq = event_seq(data)
+        self.stale = False
+        self.resnapshot_inflight = False
+        self.resnapshot_failures = 0
+        self.resnapshot_after = 0.0
+
+    def request_resnapshot(self, now=None):
+        """True (and marks one in flight) when a stale book should be resnapshotted now."""
+        now = time.monotonic() if now is None else now
+        if not self.stale or self.resnapshot_inflight or now < self.resnapshot_after:
+            return False
+        self.resnapshot_inflight = True
+        return True
+
+    def resnapshot_failed(self):
+        """The resnapshot reply had no book: drop the stale levels and back off."""
+        self.resnapshot_inflight = False
+        self.resnapshot_failures += 1
+        delay = min(RESNAPSHOT_BACKOFF * 2 ** (self.resnapshot_failures - 1), RESNAPSHOT_BACKOFF_MAX)
+        self.resnapshot_after = time.monotonic() + delay
+        self.bids.clear()
+        self.asks.clear()
+        logging.warning(f"[LLMM] Book {self.market}: resnapshot returned no book; retrying in {delay:.0f}s")
+
+    def apply_delta(self, data):
+        """Apply a delta; returns False (and marks the book stale) on a sequence gap."""
+        seq = event_seq(data)
+        if self.stale:
+            return False
+        if seq is not None and self.seq is not None:
+            if seq <= self.seq:
+                return True  # duplicate / replayed delta
+            if seq != self.seq + 1:
+                logging.warning(f"[LLMM] Book {self.market}: seq gap {self.seq} → {seq}; resnapshot")
+                self.stale = True
+                return False
+        for price, size in parse_levels(data.get("bids")):
+            self.bids.set(price, size)
+        for price, size in parse_levels(data.get("asks")):
+            self.asks.set(price, size)
+        for change in data.get("changes") or []:
+            if isinstance(change, dict):
+                price, size = _num(change.get("price")), _num(change.get("size"))
+                if price is not None and size is not None:
+                    self._side(change.get("side", "bid")).set(price, size)
+        if seq is not None:
+            self.seq = seq
+        return True
+
+
+def is_book_payload(data):
+    return isinstance(data, dict) and ("bids" in data or "asks" in data or "changes" in data)
+
+
+def is_snapshot(event, data):
+    kind = str(data.get("type") or event or "").lower()
+    return "snapshot" in kind or data.get("snapshot") is True
+
+
+class OrderBookRegistry:
+    """All local books, keyed like the market catalog (conditionId / address)."""
+
+    def __init__(self):
+        self.books = {}
+        self._lock = threading.Lock()
+
+    def get(self, market):
+        return self.books.get(market)
+
+    def book(self, market):
+        b = self.books.get(market)
+        if b is None:
+            with self._lock:
+                b = self.books.setdefault(market, OrderBook(market))
+        return b
+
+    def handle(self, event, data):
+        """Route one book payload. Returns the market id if the caller should request a
+        resnapshot now (then report a reply without a book via `resnapshot_failed`), else None."""
+        market = market_key(data) or data.get("market")
+        if not isinstance(market, str):
+            return None
+        book = self.book(market)
+        if is_snapshot(event, data):
+            book.apply_snapshot(data)
+            return None
+        if book.apply_delta(data):
+            return None
+        return market if book.request_resnapshot() else None
+
+    def remove(self, market):
+        self.books.pop(market, None)
+
+
+order_books = OrderBookRegistry()
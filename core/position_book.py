@@ -0,0 +1,260 @@
+"""
+Streaming position book.
+
+Seeded once from REST (`LimitlessApiClient.get_positions`), then kept
+current from the WS positions channel. Per-market exposure and
+mark-to-market PnL are updated in O(1) on every position delta or price
+tick, with running totals, so dashboards never have to walk the book.
+Positions are keyed by (market, outcome), so YES and NO holdings of one
+market are tracked side by side. REST polling is used only as a fallback
+when the stream goes silent.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+
+from core.models import market_key, parse_prices
+
+OUTCOMES = ("YES", "NO")
+
+
+def _num(value, default=0.0):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+class Position:
+    __slots__ = ("market", "title", "side", "size", "avg_price", "mark", "exposure", "pnl")
+
+    def __init__(self, market, title=None, side="YES", size=0.0, avg_price=0.0, mark=None):
+        self.market = market
+        self.title = title
+        self.side = side
+        self.size = size
+        self.avg_price = avg_price
+        self.mark = avg_price if mark is None else mark
+        self.exposure = 0.0
+        self.pnl = 0.0
+        self.revalue()
+
+    def revalue(self):
+        self.exposure = self.size * self.mark
+        self.pnl = self.size * (self.mark - self.avg_price)
+
+    def to_record(self):
+        """The position as a REST-style record (`PositionBook.seed` reads it back)."""
+        return {"market": self.market, "title": self.title, "side": self.side, "size": self.size,
+                "avgPrice": self.avg_price, "markPrice": self.mark}
+
+
+def position_market(p):
+    """Market identifier of a REST/WS position record (market may be a dict or a string)."""
+    m = p.get("market")
+    if isinstance(m, dict):
+        return market_key(m)
+    return m or market_key(p)
+
+
+def position_key(p):
+    """(market, outcome) key of a REST/WS position record; None without a market."""
+    market = position_market(p)
+    if market is None:
+        return None
+    return market, str(p.get("side") or p.get("outcome") or "YES").upper()
+
+
+class PositionBook:
+    def __init__(self, silence_after=30.0, on_change=None, on_seed=None):
+        self.positions = {}
+        # Callbacks run after the book's lock is released, so they may read the book
+        self.on_change = on_change  # on_change(market, size_delta, avg_price), e.g. RiskEngine.on_position_change
+        self.on_seed = on_seed  # on_seed(positions) after a full seed, e.g. RiskEngine.seed_positions
+        self.total_exposure = 0.0
+        self.total_pnl = 0.0
+        self.silence_after = silence_after
+        self.last_stream_ts = None
+        self.last_seed_ts = None
+        self._lock = threading.Lock()
+
+    # --- O(1) readers --------------------------------------------------------
+
+    def exposure(self, market):
+        return sum(p.exposure for p in self._held(market))
+
+    def pnl(self, market):
+        return sum(p.pnl for p in self._held(market))
+
+    def holds(self, market):
+        return any(self._held(market))
+
+    def markets(self):
+        """Set of markets with a position on either side."""
+        with self._lock:
+            return {market for market, _ in self.positions}
+
+    def _held(self, market):
+        return [p for p in (self.positions.get((market, side)) for side in OUTCOMES) if p is not None]
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.positions.values())
+
+    @property
+    def stale(self):
+        last = self.last_stream_ts or self.last_seed_ts
+        return last is None or time.monotonic() - last > self.silence_after
+
+    # --- writers -------------------------------------------------------------
+
+    def _notify(self, changes):
+        """Run `on_change` for (market, size_delta, avg_price) changes; call without the lock held."""
+        if self.on_change is None:
+            return
+        for market, delta, avg_price in changes:
+            try:
+                self.on_change(market, delta, avg_price)
+            except Exception as e:
+                logging.warning(f"[LLMM] Position change callback failed for {market}: {e}")
+
+    @staticmethod
+    def _change(key, old_size, new_size, avg_price):
+        return [(key[0], new_size - old_size, avg_price)] if new_size != old_size else []
+
+    def _set(self, key, pos):
+        """Replace one position; returns its size change for `_notify`."""
+        old = self.positions.get(key)
+        if old is not None:
+            self.total_exposure -= old.exposure
+            self.total_pnl -= old.pnl
+        change = self._change(key, old.size if old else 0.0, pos.size if pos else 0.0,
+                              pos.avg_price if pos else old.avg_price if old else None)
+        self._apply_set(key, pos)
+        return change
+
+    def _apply_set(self, key, pos):
+        if pos is None or pos.size == 0:
+            self.positions.pop(key, None)
+            return
+        self.positions[key] = pos
+        self.total_exposure += pos.exposure
+        self.total_pnl += pos.pnl
+
+    def _from_record(self, key, p, prev):
+        m = p.get("market")
+        title = (m.get("title") if isinstance(m, dict) else None) or p.get("title") or (prev.title if prev else None)
+        market, side = key
+        if "sizeDelta" in p:
+            size = (prev.size if prev else 0.0) + _num(p["sizeDelta"])
+        else:
+            size = _num(p.get("size", p.get("amount", prev.size if prev else 0.0)))
+        avg = _num(p.get("avgPrice", p.get("averagePrice", p.get("entryPrice"))), prev.avg_price if prev else 0.0)
+        mark = p.get("markPrice", p.get("price"))
+        mark = _num(mark) if mark is not None else (prev.mark if prev else None)
+        return Position(market, title, side, size, avg, mark)
+
+    def seed(self, records):
+        """Replace the book with a full REST/WS positions list.
+
+        With `on_seed` set it receives the new positions; otherwise the size
+        changes go through `on_change` like stream deltas."""
+        changes = []
+        with self._lock:
+            marks = {k: p.mark for k, p in self.positions.items()}
+            sizes = {k: p.size for k, p in self.positions.items()}
+            self.positions = {}
+            self.total_exposure = 0.0
+            self.total_pnl = 0.0
+            for p in records or []:
+                key = position_key(p)
+                if key is None:
+                    continue
+                pos = self._from_record(key, p, None)
+                if key in marks and p.get("markPrice", p.get("price")) is None:
+                    pos.mark = marks[key]
+                    pos.revalue()
+                self._apply_set(key, pos)
+            if self.on_seed is None:
+                for key in sizes.keys() | self.positions.keys():
+                    pos = self.positions.get(key)
+                    changes += self._change(key, sizes.get(key, 0.0), pos.size if pos else 0.0,
+                                            pos.avg_price if pos else None)
+            seeded = list(self.positions.values())
+            self.last_seed_ts = time.monotonic()
+        self._notify(changes)
+        if self.on_seed is not None:
+            try:
+                self.on_seed(seeded)
+            except Exception as e:
+                logging.warning(f"[LLMM] Position seed callback failed: {e}")
+
+    def apply(self, event):
+        """Apply a WS positions event: a full list, a single record, or a `sizeDelta` update."""
+        if isinstance(event, dict) and isinstance(event.get("positions"), list):
+            records = event["positions"]
+            if event.get("snapshot", True) and not event.get("delta"):
+                self.seed(records)
+                self.last_stream_ts = time.monotonic()
+                return
+        elif isinstance(event, list):
+            records = event
+        else:
+            records = [event]
+        changes = []
+        with self._lock:
+            for p in records:
+                if not isinstance(p, dict):
+                    continue
+                key = position_key(p)
+                if key is None:
+                    continue
+                changes += self._set(key, self._from_record(key, p, self.positions.get(key)))
+            self.last_stream_ts = time.monotonic()
+        self._notify(changes)
+
+    def on_price(self, market, prices):
+        """Re-mark one market's positions from a price tick ([yes, no] or a scalar)."""
+        held = self._held(market)
+        if not held:
+            return
+        prices = parse_prices(prices)
+        if not prices:
+            return
+        with self._lock:
+            for p in held:
+                if p.side == "NO":
+                    mark = prices[1] if len(prices) > 1 else 1.0 - prices[0]
+                else:
+                    mark = prices[0]
+                if mark != mark:  # NaN from an unparseable price
+                    continue
+                self.total_exposure -= p.exposure
+                self.total_pnl -= p.pnl
+                p.mark = mark
+                p.revalue()
+                self.total_exposure += p.exposure
+                self.total_pnl += p.pnl
+
+    # --- REST fallback -------------------------------------------------------
+
+    def resync_if_silent(self, fetch):
+        """Synchronous fallback: reseed from `fetch()` (REST) when the stream is silent."""
+        if not self.stale:
+            return False
+        try:
+            self.seed(fetch())
+            logging.info("[LLMM] Position stream silent; reseeded from REST")
+            return True
+        except Exception as e:
+            logging.warning(f"[LLMM] Position REST fallback failed: {e}")
+            return False
+
+    async def run_fallback(self, fetch, interval=5.0):
+        """Poll `fetch` (a blocking REST call) in a thread only while the stream is silent."""
+        while True:
+            if self.stale:
+                await asyncio.to_thread(self.resync_if_silent, fetch)
+            await asyncio.sleep(interval)
@@ -0,0 +1,190 @@
+"""
+On-demand sampling profiler for long-running asyncio processes.
+
+A background thread samples the event-loop thread's stack at a fixed
+interval and tags each sample with the asyncio task that was running, so
+time is attributed per coroutine. Samples are aggregated as folded stacks
+(`task:name;file:func;... microseconds`), the input format of flamegraph.pl,
+speedscope and inferno. The feed keeps running while profiling.
+
+Toggle it with SIGUSR2 or the local control socket:
+
+    echo start | nc 127.0.0.1 9465
+    echo stop  | nc 127.0.0.1 9465   # dumps profiles/llmm-<ts>.folded
+"""
+
+import asyncio
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+
+PROFILER_HOST = "127.0.0.1"
+PROFILER_PORT = int(os.getenv("PROFILER_PORT", "9465"))
+PROFILE_DIR = "profiles"
+
+# Frames inside the loop's poll call mean the loop was waiting on I/O, not working.
+_IDLE_FUNCS = {"select", "poll"}
+
+
+class SamplingProfiler:
+    def __init__(self, interval=0.005, output_dir=PROFILE_DIR, max_depth=64):
+        self.interval = interval
+        self.output_dir = output_dir
+        self.max_depth = max_depth
+        self.loop = None
+        self.samples = {}
+        self.total = 0
+        self.started_at = None
+        self._thread_id = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def attach(self, loop=None):
+        """Bind to the loop (and its thread) that should be sampled."""
+        self.loop = loop or asyncio.get_running_loop()
+        self._thread_id = threading.get_ident()
+        return self
+
+    def start(self):
+        if self.running:
+            return False
+        if self._thread_id is None:
+            self.attach()
+        self.samples = {}
+        self.total = 0
+        self.started_at = time.time()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample_loop, name="llmm-profiler", daemon=True)
+        self._thread.start()
+        logging.info(f"[LLMM] Profiler started ({self.interval * 1000:.1f}ms interval)")
+        return True
+
+    def stop(self):
+        """Stop sampling and dump the profile. Returns the output path (or None)."""
+        if not self.running:
+            return None
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        path = self.dump()
+        logging.info(f"[LLMM] Profiler stopped: {self.total / 1e6:.1f}s sampled → {path}")
+        return path
+
+    def toggle(self):
+        return self.stop() if self.running else self.start()
+
+    def _sample_loop(self):
+        # Samples are weighted by the wall time (µs) since the previous one: while
+        # the loop thread holds the GIL this thread wakes late, and unweighted
+        # counts would over-represent idle time spent in select().
+        frames = sys._current_frames
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            weight = int((now - last) * 1_000_000)
+            last = now
+            frame = frames().get(self._thread_id)
+            if frame is None:
+                continue
+            key = self._fold(frame)
+            self.samples[key] = self.samples.get(key, 0) + weight
+            self.total += weight
+
+    def _fold(self, frame):
+        parts = []
+        depth = 0
+        while frame is not None and depth < self.max_depth:
+            code = frame.f_code
+            parts.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+            depth += 1
+        parts.reverse()
+        leaf = parts[-1].rsplit(":", 1)[-1] if parts else ""
+        if leaf in _IDLE_FUNCS:
+            return "idle"
+        try:
+            task = asyncio.current_task(self.loop)
+        except RuntimeError:
+            task = None
+        prefix = f"task:{task.get_name()}" if task else "loop"
+        return ";".join([prefix] + parts)
+
+    def dump(self, path=None):
+        if not self.samples:
+            return None
+        if path is None:
+            os.makedirs(self.output_dir, exist_ok=True)
+            stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started_at or time.time()))
+            path = os.path.join(self.output_dir, f"llmm-{stamp}.folded")
+        with open(path, "w") as f:
+            for stack, count in sorted(dict(self.samples).items(), key=lambda kv: -kv[1]):
+                f.write(f"{stack} {count}\n")
+        return path
+
+    def top(self, n=10):
+        """Return the `n` hottest coroutines/tasks as (name, share) pairs."""
+        by_task = {}
+        for stack, count in dict(self.samples).items():
+            task = stack.split(";", 1)[0]
+            by_task[task] = by_task.get(task, 0) + count
+        total = self.total or 1
+        return sorted(((k, v / total) for k, v in by_task.items()), key=lambda kv: -kv[1])[:n]
+
+
+def install_signal_toggle(profiler, sig=None):
+    """Toggle `profiler` on SIGUSR2 (no-op on platforms without it)."""
+    sig = sig or getattr(signal, "SIGUSR2", None)
+    if sig is None:
+        return False
+    loop = profiler.loop or asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(sig, profiler.toggle)
+    except (NotImplementedError, RuntimeError):
+        return False
+    return True
+
+
+async def _handle_control(reader, writer, profiler):
+    try:
+        line = await asyncio.wait_for(reader.readline(), timeout=5)
+        cmd = line.decode(errors="replace").strip().lower()
+        if cmd == "start":
+            reply = "started" if profiler.start() else "already running"
+        elif cmd == "stop":
+            path = profiler.stop()
+            reply = f"stopped {path}" if path else "not running"
+        elif cmd == "toggle":
+            result = profiler.toggle()
+            reply = "started" if result is True else f"stopped {result}"
+        elif cmd == "dump":
+            reply = f"dumped {profiler.dump()}"
+        elif cmd == "status":
+            state = "running" if profiler.running else "idle"
+            hot = ", ".join(f"{name} {share:.0%}" for name, share in profiler.top(5))
+            reply = f"{state} sampled={profiler.total / 1e6:.1f}s {hot}".strip()
+        else:
+            reply = "commands: start | stop | toggle | dump | status"
+        writer.write((reply + "\n").encode())
+        await writer.drain()
+    except Exception as e:
+        logging.debug(f"[LLMM] Profiler control error: {e}")
+    finally:
+        writer.close()
+
+
+async def serve_profiler_control(profiler, host=PROFILER_HOST, port=PROFILER_PORT):
+    """Attach `profiler` to the running loop and serve the control socket."""
+    if profiler.loop is None:
+        profiler.attach()
+    server = await asyncio.start_server(
+        lambda r, w: _handle_control(r, w, profiler), host, port
+    )
+    logging.info(f"[LLMM] Profiler control on {host}:{port}")
+    return server
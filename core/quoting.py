@@ -0,0 +1,181 @@
+"""
+Vectorized quoting kernel.
+
+Computes bid/ask prices and sizes for every subscribed market in one NumPy
+pass (Avellaneda–Stoikov style): the reservation price is skewed against
+inventory, and the spread widens with volatility and time to expiration.
+Time to expiration comes from each market's `expirationDate` /
+`expirationTimestamp` (`Market.expiration_ts`). `QuotingKernel.requote`
+keeps the previous quote arrays and returns only the rows that moved, as
+`Quote` objects ready for `MarketManager` / `TradingClient`;
+`KernelStrategy` wraps a kernel as a `Strategy` for the runtime and the
+backtester.
+"""
+
+import time
+
+import numpy as np
+
+from core.market_manager_async import Quote, Strategy, Withdraw
+from core.models import parse_prices, parse_ts
+from core.position_book import position_key
+
+TICK = 0.01
+DAY = 86400.0
+
+
+class QuoteParams:
+    __slots__ = ("gamma", "k", "base_size", "max_inventory", "tick", "min_tte")
+
+    def __init__(self, gamma=0.1, k=100.0, base_size=10.0, max_inventory=100.0, tick=TICK, min_tte=60.0):
+        self.gamma = gamma  # risk aversion
+        self.k = k  # order-arrival decay: larger k → tighter spread
+        self.base_size = base_size
+        self.max_inventory = max_inventory
+        self.tick = tick
+        self.min_tte = min_tte  # seconds; floor so expiring markets don't collapse the spread
+
+
+def time_to_expiry(expiration_ts, now=None, min_tte=60.0):
+    """Days to expiration per market from epoch-second timestamps (NaN = unknown → 1 day)."""
+    now = time.time() if now is None else now
+    tte = (np.asarray(expiration_ts, dtype=np.float64) - now)
+    tte = np.where(np.isnan(tte), DAY, tte)
+    return np.maximum(tte, min_tte) / DAY
+
+
+def compute_quotes(mids, inventories, sigmas, tte, params=None):
+    """One vectorized pass over all markets. Returns (bid, ask, bid_size, ask_size) arrays.
+
+    mids are YES probabilities in (0, 1); sigmas are daily volatilities of the
+    mid; tte is in days. Markets with a NaN mid get NaN prices and zero size.
+    """
+    p = params or QuoteParams()
+    mids = np.asarray(mids, dtype=np.float64)
+    q = np.asarray(inventories, dtype=np.float64)
+    var_t = np.square(np.asarray(sigmas, dtype=np.float64)) * np.asarray(tte, dtype=np.float64)
+
+    reservation = mids - q * p.gamma * var_t
+    half_spread = 0.5 * (p.gamma * var_t + (2.0 / p.gamma) * np.log1p(p.gamma / p.k))
+    half_spread = np.maximum(half_spread, p.tick)
+
+    bid = np.floor((reservation - half_spread) / p.tick + 1e-9) * p.tick
+    ask = np.ceil((reservation + half_spread) / p.tick - 1e-9) * p.tick
+    bid = np.clip(bid, p.tick, 1.0 - 2 * p.tick)
+    ask = np.clip(np.maximum(ask, bid + p.tick), 2 * p.tick, 1.0 - p.tick)
+
+    skew = q / p.max_inventory
+    bid_size = p.base_size * np.clip(1.0 - skew, 0.0, 1.0)
+    ask_size = p.base_size * np.clip(1.0 + skew, 0.0, 1.0)
+    dead = np.isnan(mids)
+    bid_size[dead] = 0.0
+    ask_size[dead] = 0.0
+    return np.round(bid, 4), np.round(ask, 4), bid_size, ask_size
+
+
+def changed_rows(new, old, tol=1e-9):
+    """Indices where any of the (bid, ask, bid_size, ask_size) arrays moved by more than `tol`."""
+    if old is None:
+        return np.flatnonzero(np.ones(len(new[0]), dtype=bool))
+    moved = np.zeros(len(new[0]), dtype=bool)
+    for a, b in zip(new, old):
+        # Same as ~isclose(a, b, atol=tol, equal_nan=True) without isclose's per-call overhead
+        moved |= (np.abs(a - b) > tol) | (np.isnan(a) != np.isnan(b))
+    return np.flatnonzero(moved)
+
+
+class QuotingKernel:
+    """Holds per-market input arrays aligned with `markets` and the last quotes sent."""
+
+    def __init__(self, markets, params=None):
+        self.markets = list(markets)
+        self.index = {m: i for i, m in enumerate(self.markets)}
+        n = len(self.markets)
+        self.params = params or QuoteParams()
+        self.mids = np.full(n, np.nan)
+        self.inventories = np.zeros(n)
+        self.sigmas = np.full(n, 0.05)
+        self.expiration_ts = np.full(n, np.nan)
+        self.last = None
+
+    @classmethod
+    def from_catalog(cls, catalog, markets, params=None):
+        k = cls(markets, params)
+        for i, m in enumerate(k.markets):
+            mk = catalog.get(m)
+            if mk is None:
+                continue
+            if mk.prices:
+                k.mids[i] = mk.prices[0]
+            if mk.expiration_ts:
+                k.expiration_ts[i] = mk.expiration_ts
+        return k
+
+    def set_mid(self, market, mid):
+        i = self.index.get(market)
+        if i is not None:
+            self.mids[i] = mid
+
+    def set_inventory(self, market, size):
+        i = self.index.get(market)
+        if i is not None:
+            self.inventories[i] = size
+
+    def requote(self, now=None):
+        """Recompute every market; return Quote objects for the rows that changed.
+
+        A changed row with no size on either side (dead mid, or both sides
+        clipped) yields a `Withdraw` so its resting orders get cancelled.
+        """
+        tte = time_to_expiry(self.expiration_ts, now, self.params.min_tte)
+        new = compute_quotes(self.mids, self.inventories, self.sigmas, tte, self.params)
+        rows = changed_rows(new, self.last)
+        self.last = new
+        bid, ask, bid_size, ask_size = new
+        out = []
+        for i in rows.tolist():
+            if bid_size[i] > 0:
+                out.append(Quote(self.markets[i], "BUY", float(bid[i]), float(bid_size[i])))
+            if ask_size[i] > 0:
+                out.append(Quote(self.markets[i], "SELL", float(ask[i]), float(ask_size[i])))
+            if not (bid_size[i] > 0 or ask_size[i] > 0):
+                out.append(Withdraw(self.markets[i]))
+        return out
+
+
+class KernelStrategy(Strategy):
+    """Quote `markets` with a QuotingKernel: mids from price events, inventory from position events."""
+
+    def __init__(self, markets, params=None, name="kernel", sigma=None, expiration_ts=None):
+        self.name = name
+        self.markets = set(markets)
+        self.kernel = QuotingKernel(markets, params)
+        self.holdings = {}  # (market, outcome) -> shares; inventory is YES minus NO
+        if sigma is not None:
+            self.kernel.sigmas[:] = sigma
+        for m, ts in (expiration_ts or {}).items():
+            i = self.kernel.index.get(m)
+            if i is not None and ts:
+                self.kernel.expiration_ts[i] = ts
+
+    def on_price(self, market, update):
+        # runner feed publishes {"price": ...}; REST / backtest rows carry "prices"
+        prices = parse_prices(update.get("prices")) or parse_prices(update.get("price"))
+        if not prices:
+            return None
+        self.kernel.set_mid(market, prices[0])
+        return self.kernel.requote(parse_ts(update.get("ts") or update.get("timestamp")))
+
+    def on_position(self, update):
+        try:
+            size = float(update.get("size"))
+        except (TypeError, ValueError):
+            return None
+        key = position_key(update)
+        if key is None:
+            return None
+        self.holdings[key] = size
+        market = key[0]
+        net = self.holdings.get((market, "YES"), 0.0) - self.holdings.get((market, "NO"), 0.0)
+        self.kernel.set_inventory(market, net)
+        return self.kernel.requote(parse_ts(update.get("ts") or update.get("timestamp")))
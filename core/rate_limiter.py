@@ -0,0 +1,207 @@
+"""
+Client-side rate-limit scheduler shared by every REST caller.
+
+A token bucket meters requests; callers that have to wait queue in strict
+priority order (order submission > positions > market data > scans), so a
+burst of catalog crawling never delays an order. 429/503 responses (and
+their `Retry-After`) pause the bucket and halve the rate; successes grow it
+back additively (AIMD). `request` retries throttled idempotent calls only:
+a POST (an order submit) may have been applied before a 503, so it is
+returned to the caller instead of being sent twice. Time spent queued is
+recorded per priority in `llmm_ratelimit_wait_seconds`.
+
+Order calls (`/orders`) go through their own bucket, `order_scheduler`
+(ORDER_RATE_LIMIT_RPS), so crawls can't spend the order budget and order
+bursts aren't capped at the shared REST rate. `no_limit` skips limiting
+altogether (benchmarks against a local stub).
+
+Works from threads (`acquire`, `request`) and coroutines (`acquire_async`).
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+
+from core.metrics import metrics
+
+ORDER, POSITIONS, MARKET_DATA, SCAN = 0, 1, 2, 3
+PRIORITY_NAMES = {ORDER: "order", POSITIONS: "positions", MARKET_DATA: "market_data", SCAN: "scan"}
+
+RATE_LIMIT_RPS = float(os.getenv("RATE_LIMIT_RPS", "10"))
+RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", "20"))
+ORDER_RATE_LIMIT_RPS = float(os.getenv("ORDER_RATE_LIMIT_RPS", "50"))
+ORDER_RATE_LIMIT_BURST = int(os.getenv("ORDER_RATE_LIMIT_BURST", "100"))
+THROTTLE_STATUSES = (429, 503)
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+
+def parse_retry_after(value, default=None):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return default
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return default
+
+
+class RateLimitScheduler:
+    def __init__(self, rate=RATE_LIMIT_RPS, burst=RATE_LIMIT_BURST, min_rate=0.5):
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min_rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self._last = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._waiters = []
+        self._seq = itertools.count()
+
+    # --- core bucket logic (call with the lock held) -----------------------
+
+    def _try_take(self, ticket):
+        """0 if `ticket` got a token, else seconds until it is worth checking again."""
+        if self._waiters[0] != ticket:
+            return 0.01
+        now = time.monotonic()
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        self.tokens = min(self.burst, self.tokens + (now - self._last) * self.rate)
+        self._last = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            heapq.heappop(self._waiters)
+            self._cond.notify_all()
+            return 0
+        return (1.0 - self.tokens) / self.rate
+
+    def _enqueue(self, priority):
+        ticket = (priority, next(self._seq))
+        heapq.heappush(self._waiters, ticket)
+        return ticket
+
+    def _abandon(self, ticket):
+        try:
+            self._waiters.remove(ticket)
+            heapq.heapify(self._waiters)
+            self._cond.notify_all()
+        except ValueError:
+            pass
+
+    def _record_wait(self, priority, t0):
+        metrics.observe("llmm_ratelimit_wait_seconds", time.monotonic() - t0,
+                        priority=PRIORITY_NAMES.get(priority, str(priority)))
+
+    # --- public API ----------------------------------------------------------
+
+    def acquire(self, priority=MARKET_DATA):
+        """Block the calling thread until a request slot is granted.
+
+        Not for event-loop threads: blocking there stalls the coroutines that
+        would free the queue ahead of us. Use `acquire_async` (or run the call
+        with `asyncio.to_thread`)."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            raise RuntimeError("RateLimitScheduler.acquire called on an event-loop thread; "
+                               "await acquire_async() or run the request in asyncio.to_thread")
+        t0 = time.monotonic()
+        with self._cond:
+            ticket = self._enqueue(priority)
+            try:
+                while True:
+                    wait = self._try_take(ticket)
+                    if not wait:
+                        break
+                    self._cond.wait(wait)
+            except BaseException:
+                self._abandon(ticket)
+                raise
+        self._record_wait(priority, t0)
+
+    async def acquire_async(self, priority=MARKET_DATA):
+        """Await a request slot without blocking the event loop."""
+        t0 = time.monotonic()
+        with self._lock:
+            ticket = self._enqueue(priority)
+        try:
+            while True:
+                with self._lock:
+                    wait = self._try_take(ticket)
+                if not wait:
+                    break
+                await asyncio.sleep(wait)
+        except BaseException:
+            with self._lock:
+                self._abandon(ticket)
+            raise
+        self._record_wait(priority, t0)
+
+    def observe(self, status, retry_after=None):
+        """Feed a response status back: throttle on 429/503, recover slowly on success."""
+        with self._lock:
+            if status in THROTTLE_STATUSES:
+                pause = parse_retry_after(retry_after, default=1.0 / self.rate * 2)
+                self._blocked_until = max(self._blocked_until, time.monotonic() + pause)
+                self.rate = max(self.min_rate, self.rate / 2)
+                self.tokens = 0.0
+                metrics.inc("llmm_ratelimit_throttled_total", status=status)
+                logging.warning(f"[LLMM] Throttled ({status}); pausing {pause:.1f}s, rate → {self.rate:.2f}/s")
+            elif self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+            metrics.set_gauge("llmm_ratelimit_rate", round(self.rate, 3))
+
+    def queued(self):
+        return len(self._waiters)
+
+    def request(self, method, url, priority=MARKET_DATA, session=None, retries=3, **kwargs):
+        """requests-style call through the scheduler; retries throttled responses of idempotent methods."""
+        http = session or requests
+        if method.upper() not in IDEMPOTENT_METHODS:
+            retries = 0
+        for attempt in range(retries + 1):
+            self.acquire(priority)
+            resp = http.request(method, url, **kwargs)
+            self.observe(resp.status_code, resp.headers.get("Retry-After"))
+            if resp.status_code not in THROTTLE_STATUSES or attempt == retries:
+                return resp
+        return resp
+
+
+class Unlimited:
+    """Scheduler stand-in that never waits."""
+
+    def acquire(self, priority=MARKET_DATA):
+        pass
+
+    async def acquire_async(self, priority=MARKET_DATA):
+        pass
+
+    def observe(self, status, retry_after=None):
+        pass
+
+    def queued(self):
+        return 0
+
+    def request(self, method, url, priority=MARKET_DATA, session=None, retries=0, **kwargs):
+        return (session or requests).request(method, url, **kwargs)
+
+
+scheduler = RateLimitScheduler()
+order_scheduler = RateLimitScheduler(ORDER_RATE_LIMIT_RPS, ORDER_RATE_LIMIT_BURST)
+no_limit = Unlimited()
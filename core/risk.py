@@ -0,0 +1,282 @@
+"""
+Incremental pre-trade risk engine.
+
+Keeps running aggregates per market, per category (`core.categories`) and
+for the wallet: filled notional, net position and open-order exposure.
+Every order is checked against the limits in constant time (three dict
+lookups, no walk over positions); aggregates move on order open, fill and
+cancel; fills are read off position changes (`PositionBook(on_change=
+engine.on_position_change, on_seed=engine.seed_positions)`): filled
+exposure is reset from every full positions seed, open-order reservations
+are kept apart. `TradingClient(risk=...)` reserves every
+order before signing and raises `RiskLimitExceeded` when a limit would be
+breached.
+"""
+
+import logging
+import os
+import threading
+
+from core.categories import category_slug
+from core.metrics import metrics
+
+
+class RiskLimitExceeded(RuntimeError):
+    pass
+
+
+def _limit(env, default):
+    value = os.getenv(env)
+    return float(value) if value else default
+
+
+class RiskLimits:
+    """Limits in USDC notional (and shares for positions); None disables a limit."""
+
+    __slots__ = ("max_order_notional", "max_market_exposure", "max_category_exposure",
+                 "max_wallet_exposure", "max_market_position", "max_open_orders")
+
+    def __init__(self, max_order_notional=_limit("RISK_MAX_ORDER", 250.0),
+                 max_market_exposure=_limit("RISK_MAX_MARKET", 1000.0),
+                 max_category_exposure=_limit("RISK_MAX_CATEGORY", 5000.0),
+                 max_wallet_exposure=_limit("RISK_MAX_WALLET", 20000.0),
+                 max_market_position=None, max_open_orders=None):
+        self.max_order_notional = max_order_notional
+        self.max_market_exposure = max_market_exposure
+        self.max_category_exposure = max_category_exposure
+        self.max_wallet_exposure = max_wallet_exposure
+        self.max_market_position = max_market_position
+        self.max_open_orders = max_open_orders
+
+    @classmethod
+    def from_config(cls, cfg):
+        cfg = cfg or {}
+        limits = cls()
+        for name in cls.__slots__:
+            if name in cfg:
+                setattr(limits, name, None if cfg[name] is None else float(cfg[name]))
+        return limits
+
+
+class Exposure:
+    """Running aggregate for one scope (market, category or wallet)."""
+
+    __slots__ = ("notional", "net_position", "open_exposure", "open_orders")
+
+    def __init__(self):
+        self.notional = 0.0  # signed filled notional at cost
+        self.net_position = 0.0  # signed shares (BUY +, SELL -)
+        self.open_exposure = 0.0  # notional resting in open orders
+        self.open_orders = 0
+
+    @property
+    def gross(self):
+        return abs(self.notional) + self.open_exposure
+
+
+class OpenOrder:
+    __slots__ = ("market", "category", "sign", "price", "remaining")
+
+    def __init__(self, market, category, sign, price, remaining):
+        self.market = market
+        self.category = category
+        self.sign = sign
+        self.price = price
+        self.remaining = remaining
+
+
+def catalog_category(market):
+    """Default category lookup: first category of the market in the shared catalog."""
+    from core.models import market_catalog
+    m = market_catalog.get(market)
+    return m.categories[0] if m is not None and m.categories else None
+
+
+def _sign(side):
+    return -1.0 if str(side).upper() in ("SELL", "1", "ASK", "NO") else 1.0
+
+
+class RiskEngine:
+    def __init__(self, limits=None, category_of=None):
+        self.limits = limits or RiskLimits()
+        self.category_of = category_of or catalog_category
+        self.markets = {}
+        self.categories = {}
+        self.wallet = Exposure()
+        self.orders = {}
+        self._lock = threading.RLock()
+
+    def _scopes(self, market, category):
+        m = self.markets.get(market)
+        if m is None:
+            m = self.markets[market] = Exposure()
+        c = None
+        if category is not None:
+            c = self.categories.get(category)
+            if c is None:
+                c = self.categories[category] = Exposure()
+        return m, c
+
+    def _category(self, market):
+        cat = self.category_of(market)
+        return category_slug(cat) if cat else None
+
+    # --- pre-trade -----------------------------------------------------------
+
+    def check(self, market, side, price, size):
+        """Raise RiskLimitExceeded if the order would breach a limit. O(1)."""
+        lim = self.limits
+        notional = price * size
+        category = self._category(market)
+        m, c = self.markets.get(market), self.categories.get(category)
+        breach = None
+        if lim.max_order_notional is not None and notional > lim.max_order_notional:
+            breach = f"order notional {notional:.2f} > {lim.max_order_notional:.2f}"
+        elif lim.max_market_exposure is not None and (m.gross if m else 0.0) + notional > lim.max_market_exposure:
+            breach = f"market {market} exposure would reach {(m.gross if m else 0.0) + notional:.2f} > {lim.max_market_exposure:.2f}"
+        elif (lim.max_category_exposure is not None and category is not None
+              and (c.gross if c else 0.0) + notional > lim.max_category_exposure):
+            breach = f"category {category} exposure would reach {(c.gross if c else 0.0) + notional:.2f} > {lim.max_category_exposure:.2f}"
+        elif lim.max_wallet_exposure is not None and self.wallet.gross + notional > lim.max_wallet_exposure:
+            breach = f"wallet exposure would reach {self.wallet.gross + notional:.2f} > {lim.max_wallet_exposure:.2f}"
+        elif (lim.max_market_position is not None
+              and abs((m.net_position if m else 0.0) + _sign(side) * size) > lim.max_market_position):
+            breach = f"market {market} position would exceed {lim.max_market_position:g}"
+        elif lim.max_open_orders is not None and self.wallet.open_orders + 1 > lim.max_open_orders:
+            breach = f"open orders would exceed {lim.max_open_orders:g}"
+        if breach:
+            metrics.inc("llmm_risk_rejections_total")
+            raise RiskLimitExceeded(breach)
+
+    def reserve(self, order_id, market, side, price, size):
+        """Atomically check an order and book it as open exposure."""
+        with self._lock:
+            if order_id in self.orders:
+                raise ValueError(f"order {order_id} is already reserved")
+            self.check(market, side, price, size)
+            self.on_order_open(order_id, market, side, price, size)
+
+    # --- lifecycle -----------------------------------------------------------
+
+    def on_order_open(self, order_id, market, side, price, size):
+        with self._lock:
+            category = self._category(market)
+            o = self.orders[order_id] = OpenOrder(market, category, _sign(side), price, size)
+            for agg in (*self._scopes(market, category), self.wallet):
+                if agg is not None:
+                    agg.open_exposure += o.price * o.remaining
+                    agg.open_orders += 1
+
+    def on_fill(self, order_id, size, price=None):
+        """Move `size` shares of an open order from open exposure into the position."""
+        with self._lock:
+            o = self.orders.get(order_id)
+            if o is None:
+                logging.warning(f"[LLMM] Risk: fill for unknown order {order_id}")
+                return
+            self._fill(order_id, o, size, price)
+
+    def _fill(self, order_id, o, size, price=None, book=True):
+        size = min(size, o.remaining)
+        fill_price = o.price if price is None else price
+        o.remaining -= size
+        done = o.remaining <= 1e-12
+        for agg in (*self._scopes(o.market, o.category), self.wallet):
+            if agg is not None:
+                agg.open_exposure -= o.price * size
+                if book:
+                    agg.notional += o.sign * fill_price * size
+                    agg.net_position += o.sign * size
+                if done:
+                    agg.open_orders -= 1
+        if done:
+            del self.orders[order_id]
+        return size
+
+    def _match(self, market, delta, book=True):
+        """Fill this market's open orders in the direction of `delta`, oldest first.
+        Returns the signed shares no open order accounts for."""
+        sign = 1.0 if delta > 0 else -1.0
+        left = abs(delta)
+        for order_id, o in list(self.orders.items()):
+            if left <= 1e-12:
+                break
+            if o.market == market and o.sign == sign:
+                left -= self._fill(order_id, o, left, book=book)
+        return sign * left if left > 1e-12 else 0.0
+
+    def _book(self, market, category, shares, notional):
+        for agg in (*self._scopes(market, category), self.wallet):
+            if agg is not None:
+                agg.notional += notional
+                agg.net_position += shares
+
+    def on_position_change(self, market, delta, avg_price=None):
+        """Book a position change from the positions stream as fills of this market's
+        open orders in the same direction, oldest first. Shares no open order accounts
+        for (orders of an earlier session, manual trades) are booked at `avg_price`."""
+        if not delta:
+            return
+        with self._lock:
+            left = self._match(market, delta)
+            if left:
+                self._book(market, self._category(market), left, left * (avg_price or 0.0))
+
+    def seed_positions(self, positions):
+        """Reset filled exposure from a full positions list (`Position` objects: REST
+        seed, snapshot restore, resync). Open-order reservations are kept; shares the
+        list adds beyond the booked position release matching open orders first."""
+        with self._lock:
+            held = {}
+            for p in positions:
+                shares, cost = held.get(p.market, (0.0, 0.0))
+                held[p.market] = (shares + p.size, cost + p.size * p.avg_price)
+            for market in held.keys() | self.markets.keys():
+                m = self.markets.get(market)
+                delta = held.get(market, (0.0, 0.0))[0] - (m.net_position if m else 0.0)
+                if delta:
+                    self._match(market, delta, book=False)
+            for agg in (*self.markets.values(), *self.categories.values(), self.wallet):
+                agg.notional = 0.0
+                agg.net_position = 0.0
+            for market, (shares, cost) in held.items():
+                self._book(market, self._category(market), shares, cost)
+
+    def on_cancel(self, order_id):
+        with self._lock:
+            o = self.orders.pop(order_id, None)
+            if o is None:
+                return
+            for agg in (*self._scopes(o.market, o.category), self.wallet):
+                if agg is not None:
+                    agg.open_exposure -= o.price * o.remaining
+                    agg.open_orders -= 1
+
+    def rekey(self, old_id, new_id):
+        """Re-index an open order under the exchange id once the venue acks it."""
+        with self._lock:
+            o = self.orders.pop(old_id, None)
+            if o is not None:
+                self.orders[new_id] = o
+
+    def exposure(self, market):
+        return self.markets.get(market) or Exposure()
+
+
+def order_terms(order_struct):
+    """(market, side, price, size) of a signed-order struct.
+
+    Amounts are 6-decimal USDC/shares: a BUY pays makerAmount USDC for
+    takerAmount shares, a SELL gives makerAmount shares for takerAmount USDC.
+    The market (conditionId) must be set as `order_struct["market"]`: the
+    tokenId alone does not identify the market's category.
+    """
+    market = order_struct.get("market")
+    if not market:
+        raise ValueError("order_struct has no 'market' (conditionId); risk limits need it")
+    msg = order_struct["message"]
+    maker, taker = int(msg["makerAmount"]) / 1e6, int(msg["takerAmount"]) / 1e6
+    side = "SELL" if int(msg.get("side", 0)) == 1 else "BUY"
+    size = taker if side == "BUY" else maker
+    price = (maker / taker if side == "BUY" else taker / maker) if taker and maker else 0.0
+    return market, side, price, size
@@ -0,0 +1,116 @@
+"""
+Persistent auth session cache.
+
+The Limitless login handshake (signing message, sign, login, verify) costs
+four round-trips and a signature. A successful login is stored per wallet
+in `~/.llmm/<kind>-<address>.json` (directory 0700, file 0600, written
+atomically) with its expiry, so later runs reuse the cookie/token until
+shortly before it expires. `schedule_refresh` re-logs in the background
+ahead of expiry so long-running processes never hit a stale session.
+"""
+
+import base64
+import json
+import logging
+import os
+import threading
+import time
+
+SESSION_DIR = os.getenv("LLMM_SESSION_DIR", os.path.join(os.path.expanduser("~"), ".llmm"))
+SESSION_TTL = int(os.getenv("SESSION_TTL", str(12 * 3600)))  # when the server gives no expiry
+REFRESH_LEAD = int(os.getenv("SESSION_REFRESH_LEAD", "300"))  # refresh this many seconds early
+COOKIE_NAME = "limitless_session"
+
+
+def _path(address, directory=None, kind="session"):
+    return os.path.join(directory or SESSION_DIR, f"{kind}-{address.lower()}.json")
+
+
+def load(address, directory=None, margin=REFRESH_LEAD, kind="session"):
+    """Return the cached entry for `address` if it is valid for at least `margin` seconds.
+
+    `kind` separates credentials with different lifetimes: "session" for the
+    REST/WS cookie, "token" for the trading API bearer token.
+    """
+    try:
+        with open(_path(address, directory, kind)) as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if entry.get("expires_at", 0) - margin <= time.time():
+        return None
+    return entry
+
+
+def save(address, cookie=None, token=None, expires_at=None, directory=None, kind="session"):
+    """Atomically write the session for `address` with owner-only permissions."""
+    directory = directory or SESSION_DIR
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    entry = {
+        "address": address,
+        "cookie": cookie,
+        "token": token,
+        "expires_at": expires_at or (time.time() + SESSION_TTL),
+        "saved_at": time.time(),
+    }
+    path = _path(address, directory, kind)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        json.dump(entry, f)
+    os.replace(tmp, path)
+    return entry
+
+
+def invalidate(address, directory=None, kind="session"):
+    try:
+        os.remove(_path(address, directory, kind))
+    except FileNotFoundError:
+        pass
+
+
+def jwt_expiry(token):
+    """`exp` claim of a JWT in epoch seconds, or None if `token` is not a JWT."""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except Exception:
+        return None
+
+
+def cookie_from_session(session, name=COOKIE_NAME):
+    """Return (value, expires_at) of the session cookie in a requests.Session jar."""
+    for c in session.cookies:
+        if c.name == name:
+            return c.value, (float(c.expires) if c.expires else None)
+    return None, None
+
+
+def cached_cookie_for_key(private_key, directory=None):
+    """Session cookie cached for the wallet behind `private_key` (None if absent/expired)."""
+    if not private_key:
+        return None
+    from eth_account import Account
+    try:
+        address = Account.from_key(private_key).address
+    except Exception:
+        return None
+    entry = load(address, directory)
+    return entry.get("cookie") if entry else None
+
+
+def schedule_refresh(expires_at, refresh, lead=REFRESH_LEAD):
+    """Run `refresh()` on a daemon timer `lead` seconds before `expires_at`."""
+    delay = max(expires_at - lead - time.time(), 1.0)
+
+    def run():
+        try:
+            refresh()
+        except Exception as e:
+            logging.error(f"[LLMM] Background session refresh failed: {e}")
+
+    timer = threading.Timer(delay, run)
+    timer.daemon = True
+    timer.start()
+    return timer
@@ -1 +1,4 @@
-session_state = {"markets": {}, "trades": [], "assets": []}
+from core.models import market_catalog
+
+# "markets" is the shared MarketCatalog index: {conditionId: Market}
+session_state = {"markets": market_catalog.by_key, "trades": [], "assets": []}
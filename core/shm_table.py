@@ -0,0 +1,192 @@
+"""
+Shared-memory market-state table.
+
+One feed daemon (`scripts/feed_daemon.py`) owns the exchange connections
+and writes latest prices and positions into a named shared-memory block;
+any number of local processes attach with `FeedReader` and read it with no
+network I/O and no serialization — fields are unpacked straight out of the
+mapped buffer.
+
+    header   <8s magic><u32 version><u32 n_slots><u64 generation><f64 heartbeat>
+    slot[i]  <u64 seq><72s key><f64 yes><f64 no><f64 volume><f64 size><f64 avg_price><f64 pnl><f64 ts>
+
+Each slot is guarded by a seqlock: the single writer bumps `seq` to odd,
+writes, then bumps it to even; readers retry while `seq` is odd or changed
+under them. `generation` increments whenever a market is assigned a slot,
+so readers only rescan keys when the directory changed.
+"""
+
+import os
+import struct
+import time
+from multiprocessing import shared_memory
+
+SHM_NAME = os.getenv("LLMM_SHM_NAME", "llmm_feed")
+SHM_SLOTS = int(os.getenv("LLMM_SHM_SLOTS", "4096"))
+MAGIC = b"LLMMSHM1"
+VERSION = 1
+HEADER = struct.Struct("<8sIIQd")
+SEQ = struct.Struct("<Q")
+KEY = struct.Struct("<72s")
+PRICE = struct.Struct("<ddd")  # yes, no, volume
+POSITION = struct.Struct("<ddd")  # size, avg_price, pnl
+TS = struct.Struct("<d")
+SLOT = struct.Struct("<Q72s7d")
+KEY_OFF, PRICE_OFF, POSITION_OFF, TS_OFF = 8, 80, 104, 128
+NAN = float("nan")
+FIELDS = ("yes", "no", "volume", "size", "avg_price", "pnl", "ts")
+
+
+def _untrack(shm):
+    """Stop this process's resource tracker from unlinking a block it merely attached to (Python < 3.13)."""
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+
+
+class _Table:
+    def __init__(self, shm):
+        self.shm = shm
+        self.buf = shm.buf
+        magic, version, self.n_slots, _, _ = HEADER.unpack_from(self.buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{shm.name} is not an LLMM feed table")
+
+    def _off(self, slot):
+        return HEADER.size + slot * SLOT.size
+
+    @property
+    def generation(self):
+        return HEADER.unpack_from(self.buf, 0)[3]
+
+    @property
+    def heartbeat(self):
+        return HEADER.unpack_from(self.buf, 0)[4]
+
+    def _key(self, slot):
+        return KEY.unpack_from(self.buf, self._off(slot) + KEY_OFF)[0].rstrip(b"\0").decode()
+
+
+class FeedWriter(_Table):
+    """Single-writer side, owned by the feed daemon."""
+
+    def __init__(self, name=SHM_NAME, n_slots=SHM_SLOTS):
+        size = HEADER.size + n_slots * SLOT.size
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Stale block from a daemon that died without unlinking: take it over
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        shm.buf[:size] = bytes(size)
+        HEADER.pack_into(shm.buf, 0, MAGIC, VERSION, n_slots, 0, time.time())
+        for slot in range(n_slots):
+            SLOT.pack_into(shm.buf, HEADER.size + slot * SLOT.size, 0, b"", *([NAN] * 7))
+        super().__init__(shm)
+        self.slots = {}
+
+    def slot_for(self, key):
+        slot = self.slots.get(key)
+        if slot is None:
+            if len(self.slots) >= self.n_slots:
+                raise RuntimeError(f"feed table full ({self.n_slots} slots); raise LLMM_SHM_SLOTS")
+            raw = key.encode()
+            if len(raw) > KEY.size:
+                raise ValueError(f"market key too long for the feed table: {key}")
+            slot = self.slots[key] = len(self.slots)
+            self._write(slot, KEY_OFF, KEY, raw)
+            _, _, n, gen, hb = HEADER.unpack_from(self.buf, 0)
+            HEADER.pack_into(self.buf, 0, MAGIC, VERSION, n, gen + 1, hb)
+        return slot
+
+    def _write(self, slot, field_off, st, *values):
+        off = self._off(slot)
+        seq = SEQ.unpack_from(self.buf, off)[0]
+        SEQ.pack_into(self.buf, off, seq + 1)  # odd: write in progress
+        st.pack_into(self.buf, off + field_off, *values)
+        TS.pack_into(self.buf, off + TS_OFF, time.time())
+        SEQ.pack_into(self.buf, off, seq + 2)
+
+    def write_price(self, key, yes, no=NAN, volume=NAN):
+        self._write(self.slot_for(key), PRICE_OFF, PRICE,
+                    NAN if yes is None else yes, NAN if no is None else no, NAN if volume is None else volume)
+
+    def write_position(self, key, size, avg_price, pnl):
+        self._write(self.slot_for(key), POSITION_OFF, POSITION, size, avg_price, pnl)
+
+    def beat(self):
+        _, _, n, gen, _ = HEADER.unpack_from(self.buf, 0)
+        HEADER.pack_into(self.buf, 0, MAGIC, VERSION, n, gen, time.time())
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+        self.shm.unlink()
+
+
+class FeedReader(_Table):
+    """Reader side: attach by name from any local process."""
+
+    def __init__(self, name=SHM_NAME):
+        shm = shared_memory.SharedMemory(name=name)
+        _untrack(shm)
+        super().__init__(shm)
+        self.index = {}
+        self._generation = None
+
+    def _refresh(self):
+        gen = self.generation
+        if gen != self._generation:
+            # Slots are assigned densely from 0, so stop at the first empty key
+            index = {}
+            for slot in range(self.n_slots):
+                key = self._key(slot)
+                if not key:
+                    break
+                index[key] = slot
+            self.index, self._generation = index, gen
+
+    def keys(self):
+        self._refresh()
+        return list(self.index)
+
+    def read_slot(self, slot, retries=1000):
+        """Consistent (yes, no, volume, size, avg_price, pnl, ts) of one slot."""
+        off = self._off(slot)
+        buf = self.buf
+        for _ in range(retries):
+            s1 = SEQ.unpack_from(buf, off)[0]
+            if not s1 & 1:
+                values = SLOT.unpack_from(buf, off)[2:]
+                if SEQ.unpack_from(buf, off)[0] == s1:
+                    return values
+            # Writer is mid-update (possibly preempted): yield instead of spinning
+            time.sleep(0)
+        raise TimeoutError(f"slot {slot} kept changing under the reader")
+
+    def read(self, key):
+        """{"yes", "no", "volume", "size", "avg_price", "pnl", "ts"} for `key`, or None."""
+        slot = self.index.get(key)
+        if slot is None:
+            self._refresh()
+            slot = self.index.get(key)
+            if slot is None:
+                return None
+        return dict(zip(FIELDS, self.read_slot(slot)))
+
+    def snapshot(self):
+        self._refresh()
+        return {key: dict(zip(FIELDS, self.read_slot(slot))) for key, slot in self.index.items()}
+
+    @property
+    def age(self):
+        """Seconds since the daemon's last heartbeat."""
+        return time.time() - self.heartbeat
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
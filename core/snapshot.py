@@ -0,0 +1,189 @@
+"""
+Warm-restart snapshots.
+
+Periodically writes the market catalog, titles, last prices, positions and
+subscriptions to one compact file, atomically (temp file + fsync + rename):
+
+    header   <8s magic><u32 version><u32 n_markets><u64 meta_len><u64 table_offset>
+    meta     zlib-compressed JSON (markets without prices, titles, positions, subscriptions)
+    table    n_markets x 2 float64 (yes, no), 8-byte aligned, row i ↔ meta["markets"][i]
+
+On startup the file is memory-mapped: the price table is read in place
+(no parse), the small metadata block is inflated, and the catalog is
+populated before any network I/O so the first frame renders immediately.
+Live data then overwrites the restored values as it arrives; restored
+markets that no live event confirms within a window are dropped again
+(`confirm_restored`), and restored positions are replaced by the first
+REST/stream seed of the position book.
+"""
+
+import asyncio
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+import zlib
+
+from core.models import market_catalog
+from core.session_cache import SESSION_DIR
+
+SNAPSHOT_PATH = os.getenv("LLMM_SNAPSHOT", os.path.join(SESSION_DIR, "snapshot.bin"))
+SNAPSHOT_INTERVAL = float(os.getenv("LLMM_SNAPSHOT_INTERVAL", "30"))
+MAGIC = b"LLMMSNP1"
+VERSION = 1
+HEADER = struct.Struct("<8sIIQQ")
+
+
+def _plain(obj):
+    """JSON-able form of a position (dict or __slots__ object such as core.position_book.Position)."""
+    if isinstance(obj, dict):
+        return obj
+    if hasattr(obj, "to_record"):
+        return obj.to_record()
+    return {s: getattr(obj, s) for s in getattr(obj, "__slots__", ())}
+
+
+def save_snapshot(path=SNAPSHOT_PATH, catalog=market_catalog, titles=None, positions=None, subscriptions=None):
+    """Atomically write a snapshot of `catalog` and the given state. Returns the byte size."""
+    markets = list(catalog.by_key.values())
+    meta = zlib.compress(json.dumps({
+        "saved_at": time.time(),
+        "markets": [dict(m.to_dict(), prices=None, expirationTimestamp=m.expiration_ts) for m in markets],
+        "titles": titles or {},
+        "positions": [_plain(p) for p in positions or []],
+        "subscriptions": list(subscriptions or []),
+    }, separators=(",", ":")).encode(), 6)
+    table_offset = (HEADER.size + len(meta) + 7) // 8 * 8
+    table = bytearray(16 * len(markets))
+    nan = float("nan")
+    for i, m in enumerate(markets):
+        struct.pack_into("<dd", table, 16 * i, m.yes if m.yes is not None else nan, m.no if m.no is not None else nan)
+
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(markets), len(meta), table_offset))
+        f.write(meta)
+        f.write(b"\0" * (table_offset - HEADER.size - len(meta)))
+        f.write(table)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return table_offset + len(table)
+
+
+class Snapshot:
+    """A loaded snapshot; `prices` is a float64 view straight into the mapped file."""
+
+    def __init__(self, meta, prices, mm):
+        self.saved_at = meta.get("saved_at")
+        self.markets = meta.get("markets", [])
+        self.titles = meta.get("titles", {})
+        self.positions = meta.get("positions", [])
+        self.subscriptions = meta.get("subscriptions", [])
+        self.prices = prices
+        self._mm = mm
+
+    @property
+    def age(self):
+        return time.time() - self.saved_at if self.saved_at else None
+
+    def price(self, i):
+        return self.prices[2 * i], self.prices[2 * i + 1]
+
+    def restore(self, catalog=market_catalog, book=None):
+        """Upsert the snapshot markets (with their last prices) into `catalog`, skipping
+        expired ones, and seed `book` (a PositionBook) with the saved positions.
+        Returns the number of markets restored; their keys are kept in `restored`."""
+        now = time.time()
+        self.restored = []
+        for i, d in enumerate(self.markets):
+            expires = d.get("expirationTimestamp")
+            if isinstance(expires, (int, float)) and expires <= now:
+                continue
+            yes, no = self.price(i)
+            d["prices"] = [yes, no] if yes == yes else None  # NaN → no prices
+            m = catalog.upsert(d)
+            if m.condition_id is not None:
+                self.restored.append(m.condition_id)
+        if book is not None and self.positions:
+            book.seed(self.positions)
+        return len(self.restored)
+
+    def close(self):
+        if self._mm is not None:
+            self.prices.release()
+            self._mm.close()
+            self._mm = None
+
+
+def load_snapshot(path=SNAPSHOT_PATH):
+    """Map and parse a snapshot; None if missing or unreadable."""
+    try:
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    try:
+        magic, version, n, meta_len, table_offset = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC or version != VERSION or table_offset + 16 * n > len(mm):
+            raise ValueError("bad header")
+        meta = json.loads(zlib.decompress(mm[HEADER.size:HEADER.size + meta_len]))
+        prices = memoryview(mm)[table_offset:table_offset + 16 * n].cast("d")
+    except Exception as e:
+        mm.close()
+        logging.warning(f"[LLMM] Ignoring unreadable snapshot {path}: {e}")
+        return None
+    return Snapshot(meta, prices, mm)
+
+
+async def confirm_restored(keys, subscription, window=60.0, catalog=market_catalog, protect=None):
+    """Drop restored markets that no live event on `subscription` (bus PRICES) mentions
+    within `window` seconds; keys in `protect()` (subscriptions, positions) stay.
+    Returns the dropped keys."""
+    pending = set(keys)
+    deadline = time.monotonic() + window
+    try:
+        while pending:
+            left = deadline - time.monotonic()
+            if left <= 0:
+                break
+            try:
+                _topic, event = await asyncio.wait_for(subscription.get(), left)
+            except asyncio.TimeoutError:
+                break
+            pending.discard(event.get("market"))
+    finally:
+        subscription.close()
+    keep = set(protect()) if protect else set()
+    dropped = [k for k in pending if k not in keep and catalog.remove(k) is not None]
+    if dropped:
+        logging.info(f"[LLMM] Snapshot: dropped {len(dropped)} restored markets with no live data")
+    return dropped
+
+
+class SnapshotWriter:
+    """Save `collect()` → dict(titles=..., positions=..., subscriptions=...) every `interval` seconds."""
+
+    def __init__(self, collect=None, path=SNAPSHOT_PATH, interval=SNAPSHOT_INTERVAL, catalog=market_catalog):
+        self.collect = collect or (lambda: {})
+        self.path = path
+        self.interval = interval
+        self.catalog = catalog
+
+    def save(self):
+        t0 = time.perf_counter()
+        size = save_snapshot(self.path, self.catalog, **self.collect())
+        logging.debug(f"[LLMM] Snapshot {size} bytes in {(time.perf_counter() - t0) * 1000:.1f}ms")
+        return size
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(self.save)
+            except Exception as e:
+                logging.warning(f"[LLMM] Snapshot save failed: {e}")
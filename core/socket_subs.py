@@ -1,5 +1,6 @@
-import asyncio, websockets, json, logging
+import asyncio, websockets, json, logging, time
 from core.config import LIMITLESS_API, HEARTBEAT_INTERVAL
+from core.event_bus import bus as default_bus, PRICES, POSITIONS, SYSTEM
 
 logging.basicConfig(level=logging.INFO)
 
@@ -53,6 +54,26 @@ class LimitlessWebSocket:
                 logging.error(f"[LLMM] recv failed: {e}. Reconnecting…")
                 await self.connect()
 
+    async def pump(self, bus=default_bus):
+        """Decode every frame once and publish it: markets → prices, positions → positions, else system."""
+        while not self._stop:
+            msg = await self.recv()
+            t_recv = time.perf_counter()
+            try:
+                data = json.loads(msg)
+            except (TypeError, ValueError):
+                continue
+            if not isinstance(data, dict):
+                continue
+            ch = data.get("channel")
+            if ch == "markets":
+                market = data.get("conditionId") or data.get("marketId")
+                bus.publish(PRICES, dict(data, kind="price", market=market, t_recv=t_recv), market=market)
+            elif ch == "positions":
+                bus.publish(POSITIONS, dict(data, kind="position", t_recv=t_recv))
+            else:
+                bus.publish(SYSTEM, data)
+
     async def close(self):
         self._stop = True
         if self.conn:
@@ -1,17 +1,94 @@
+import asyncio
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
 import requests
 from eth_account import Account
 from eth_account.messages import encode_structured_data
+from eth_keys import keys
 from core.config import PRIVATE_KEY, LIMITLESS_API
+from core.eip712 import get_encoder
+from core import session_cache
+from core.rate_limiter import scheduler, order_scheduler, ORDER
+from core.risk import order_terms
+
+# Optional: only needed for the pooled async submission path
+try:
+    import aiohttp
+except Exception:
+    aiohttp = None
+
+SIGN_WORKERS = int(os.getenv("SIGN_WORKERS", str(os.cpu_count() or 2)))
+
+class OrderRejected(RuntimeError):
+    """The exchange answered an order call with a non-2xx status."""
+
+    def __init__(self, status, body):
+        super().__init__(f"HTTP {status}: {str(body)[:200]}")
+        self.status = status
+        self.body = body
+
+def _typed_data(order_struct):
+    return {
+        "types": order_struct["types"],
+        "domain": order_struct["domain"],
+        "primaryType": "Order",
+        "message": order_struct["message"]
+    }
+
+def sign_order_digest(key, order_struct, encoders):
+    """Sign `order_struct` with an eth_keys PrivateKey using encoders cached per exchange contract."""
+    domain = order_struct["domain"]
+    ckey = (domain.get("verifyingContract"), domain.get("chainId"))
+    enc = encoders.get(ckey)
+    if enc is None:
+        enc = encoders[ckey] = get_encoder(order_struct["types"])
+    sig = key.sign_msg_hash(enc.digest(domain, "Order", order_struct["message"]))
+    return "0x" + (sig.r.to_bytes(32, "big") + sig.s.to_bytes(32, "big") + bytes([sig.v + 27])).hex()
+
+# Process-pool workers load the key once (initializer) and keep their own encoder cache.
+_worker_key = None
+_worker_encoders = {}
+
+def _init_signing_worker(private_key):
+    global _worker_key
+    _worker_key = keys.PrivateKey(Account.from_key(private_key).key)
+
+def _sign_chunk(order_structs):
+    out = []
+    for o in order_structs:
+        try:
+            out.append(sign_order_digest(_worker_key, o, _worker_encoders))
+        except Exception as e:
+            out.append(e)
+    return out
 
 class TradingClient:
-    def __init__(self, private_key=PRIVATE_KEY, api_url=LIMITLESS_API):
+    def __init__(self, private_key=PRIVATE_KEY, api_url=LIMITLESS_API, sign_workers=SIGN_WORKERS, risk=None,
+                 limiter=order_scheduler):
         self.private_key = private_key
         self.account = Account.from_key(private_key)
         self.api_url = api_url
         self.auth_token = None
+        self.http = requests.Session()
+        self._key = keys.PrivateKey(self.account.key)
+        self._encoders = {}
+        self._aio = None
+        self.sign_workers = sign_workers
+        self._pool = None
+        self._reauth_timer = None
+        self.risk = risk
+        self.limiter = limiter  # bucket for /orders calls; auth uses the shared scheduler
 
-    def authenticate(self):
-        challenge = requests.get(f"{self.api_url}/auth/challenge").json()
+    def authenticate(self, use_cache=True):
+        if use_cache:
+            entry = session_cache.load(self.account.address, kind="token")
+            if entry and entry.get("token"):
+                self.auth_token = entry["token"]
+                self._schedule_reauth(entry["expires_at"])
+                return self.auth_token
+
+        challenge = scheduler.request("GET", f"{self.api_url}/auth/challenge", ORDER, session=self.http).json()
         message = challenge["message"]
 
         signed = Account.sign_message(
@@ -19,14 +96,53 @@ class TradingClient:
             self.private_key
         )
 
-        resp = requests.post(f"{self.api_url}/auth/verify", json={
+        resp = scheduler.request("POST", f"{self.api_url}/auth/verify", ORDER, session=self.http, json={
             "address": self.account.address,
             "signature": signed.signature.hex()
         })
         self.auth_token = resp.json().get("token")
+        if self.auth_token:
+            entry = session_cache.save(self.account.address, token=self.auth_token,
+                                       expires_at=session_cache.jwt_expiry(self.auth_token), kind="token")
+            self._schedule_reauth(entry["expires_at"])
         return self.auth_token
 
+    def _schedule_reauth(self, expires_at):
+        if self._reauth_timer is not None:
+            self._reauth_timer.cancel()
+        self._reauth_timer = session_cache.schedule_refresh(
+            expires_at, lambda: self.authenticate(use_cache=False)
+        )
+
+    # --- pre-trade risk -----------------------------------------------------
+
+    def _pre_trade(self, order_struct):
+        """Reserve the order against the risk limits (raises RiskLimitExceeded). Returns the risk key."""
+        if self.risk is None:
+            return None
+        salt = order_struct["message"].get("salt")
+        if salt is None:
+            raise ValueError("order message has no salt; it keys the risk reservation")
+        key = f"salt:{salt}"
+        self.risk.reserve(key, *order_terms(order_struct))
+        return key
+
+    def _post_trade(self, key, response, ok=True):
+        """Settle a reservation: ok=False (rejected / never sent) releases it; ok=None
+        (send error or timeout, the order may be live) keeps it until a cancel confirms."""
+        if key is None:
+            return
+        if ok is None:
+            logging.warning(f"[LLMM] Risk: keeping reservation {key}; order state unknown after send error")
+            return
+        if not ok:
+            self.risk.on_cancel(key)
+            return
+        if isinstance(response, dict) and (response.get("id") or response.get("orderId")):
+            self.risk.rekey(key, response.get("id") or response.get("orderId"))
+
     def submit_order(self, order_struct):
+        risk_key = self._pre_trade(order_struct)
         typed_data = {
             "types": order_struct["types"],
             "domain": order_struct["domain"],
@@ -40,9 +156,168 @@ class TradingClient:
         )
 
         headers = {"Authorization": f"Bearer {self.auth_token}"}
-        resp = requests.post(f"{self.api_url}/orders", json={
+        try:
+            resp = self.limiter.request("POST", f"{self.api_url}/orders", ORDER, session=self.http, json={
+                "order": typed_data,
+                "signature": signed.signature.hex()
+            }, headers=headers)
+        except Exception:
+            self._post_trade(risk_key, None, ok=None)
+            raise
+        try:
+            body = resp.json()
+        except ValueError:
+            body = resp.text
+        self._post_trade(risk_key, body, ok=resp.ok)
+        return body
+
+    # --- low-latency path -------------------------------------------------
+
+    def sign_order_fast(self, order_struct):
+        """Sign an order with the cached domain separator/type hashes. Returns (typed_data, 0x-signature)."""
+        return _typed_data(order_struct), sign_order_digest(self._key, order_struct, self._encoders)
+
+    async def _session(self):
+        if aiohttp is None:
+            raise RuntimeError("aiohttp not available; install aiohttp to use the async order path")
+        if self._aio is None or self._aio.closed:
+            connector = aiohttp.TCPConnector(limit=32, keepalive_timeout=60, ttl_dns_cache=300)
+            self._aio = aiohttp.ClientSession(connector=connector)
+        return self._aio
+
+    async def submit_order_fast(self, order_struct):
+        """Sign with cached EIP-712 state and POST over a pooled keep-alive connection."""
+        risk_key = self._pre_trade(order_struct)
+        try:
+            typed_data, signature = self.sign_order_fast(order_struct)
+        except Exception:
+            self._post_trade(risk_key, None, ok=False)
+            raise
+        try:
+            response = await self._post_order(typed_data, signature)
+        except OrderRejected:
+            self._post_trade(risk_key, None, ok=False)
+            raise
+        except Exception:
+            self._post_trade(risk_key, None, ok=None)
+            raise
+        self._post_trade(risk_key, response)
+        return response
+
+    async def _post_order(self, typed_data, signature):
+        session = await self._session()
+        headers = {"Authorization": f"Bearer {self.auth_token}"}
+        await self.limiter.acquire_async(ORDER)
+        async with session.post(f"{self.api_url}/orders", json={
             "order": typed_data,
-            "signature": signed.signature.hex()
-        }, headers=headers)
+            "signature": signature
+        }, headers=headers) as resp:
+            self.limiter.observe(resp.status, resp.headers.get("Retry-After"))
+            try:
+                body = await resp.json(content_type=None)
+            except ValueError:
+                body = await resp.text()
+            if not 200 <= resp.status < 300:
+                raise OrderRejected(resp.status, body)
+            return body
+
+    async def cancel_order(self, order_id):
+        session = await self._session()
+        headers = {"Authorization": f"Bearer {self.auth_token}"}
+        await self.limiter.acquire_async(ORDER)
+        async with session.delete(f"{self.api_url}/orders/{order_id}", headers=headers) as resp:
+            self.limiter.observe(resp.status, resp.headers.get("Retry-After"))
+            try:
+                body = await resp.json(content_type=None)
+            except ValueError:
+                body = await resp.text()
+            if not 200 <= resp.status < 300:
+                raise OrderRejected(resp.status, body)
+        if self.risk is not None:
+            self.risk.on_cancel(order_id)
+        return body
+
+    # --- batch path -------------------------------------------------------
+
+    def _signing_pool(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.sign_workers,
+                initializer=_init_signing_worker,
+                initargs=(self.private_key,),
+            )
+        return self._pool
+
+    async def submit_orders(self, batch):
+        """Sign `batch` across the process pool and submit concurrently as signatures arrive.
+
+        Returns one result per order, in input order: {"ok": True, "response": ...}
+        or {"ok": False, "error": "..."}. A failing order never fails the batch;
+        orders rejected by the risk engine are reported as "risk: ..." and not signed,
+        non-2xx replies from the exchange as "rejected: HTTP <status>: ...", and send
+        errors after which the order may be live carry "unknown": True."""
+        batch = list(batch)
+        results = [None] * len(batch)
+        if not batch:
+            return results
+
+        risk_keys = {}
+        for i, o in enumerate(batch):
+            try:
+                risk_keys[i] = self._pre_trade(o)
+            except Exception as e:
+                results[i] = {"ok": False, "error": f"risk: {e}"}
+        todo = [i for i in range(len(batch)) if results[i] is None]
+
+        async def post(i, signature):
+            if isinstance(signature, Exception):
+                results[i] = {"ok": False, "error": f"sign: {type(signature).__name__}: {signature}"}
+            else:
+                try:
+                    results[i] = {"ok": True, "response": await self._post_order(_typed_data(batch[i]), signature)}
+                except OrderRejected as e:
+                    results[i] = {"ok": False, "error": f"rejected: {e}", "status": e.status, "response": e.body}
+                except Exception as e:
+                    # may have reached the venue: the reservation stays until a cancel confirms
+                    results[i] = {"ok": False, "error": f"send: {type(e).__name__}: {e}", "unknown": True}
+            self._post_trade(risk_keys.get(i), results[i].get("response"),
+                             None if results[i].get("unknown") else results[i]["ok"])
+
+        async def run_chunk(start, signing):
+            try:
+                signatures = await signing
+            except Exception as e:
+                signatures = [e] * len(todo[start:start + size])
+            await asyncio.gather(*(post(todo[start + j], sig) for j, sig in enumerate(signatures)))
+
+        if len(todo) <= 1 or self.sign_workers <= 1:
+            signatures = [self._sign_or_error(batch[i]) for i in todo]
+            await asyncio.gather(*(post(i, sig) for i, sig in zip(todo, signatures)))
+            return results
+
+        # Two chunks per worker: few IPC round-trips, yet the first posts go out
+        # while the rest of the batch is still being signed.
+        loop = asyncio.get_running_loop()
+        pool = self._signing_pool()
+        size = -(-len(todo) // (self.sign_workers * 2))
+        await asyncio.gather(*(
+            run_chunk(start, loop.run_in_executor(pool, _sign_chunk, [batch[i] for i in todo[start:start + size]]))
+            for start in range(0, len(todo), size)
+        ))
+        return results
+
+    def _sign_or_error(self, order_struct):
+        try:
+            return sign_order_digest(self._key, order_struct, self._encoders)
+        except Exception as e:
+            return e
 
-        return resp.json()
+    async def close(self):
+        if self._reauth_timer is not None:
+            self._reauth_timer.cancel()
+        if self._aio is not None and not self._aio.closed:
+            await self._aio.close()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        self.http.close()
@@ -1,14 +1,31 @@
 import os
 import asyncio
 import json
+import logging
 import websockets
 from dotenv import load_dotenv
 from core.logging_utils import ws_buffer
+from core.metrics import metrics
+from core.event_bus import bus, PRICES
 
 load_dotenv()
 WS_BASE_URL = os.getenv("WS_BASE_URL", "wss://api.limitless.exchange/markets")
 
 async def run_ws_client(session_state):
+    first = True
+    while True:
+        if not first:
+            metrics.reconnect("ws_client")
+        first = False
+        try:
+            await _consume(session_state)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.error(f"[LLMM] ws_client feed failed: {e}. Reconnecting in 5s…")
+            await asyncio.sleep(5)
+
+async def _consume(session_state):
     async with websockets.connect(WS_BASE_URL) as ws:
         # Subscribe to markets
         for m in ["BTC-YESNO", "ETH-YESNO", "SOL-YESNO"]:
@@ -20,12 +37,27 @@ async def run_ws_client(session_state):
 
         while True:
             msg = await ws.recv()
-            event = json.loads(msg)
+            trace = metrics.trace()
+            try:
+                event = json.loads(msg)
+            except ValueError:
+                metrics.dropped("ws_client")
+                continue
+            metrics.decoded(trace, event.get("type") or "unknown")
 
             if event.get("type") == "market":
-                trade_str = f"{event['market']} price={event['price']} vol={event['volume']}"
+                try:
+                    trade_str = f"{event['market']} price={event['price']} vol={event['volume']}"
+                except KeyError:
+                    metrics.dropped("ws_client")
+                    continue
+                metrics.normalized(trace, event.get("timestamp") or event.get("ts"))
                 session_state.setdefault("trades", []).append(trade_str)
+                session_state["last_event_trace"] = trace
                 ws_buffer.append(trade_str)
+                bus.publish(PRICES, {"kind": "price", "market": event["market"], "price": event["price"],
+                                     "volume": event["volume"], "t_recv": trace.t_recv}, market=event["market"])
 
                 if len(ws_buffer) > 500:
                     ws_buffer.pop(0)
+                metrics.consumed(trace)
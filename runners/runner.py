@@ -1,37 +1,200 @@
-import asyncio, curses, yaml, sys
+import asyncio, curses, time, yaml, sys
 from core.session_state import session_state
 from core.auth import login_wallet
-from core.market_manager_async import run_market_manager
+from core.market_manager_async import run_market_manager, TICK_TO_ORDER_BUDGET_MS
 from core.ws_client import run_ws_client
 from core.dashboard import render_dashboard_rows
 from core.logging_utils import ws_buffer, trade_buffer, banner
 from core.banner import startup_banner
+from core.metrics import metrics, serve_metrics, METRICS_HOST, METRICS_PORT
+from core.loop_monitor import LoopLagMonitor, install_event_loop_policy
+from core.memory_watchdog import MemoryWatchdog, trim_list, trim_catalog
+from core.models import market_catalog
+from core.snapshot import load_snapshot, confirm_restored, SnapshotWriter, SNAPSHOT_PATH
+from core.bars import BarAggregator, INITIAL_MARKETS, IDLE_AFTER
+from core.accounts import start_accounts
+from core.event_bus import bus, PRICES
+from core.profiler import SamplingProfiler, install_signal_toggle, serve_profiler_control, PROFILER_HOST, PROFILER_PORT
 
-async def run_dashboard():
+async def start_metrics(cfg):
+    mcfg = cfg.get("metrics") or {}
+    if not mcfg.get("enabled", True):
+        return None
+    host = mcfg.get("host", METRICS_HOST)
+    port = int(mcfg.get("port", METRICS_PORT))
+    try:
+        server = await serve_metrics(host, port)
+        banner("METRICS", status=f"http://{host}:{port}/metrics")
+        return server
+    except OSError as e:
+        banner("METRICS", status=f"FAILED ({e})")
+        return None
+
+def start_loop_monitor(cfg):
+    lcfg = cfg.get("loop_monitor") or {}
+    if not lcfg.get("enabled", True):
+        return None
+    monitor = LoopLagMonitor(
+        interval=float(lcfg.get("interval_ms", 100)) / 1000,
+        threshold=float(lcfg.get("threshold_ms", 250)) / 1000,
+    )
+    asyncio.create_task(monitor.run(), name="loop-lag-monitor")
+    return monitor
+
+async def start_profiler(cfg):
+    pcfg = cfg.get("profiler") or {}
+    if not pcfg.get("enabled", True):
+        return None
+    profiler = SamplingProfiler(
+        interval=float(pcfg.get("interval_ms", 5)) / 1000,
+        output_dir=pcfg.get("output_dir", "profiles"),
+    ).attach()
+    install_signal_toggle(profiler)
+    try:
+        await serve_profiler_control(profiler, pcfg.get("host", PROFILER_HOST), int(pcfg.get("port", PROFILER_PORT)))
+        banner("PROFILER", status=f"READY (SIGUSR2 or port {pcfg.get('port', PROFILER_PORT)})")
+    except OSError as e:
+        banner("PROFILER", status=f"SIGNAL ONLY ({e})")
+    return profiler
+
+def held_markets():
+    """Markets the session can't forget: subscriptions and every account's positions."""
+    keys = set(session_state.get("assets") or [])
+    for acct in (session_state.get("accounts") or {}).values():
+        keys.update(acct.book.markets())
+    return keys
+
+def start_memory_watchdog(cfg):
+    mcfg = cfg.get("memory") or {}
+    if not mcfg.get("enabled", True):
+        return None
+    watchdog = MemoryWatchdog(
+        budget_mb=int(mcfg.get("budget_mb", 512)),
+        interval=float(mcfg.get("interval_s", 30)),
+        top_n=int(mcfg.get("top_n", 10)),
+    )
+    trades = session_state.setdefault("trades", [])
+    watchdog.register("session_state.trades", trades, trim_list(trades, int(mcfg.get("max_trades", 5000))))
+    watchdog.register("ws_buffer", ws_buffer)
+    watchdog.register("market_catalog", market_catalog,
+                      trim_catalog(market_catalog, int(mcfg.get("max_markets", 20000)), protect=held_markets))
+    session_state["memory_watchdog"] = watchdog  # later start_* helpers register their structures
+    asyncio.create_task(watchdog.run(), name="memory-watchdog")
+    return watchdog
+
+def restore_snapshot(cfg):
+    """Populate the catalog and subscriptions from the last snapshot before logging in."""
+    scfg = cfg.get("snapshot") or {}
+    if not scfg.get("enabled", True):
+        return None
+    path = scfg.get("path") or SNAPSHOT_PATH
+    snap = load_snapshot(path)
+    if snap is not None:
+        try:
+            n = snap.restore()
+            if snap.subscriptions:
+                session_state["assets"] = list(snap.subscriptions)
+            # Seeded into the account books by start_account_runners, replaced by their REST seed
+            session_state["restored_positions"] = list(snap.positions)
+            asyncio.create_task(confirm_restored(snap.restored, bus.subscribe(PRICES, name="snapshot-confirm"),
+                                                 float(scfg.get("confirm_s", 60)), protect=held_markets),
+                                name="snapshot-confirm")
+            banner("SNAPSHOT", status=f"RESTORED {n} markets, {len(snap.positions)} positions "
+                                      f"({int(snap.age or 0)}s old)")
+        finally:
+            snap.close()
+
+    def collect():
+        accounts = session_state.get("accounts")
+        if accounts is None:
+            positions = session_state.get("restored_positions", [])
+        else:
+            positions = [dict(p.to_record(), account=name)
+                         for name, acct in accounts.items() for p in acct.book.snapshot()]
+        return {"subscriptions": session_state.get("assets", []), "positions": positions}
+
+    writer = SnapshotWriter(collect, path=path, interval=float(scfg.get("interval_s", 30)))
+    asyncio.create_task(writer.run(), name="snapshot-writer")
+    return writer
+
+def start_bars(cfg):
+    bcfg = cfg.get("bars") or {}
+    if not bcfg.get("enabled", True):
+        return None
+    # Allocated here, not at import: the arrays grow with the markets actually ticking
+    bars = BarAggregator(depth=bcfg.get("depth"), capacity=int(bcfg.get("initial_markets", INITIAL_MARKETS)),
+                         idle_after=float(bcfg.get("idle_after_s", IDLE_AFTER)))
+    session_state["bars"] = bars
+    watchdog = session_state.get("memory_watchdog")
+    if watchdog is not None:
+        watchdog.register("bars.markets", bars.markets, bars.evictor(int(bcfg.get("max_markets", 2000))))
+    asyncio.create_task(bars.run(bus.subscribe(PRICES, name="bars", maxsize=10000)), name="bars")
+    asyncio.create_task(bars.run_clock(float(bcfg.get("clock_s", 1.0))), name="bars-clock")
+    banner("BARS", status="1s/1m/5m")
+    return bars
+
+async def start_account_runners(cfg):
+    """One AccountRunner per `accounts:` entry, all on the shared feed. No-op without the section."""
+    if not cfg.get("accounts"):
+        return None
+    runners = await start_accounts(cfg)
+    restored = session_state.pop("restored_positions", [])
+    for name, runner in runners.items():
+        runner.book.seed([p for p in restored if p.get("account") == name])
+    session_state["accounts"] = runners
+    banner("ACCOUNTS", status=f"{len(runners)} STARTED ({', '.join(runners)})")
+    return runners
+
+def start_market_manager(cfg):
+    mcfg = cfg.get("market_manager") or {}
+    budget = float(mcfg.get("budget_ms", TICK_TO_ORDER_BUDGET_MS))
+    banner("MARKET_MANAGER", status=f"STARTED (budget {budget:.0f}ms)")
+    asyncio.create_task(run_market_manager(session_state, budget_ms=budget), name="market-manager")
+
+async def run_dashboard(cfg):
+    await start_metrics(cfg)
+    start_loop_monitor(cfg)
+    await start_profiler(cfg)
+    start_memory_watchdog(cfg)
+    restore_snapshot(cfg)
     wallet_id = await login_wallet(session_state)
     startup_banner("dashboard", wallet_id)
-    banner("MARKET_MANAGER", status="STARTED")
-    asyncio.create_task(run_market_manager(session_state))
+    start_bars(cfg)
+    start_market_manager(cfg)
+    await start_account_runners(cfg)
     banner("WS_CLIENT", status="CONNECTED")
     asyncio.create_task(run_ws_client(session_state))
+    last_trace = None
     while True:
+        t0 = time.perf_counter()
         rows = render_dashboard_rows(session_state)
         print("\033c")
         print("=== Dashboard ===")
         for row in rows:
             print(row)
+        metrics.observe("llmm_render_seconds", time.perf_counter() - t0, view="dashboard")
+        trace = session_state.get("last_event_trace")
+        if trace is not None and trace is not last_trace:
+            metrics.rendered(trace)
+            last_trace = trace
         await asyncio.sleep(2)
 
-async def cockpit_main(stdscr):
+async def cockpit_main(stdscr, cfg):
     curses.curs_set(0)
     h, w = stdscr.getmaxyx()
     top = curses.newwin(h//2, w, 0, 0)
     bottom_left  = curses.newwin(h//2, w//2, h//2, 0)
     bottom_right = curses.newwin(h//2, w//2, h//2, w//2)
+    await start_metrics(cfg)
+    start_loop_monitor(cfg)
+    await start_profiler(cfg)
+    start_memory_watchdog(cfg)
+    restore_snapshot(cfg)
     wallet_id = await login_wallet(session_state)
     startup_banner("cockpit", wallet_id)
-    banner("MARKET_MANAGER", status="STARTED")
-    asyncio.create_task(run_market_manager(session_state))
+    start_bars(cfg)
+    start_market_manager(cfg)
+    await start_account_runners(cfg)
     banner("WS_CLIENT", status="CONNECTED")
     asyncio.create_task(run_ws_client(session_state))
     while True:
@@ -43,7 +206,9 @@ if __name__ == "__main__":
     mode = cfg.get("mode", "dashboard")
     if len(sys.argv) > 1:
         mode = sys.argv[1].lower()
+    loop_name = install_event_loop_policy(cfg.get("uvloop", False))
+    banner("EVENT_LOOP", status=loop_name)
     if mode == "dashboard":
-        asyncio.run(run_dashboard())
+        asyncio.run(run_dashboard(cfg))
     else:
-        curses.wrapper(lambda stdscr: asyncio.run(cockpit_main(stdscr)))
+        curses.wrapper(lambda stdscr: asyncio.run(cockpit_main(stdscr, cfg)))
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Historical backfill
+- Walks every category concurrently through LimitlessApiClient
+- Writes market and price rows to Parquet partitioned by category/date
+- Resumes from <root>/_checkpoint.json after an interruption
+- --summary prints per-market price stats from the store (no API calls)
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.backfill import Backfill, BACKFILL_ROOT, price_summary
+from core.categories import CATEGORY_MAP
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--root", default=BACKFILL_ROOT, help="Store directory")
+    parser.add_argument("--categories", nargs="+", choices=sorted(CATEGORY_MAP), help="Default: all")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent price-history requests")
+    parser.add_argument("--max-pages", type=int, help="Stop each category after N pages")
+    parser.add_argument("--no-history", action="store_true", help="Store only current prices")
+    parser.add_argument("--summary", action="store_true", help="Query the store instead of backfilling")
+    args = parser.parse_args()
+
+    if args.summary:
+        table = price_summary(args.root, categories=args.categories)
+        print(f"[LLMM] {table.num_rows} markets in {args.root}")
+        for row in table.sort_by([("yes_count", "descending")]).slice(0, 20).to_pylist():
+            print(f"  {row['condition_id'][:10]}… {row['category']:<14} n={row['yes_count']:<5} "
+                  f"mean={row['yes_mean']:.3f} min={row['yes_min']:.3f} max={row['yes_max']:.3f} last={row['yes_last']:.3f}")
+        return
+
+    from core.limitless_client import LimitlessApiClient
+    Backfill(LimitlessApiClient(), root=args.root, categories=args.categories, workers=args.workers,
+             history=not args.no_history, max_pages=args.max_pages).run()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Backtester
+- --record: subscribe to markets over the WebSocket and append price events to a JSONL file
+- Replays a recording (--events), the backfill store (--backfill) or a seeded
+  random walk (--synthetic) through KernelStrategy for every combination of
+  --gamma / --k / --size, on a process pool
+- Prints one line per parameter set (PnL, drawdown, fills, inventory) and the
+  speedup over real time; --out writes the summaries as JSONL
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from functools import partial
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.backtest import events_from_backfill, kernel_strategy, load_events, record_events, run_grid
+from core.categories import CATEGORY_MAP
+
+async def record(path, market_ids):
+    from core.event_bus import bus, PRICES
+    from core.socket_subs import LimitlessWebSocket
+
+    sub = bus.subscribe(PRICES, name="recorder", maxsize=50000)
+    ws = LimitlessWebSocket()
+    await ws.connect()
+    await ws.subscribe_markets(market_ids)
+    asyncio.create_task(ws.heartbeat())
+    asyncio.create_task(ws.pump(bus))
+    print(f"[LLMM] Recording {len(market_ids)} markets → {path} (Ctrl+C to stop)")
+    await record_events(sub, path)
+
+def synthetic_events(n_markets, n_events, seed=7, step=60.0, vol=0.02):
+    """Seeded Gaussian random walk of YES prices on a 0.01 grid, one event per `step` seconds."""
+    rng = random.Random(seed)
+    mids = {f"0xsim{i:04d}": 0.5 for i in range(n_markets)}
+    markets = list(mids)
+    t = time.time() - n_events * step
+    events = []
+    for _ in range(n_events):
+        t += step
+        m = rng.choice(markets)
+        mids[m] = min(0.97, max(0.03, round(mids[m] + rng.gauss(0.0, vol), 2)))
+        events.append({"kind": "price", "market": m, "prices": [mids[m], round(1 - mids[m], 2)], "ts": t})
+    return events
+
+def main():
+    parser = argparse.ArgumentParser()
+    src = parser.add_mutually_exclusive_group(required=True)
+    src.add_argument("--events", help="Recorded JSONL events to replay")
+    src.add_argument("--backfill", nargs="?", const="", help="Replay price rows from the backfill store (optional root)")
+    src.add_argument("--synthetic", type=int, metavar="MARKETS", help="Replay a seeded random walk over N markets")
+    src.add_argument("--record", metavar="PATH", help="Record live price events to PATH instead of backtesting")
+    parser.add_argument("--markets", nargs="*", default=[], help="Market ids (--record; or restrict the replay)")
+    parser.add_argument("--categories", nargs="+", choices=sorted(CATEGORY_MAP), help="--backfill categories")
+    parser.add_argument("--n-events", type=int, default=100000, help="--synthetic event count")
+    parser.add_argument("--gamma", type=float, nargs="+", default=[0.1])
+    parser.add_argument("--k", type=float, nargs="+", default=[100.0])
+    parser.add_argument("--size", type=float, nargs="+", default=[10.0], help="Base quote size")
+    parser.add_argument("--max-inventory", type=float, default=100.0)
+    parser.add_argument("--latency", type=float, default=0.05, help="Order/cancel latency, seconds")
+    parser.add_argument("--queue-touches", type=int, default=1, help="Touches before a resting order fills (-1: trade-through only)")
+    parser.add_argument("--fee", type=float, default=0.0, help="Per-share fee")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--out", help="Write summaries as JSONL")
+    args = parser.parse_args()
+
+    if args.record:
+        if not args.markets:
+            parser.error("--record needs --markets")
+        try:
+            asyncio.run(record(args.record, args.markets))
+        except KeyboardInterrupt:
+            pass
+        return
+
+    t0 = time.perf_counter()
+    if args.events:
+        events = load_events(args.events)
+    elif args.synthetic:
+        events = synthetic_events(args.synthetic, args.n_events)
+    else:
+        events = events_from_backfill(args.backfill or None, categories=args.categories)
+    if args.markets:
+        wanted = set(args.markets)
+        events = [e for e in events if e.get("market") in wanted]
+    markets = sorted({e["market"] for e in events if e.get("market")})
+    if not events:
+        print("[LLMM] No events to replay")
+        return
+    span = events[-1]["ts"] - events[0]["ts"]
+    print(f"[LLMM] Loaded {len(events)} events over {len(markets)} markets "
+          f"({span / 3600:.1f}h) in {time.perf_counter() - t0:.2f}s")
+
+    grid = [{"gamma": g, "k": k, "base_size": size, "max_inventory": args.max_inventory}
+            for g, k, size in itertools.product(args.gamma, args.k, args.size)]
+    sim = {"latency": args.latency, "fee": args.fee,
+           "queue_touches": None if args.queue_touches < 0 else args.queue_touches}
+    t0 = time.perf_counter()
+    results = run_grid(partial(kernel_strategy, markets), grid, events, sim, workers=args.workers)
+    wall = time.perf_counter() - t0
+
+    for r in sorted(results, key=lambda r: r["pnl"], reverse=True):
+        p = r["params"]
+        print(f"  gamma={p['gamma']:<6g} k={p['k']:<6g} size={p['base_size']:<5g} "
+              f"PnL {r['pnl']:+10.2f}  maxDD {r['max_drawdown']:8.2f}  fills {r['fills']:<6} "
+              f"max|inv| {r['max_inventory']:<6g} {r['wall_seconds']:.2f}s")
+    print(f"[LLMM] {len(grid)} runs in {wall:.2f}s wall ({span * len(grid) / wall:,.0f}x real time)")
+    if args.out:
+        with open(args.out, "w") as f:
+            for r in results:
+                f.write(json.dumps(r) + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Event-loop load benchmark
+- Streams synthetic market events over a loopback TCP socket
+- Decodes and applies them the way ws_client does
+- Reports events/sec and loop lag for the default asyncio loop and uvloop
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.loop_monitor import LoopLagMonitor
+from core.metrics import metrics
+
+def make_event(i):
+    return json.dumps({
+        "type": "market",
+        "market": f"MKT-{i % 200}",
+        "price": 0.5 + (i % 50) / 1000,
+        "volume": i,
+        "timestamp": time.time() * 1000,
+    }).encode() + b"\n"
+
+async def run_load(n_events, n_clients):
+    state = {}
+    done = asyncio.Event()
+    received = 0
+
+    async def serve(reader, writer):
+        for i in range(n_events // n_clients):
+            writer.write(make_event(i))
+            if i % 256 == 0:
+                await writer.drain()
+        await writer.drain()
+        writer.close()
+
+    async def consume(port):
+        nonlocal received
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            event = json.loads(line)
+            state[event["market"]] = (event["price"], event["volume"])
+            received += 1
+        writer.close()
+
+    server = await asyncio.start_server(serve, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    monitor = LoopLagMonitor(interval=0.01, threshold=5.0)
+    mon_task = asyncio.create_task(monitor.run())
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(consume(port) for _ in range(n_clients)))
+    elapsed = time.perf_counter() - t0
+
+    mon_task.cancel()
+    server.close()
+    await server.wait_closed()
+    return received, elapsed, monitor.max_lag
+
+def bench(name, loop_factory, n_events, n_clients):
+    metrics.histogram("llmm_loop_lag_seconds").reset()
+    with asyncio.Runner(loop_factory=loop_factory) as runner:
+        received, elapsed, max_lag = runner.run(run_load(n_events, n_clients))
+    lag = metrics.histogram("llmm_loop_lag_seconds")
+    rate = received / elapsed if elapsed else 0.0
+    print(f"[LLMM] {name:<8} {received} events in {elapsed:.3f}s → {rate:,.0f} ev/s | "
+          f"loop lag p99 {lag.percentile(0.99) * 1000:.2f}ms max {max_lag * 1000:.2f}ms")
+    return rate
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=200_000, help="Total events to stream")
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent feed connections")
+    args = parser.parse_args()
+
+    base = bench("asyncio", asyncio.new_event_loop, args.events, args.clients)
+    try:
+        import uvloop
+    except ImportError:
+        print("[LLMM] uvloop not installed; skipping uvloop run (pip install uvloop)")
+        return
+    fast = bench("uvloop", uvloop.new_event_loop, args.events, args.clients)
+    if base:
+        print(f"[LLMM] uvloop speedup: {fast / base:.2f}x")
+
+if __name__ == "__main__":
+    main()
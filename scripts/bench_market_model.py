@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Market model benchmark
+- Builds N synthetic /markets/active records shaped like the real API
+- Compares retained memory and parse time of raw JSON dicts vs core.models.Market
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.models import MarketCatalog
+
+CATEGORIES = ["Hourly", "Daily", "Crypto", "Economy", "Weekly"]
+
+def make_payload(n):
+    data = []
+    for i in range(n):
+        asset = ("BTC", "ETH", "SOL", "XRP", "DOGE")[i % 5]
+        data.append({
+            "id": 10_000 + i,
+            "slug": f"{asset.lower()}-above-{i % 97}k-on-oct-20-{1760000000000 + i}",
+            "conditionId": "0x" + f"{i:064x}",
+            "address": "0x" + f"{i * 7:040x}",
+            "title": f"{asset} above ${i % 97},000 on Oct 20, 13:00 UTC?",
+            "description": f"This market resolves YES if {asset} trades above the strike at expiry. " * 3,
+            "prices": [round(0.01 + (i % 98) / 100, 2), round(0.99 - (i % 98) / 100, 2)],
+            "expirationDate": "Oct 20, 2025",
+            "expirationTimestamp": 1760965200000,
+            "volume": str(1_000_000 + i),
+            "volumeFormatted": f"{1 + i / 1000:.2f}",
+            "liquidity": "250000000",
+            "categories": [CATEGORIES[i % 5], "Crypto"],
+            "tags": ["Hourly", asset, "Lumy"],
+            "status": "FUNDED",
+            "creator": {"name": "Limitless", "imageURI": "https://limitless.exchange/logo.png", "link": ""},
+            "collateralToken": {"symbol": "USDC", "address": "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913", "decimals": 6},
+            "createdAt": "2025-10-20T12:00:00.000Z",
+            "updatedAt": "2025-10-20T12:30:00.000Z",
+            "logo": None,
+            "metadata": {"isBannered": False, "fee": True},
+        })
+    return json.dumps({"data": data})
+
+def measure(label, build):
+    gc.collect()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    obj = build()
+    elapsed = time.perf_counter() - t0
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"[LLMM] {label:<16} retained {retained / 2**20:7.2f} MiB | peak {peak / 2**20:7.2f} MiB | build {elapsed * 1000:8.1f} ms")
+    return obj, retained, elapsed
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--markets", type=int, default=10_000, help="Number of markets")
+    args = parser.parse_args()
+
+    raw = make_payload(args.markets)
+    print(f"[LLMM] Payload: {args.markets} markets, {len(raw) / 2**20:.1f} MiB JSON")
+
+    def build_dicts():
+        return {m["conditionId"]: m for m in json.loads(raw)["data"]}
+
+    def build_models():
+        catalog = MarketCatalog()
+        catalog.upsert_many(json.loads(raw)["data"])
+        return catalog
+
+    dicts, mem_d, t_d = measure("raw dicts", build_dicts)
+    del dicts
+    catalog, mem_m, t_m = measure("Market catalog", build_models)
+
+    t0 = time.perf_counter()
+    for m in json.loads(raw)["data"]:
+        catalog.upsert({"conditionId": m["conditionId"], "prices": [0.4, 0.6]})
+    t_upd = time.perf_counter() - t0
+
+    print(f"[LLMM] Memory ratio: {mem_d / max(mem_m, 1):.1f}x smaller with Market "
+          f"({mem_m / args.markets:.0f} B/market vs {mem_d / args.markets:.0f} B/market)")
+    print(f"[LLMM] Parse overhead: {(t_m - t_d) * 1e6 / args.markets:.2f} µs/market; "
+          f"price update {t_upd * 1e6 / args.markets:.2f} µs/market (incl. JSON decode)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Order path benchmark
+- Signs N sample orders with the legacy path (encode_structured_data + sign_message)
+  and the cached EIP-712 fast path, checking both produce the same signature
+- Sends them to a local stub /orders endpoint: legacy requests.post vs pooled aiohttp
+- Reports orders/sec and p50/p99 sign+send latency
+- Times a full re-quote batch through TradingClient.submit_orders (process-pool signing)
+- The client runs without the order rate limiter (`no_limit`): the numbers are signing
+  and send cost, not the ORDER_RATE_LIMIT_RPS cap a live client is held to
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+from aiohttp import web
+from eth_account import Account
+from eth_account.messages import encode_structured_data
+
+from core.metrics import LatencyHistogram
+from core.rate_limiter import no_limit
+from core.trading import TradingClient
+
+ORDER_TYPES = {
+    "EIP712Domain": [
+        {"name": "name", "type": "string"},
+        {"name": "version", "type": "string"},
+        {"name": "chainId", "type": "uint256"},
+        {"name": "verifyingContract", "type": "address"},
+    ],
+    "Order": [
+        {"name": "salt", "type": "uint256"},
+        {"name": "maker", "type": "address"},
+        {"name": "signer", "type": "address"},
+        {"name": "taker", "type": "address"},
+        {"name": "tokenId", "type": "uint256"},
+        {"name": "makerAmount", "type": "uint256"},
+        {"name": "takerAmount", "type": "uint256"},
+        {"name": "expiration", "type": "uint256"},
+        {"name": "nonce", "type": "uint256"},
+        {"name": "feeRateBps", "type": "uint256"},
+        {"name": "side", "type": "uint8"},
+        {"name": "signatureType", "type": "uint8"},
+    ],
+}
+DOMAIN = {
+    "name": "Limitless CTF Exchange",
+    "version": "1",
+    "chainId": 8453,
+    "verifyingContract": "0xa4409D988CA2218d956BeEFD3874100F444f0DC3",
+}
+
+def sample_order(maker, i):
+    return {
+        "types": ORDER_TYPES,
+        "domain": DOMAIN,
+        "message": {
+            "salt": 1_000_000 + i,
+            "maker": maker,
+            "signer": maker,
+            "taker": "0x0000000000000000000000000000000000000000",
+            "tokenId": 10**18 + i,
+            "makerAmount": 5_000_000 + i,
+            "takerAmount": 10_000_000,
+            "expiration": 0,
+            "nonce": 0,
+            "feeRateBps": 0,
+            "side": i % 2,
+            "signatureType": 0,
+        },
+    }
+
+def legacy_sign(client, order):
+    typed_data = {"types": order["types"], "domain": order["domain"],
+                  "primaryType": "Order", "message": order["message"]}
+    return Account.sign_message(encode_structured_data(typed_data), client.private_key).signature.hex()
+
+def start_stub_server(port):
+    async def orders(request):
+        await request.read()
+        return web.json_response({"ok": True})
+
+    def serve():
+        app = web.Application()
+        app.router.add_post("/orders", orders)
+        web.run_app(app, host="127.0.0.1", port=port, print=None, handle_signals=False)
+
+    threading.Thread(target=serve, daemon=True).start()
+    for _ in range(50):
+        try:
+            requests.post(f"http://127.0.0.1:{port}/orders", json={}, timeout=1)
+            return
+        except requests.ConnectionError:
+            time.sleep(0.1)
+    raise RuntimeError("stub server did not start")
+
+def report(label, n, elapsed, hist):
+    print(f"[LLMM] {label:<22} {n / elapsed:8.1f} orders/s | p50 {hist.percentile(0.5) * 1000:7.2f}ms "
+          f"| p99 {hist.percentile(0.99) * 1000:7.2f}ms")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=500, help="Orders per run")
+    parser.add_argument("--port", type=int, default=9480, help="Local stub server port")
+    parser.add_argument("--batch", type=int, default=64, help="Orders per submit_orders batch")
+    args = parser.parse_args()
+
+    client = TradingClient(private_key="0x" + os.urandom(32).hex(), api_url=f"http://127.0.0.1:{args.port}",
+                           limiter=no_limit)
+    orders = [sample_order(client.account.address, i) for i in range(args.orders)]
+    assert legacy_sign(client, orders[0]).lower() == client.sign_order_fast(orders[0])[1].lower()
+
+    for label, fn in (("sign legacy", lambda o: legacy_sign(client, o)),
+                      ("sign cached EIP-712", client.sign_order_fast)):
+        hist = LatencyHistogram()
+        t0 = time.perf_counter()
+        for o in orders:
+            t = time.perf_counter()
+            fn(o)
+            hist.record(time.perf_counter() - t)
+        report(label, len(orders), time.perf_counter() - t0, hist)
+
+    start_stub_server(args.port)
+
+    hist = LatencyHistogram()
+    t0 = time.perf_counter()
+    for o in orders:
+        t = time.perf_counter()
+        requests.post(f"{client.api_url}/orders", json={"order": o, "signature": legacy_sign(client, o)})
+        hist.record(time.perf_counter() - t)
+    report("sign+send legacy", len(orders), time.perf_counter() - t0, hist)
+
+    async def fast_run():
+        hist = LatencyHistogram()
+        t0 = time.perf_counter()
+        for o in orders:
+            t = time.perf_counter()
+            await client.submit_order_fast(o)
+            hist.record(time.perf_counter() - t)
+        report("sign+send fast path", len(orders), time.perf_counter() - t0, hist)
+
+        batch = orders[:args.batch]
+        await client.submit_orders(batch[:client.sign_workers * 2])  # warm the pool
+        t0 = time.perf_counter()
+        for o in batch:
+            await client.submit_order_fast(o)
+        serial = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        results = await client.submit_orders(batch)
+        pooled = time.perf_counter() - t0
+        failed = sum(1 for r in results if not r["ok"])
+        print(f"[LLMM] batch of {len(batch)}: serial {serial * 1000:.1f}ms | submit_orders "
+              f"{pooled * 1000:.1f}ms on {client.sign_workers} workers ({serial / pooled:.2f}x, {failed} failed)")
+        await client.close()
+
+    asyncio.run(fast_run())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Quoting kernel benchmark
+- Builds N synthetic markets (mids, inventories, volatilities, expirations)
+- Times a per-market Python loop against core.quoting.compute_quotes (one NumPy pass)
+- Times a full QuotingKernel.requote cycle where ~5% of mids moved
+"""
+
+import argparse
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from core.quoting import QuoteParams, QuotingKernel, compute_quotes, time_to_expiry
+
+def scalar_quotes(mids, inventories, sigmas, tte, p):
+    out = []
+    for mid, q, sigma, t in zip(mids, inventories, sigmas, tte):
+        var_t = sigma * sigma * t
+        r = mid - q * p.gamma * var_t
+        hs = max(0.5 * (p.gamma * var_t + (2.0 / p.gamma) * math.log1p(p.gamma / p.k)), p.tick)
+        bid = min(max(math.floor((r - hs) / p.tick + 1e-9) * p.tick, p.tick), 1.0 - 2 * p.tick)
+        ask = min(max(math.ceil((r + hs) / p.tick - 1e-9) * p.tick, bid + p.tick, 2 * p.tick), 1.0 - p.tick)
+        skew = q / p.max_inventory
+        out.append((round(bid, 4), round(ask, 4),
+                    p.base_size * min(max(1.0 - skew, 0.0), 1.0), p.base_size * min(max(1.0 + skew, 0.0), 1.0)))
+    return out
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    p = QuoteParams()
+    now = time.time()
+    for n in args.sizes:
+        mids = rng.uniform(0.05, 0.95, n)
+        inv = rng.normal(0, 30, n)
+        sig = rng.uniform(0.02, 0.2, n)
+        exp = now + rng.uniform(60, 7 * 86400, n)
+        tte = time_to_expiry(exp, now)
+
+        vec = compute_quotes(mids, inv, sig, tte, p)
+        ref = scalar_quotes(mids.tolist(), inv.tolist(), sig.tolist(), tte.tolist(), p)
+        assert np.allclose(np.array(ref).T, np.vstack(vec))
+
+        t_loop = best_of(lambda: scalar_quotes(mids.tolist(), inv.tolist(), sig.tolist(), tte.tolist(), p), args.repeat)
+        t_vec = best_of(lambda: compute_quotes(mids, inv, sig, tte, p), args.repeat)
+
+        kernel = QuotingKernel([f"m{i}" for i in range(n)], p)
+        kernel.mids[:], kernel.inventories[:], kernel.sigmas[:], kernel.expiration_ts[:] = mids, inv, sig, exp
+        kernel.requote(now)
+        moved = rng.choice(n, n // 20, replace=False)
+        def cycle():
+            kernel.mids[moved] += rng.choice([-0.02, 0.02], len(moved))
+            return kernel.requote(now)
+        t_cycle = best_of(cycle, args.repeat)
+        changes = len(cycle())
+
+        print(f"[LLMM] {n:>6} markets | python loop {t_loop * 1000:8.2f}ms | numpy {t_vec * 1000:6.2f}ms "
+              f"({t_loop / t_vec:5.1f}x) | requote cycle {t_cycle * 1000:6.2f}ms → {changes} quotes")
+
+if __name__ == "__main__":
+    main()
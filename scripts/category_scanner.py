@@ -1,37 +1,126 @@
 #!/usr/bin/env python3
 """
 Category-specific market fetcher
+- Single category (default), or --all: every CATEGORY_MAP category fetched
+  concurrently over one authenticated session
+- --all merges results into one catalog deduplicated by conditionId (with
+  each market's category membership) and writes <category>_markets.json
+  ({conditionId: title}, same shape as hourly_markets.json) per category
+  plus all_markets.json; a category whose fetch failed keeps its previous
+  file, and all_markets.json is only rewritten when every category succeeded
 """
 
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import requests
 from limitless_auth import get_session
+from core.rate_limiter import scheduler, SCAN
+from core.categories import CATEGORY_MAP
 
 API_URL = "https://api.limitless.exchange"
 
-CATEGORY_MAP = {
-    "hourly": 29,
-    "daily": 30,
-    "weekly": 31,
-    "30-min": 33,
-    "crypto": 2,
-    "economy": 23,
-    "company-news": 19,
-    "other": 5,
-    "chinese": 39,
-    "korean": 42,
-    "billions-network-tge": 43,
-}
-
 def get_category_markets(session, category_name):
     cat_id = CATEGORY_MAP[category_name]
     url = f"{API_URL}/markets/active/{cat_id}"
-    r = session.get(url, timeout=30)
+    r = scheduler.request("GET", url, SCAN, session=session, timeout=30)
+    r.raise_for_status()
     payload = r.json()
     return payload.get("markets", []) or payload.get("data", [])
 
-if __name__ == "__main__":
+def _timed_fetch(session, category_name):
+    t0 = time.perf_counter()
+    markets = get_category_markets(session, category_name)
+    return markets, time.perf_counter() - t0
+
+def scan_all_categories(session, categories=None):
+    """Fetch every category concurrently over `session`. Returns ({category: markets}, {category: seconds});
+    failed categories are left out of the markets and have None as their time."""
+    categories = list(categories or CATEGORY_MAP)
+    # One pooled connection per in-flight category request, all sharing the auth cookie
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=len(categories))
+    session.mount("https://", adapter)
+    results, timings = {}, {}
+    with ThreadPoolExecutor(max_workers=len(categories)) as pool:
+        futures = {pool.submit(_timed_fetch, session, name): name for name in categories}
+        for fut in as_completed(futures):
+            name = futures[fut]
+            try:
+                results[name], timings[name] = fut.result()
+            except Exception as e:
+                print(f"[LLMM] Category {name} failed: {e}")
+                timings[name] = None
+    return results, timings
+
+def merge_catalog(per_category):
+    """{conditionId: {"title", "slug", "expirationDate", "categories": [...]}} across all categories."""
+    catalog = {}
+    for name, markets in per_category.items():
+        for m in markets:
+            cid = m.get("conditionId")
+            if not cid:
+                continue
+            entry = catalog.get(cid)
+            if entry is None:
+                entry = catalog[cid] = {
+                    "title": m.get("title"),
+                    "slug": m.get("slug"),
+                    "expirationDate": m.get("expirationDate"),
+                    "categories": [],
+                }
+            if name not in entry["categories"]:
+                entry["categories"].append(name)
+    return catalog
+
+def write_outputs(per_category, catalog, out_dir=".", complete=True):
+    """Write one file per fetched category; all_markets.json only from a `complete` scan."""
+    os.makedirs(out_dir, exist_ok=True)
+    for name, markets in per_category.items():
+        mapping = {m["conditionId"]: m.get("title") for m in markets if m.get("conditionId")}
+        with open(os.path.join(out_dir, f"{name}_markets.json"), "w") as f:
+            json.dump(mapping, f, indent=2)
+    if complete:
+        with open(os.path.join(out_dir, "all_markets.json"), "w") as f:
+            json.dump(catalog, f, indent=2)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--category", default="billions-network-tge", choices=sorted(CATEGORY_MAP))
+    parser.add_argument("--all", action="store_true", help="Fetch every category concurrently and merge")
+    parser.add_argument("--out-dir", default=".", help="Where --all writes its JSON files")
+    args = parser.parse_args()
+
     session = get_session()
-    markets = get_category_markets(session, "billions-network-tge")
-    print(f"[LLMM] Found {len(markets)} markets in Billions-Network-TGE")
-    for m in markets:
-        print(f"  + {m.get('title')} | Deadline {m.get('expirationDate')} | Volume {m.get('volumeFormatted')}")
+    if not args.all:
+        markets = get_category_markets(session, args.category)
+        print(f"[LLMM] Found {len(markets)} markets in {args.category}")
+        for m in markets:
+            print(f"  + {m.get('title')} | Deadline {m.get('expirationDate')} | Volume {m.get('volumeFormatted')}")
+        return
+
+    t0 = time.perf_counter()
+    per_category, timings = scan_all_categories(session)
+    wall = time.perf_counter() - t0
+    catalog = merge_catalog(per_category)
+    failed = [name for name, t in timings.items() if t is None]
+    write_outputs(per_category, catalog, args.out_dir, complete=not failed)
+
+    for name in CATEGORY_MAP:
+        t = timings.get(name)
+        print(f"[LLMM] {name:<22} {len(per_category.get(name, [])):>4} markets | "
+              f"{'failed' if t is None else f'{t * 1000:.0f}ms'}")
+    slowest = max((t for t in timings.values() if t is not None), default=0.0)
+    shared = sum(1 for e in catalog.values() if len(e["categories"]) > 1)
+    print(f"[LLMM] {len(catalog)} unique markets ({shared} in several categories) | "
+          f"wall {wall * 1000:.0f}ms vs slowest request {slowest * 1000:.0f}ms")
+    if failed:
+        print(f"[LLMM] Saved {len(per_category)} <category>_markets.json files to {args.out_dir}; "
+              f"kept the previous files for {', '.join(sorted(failed))} and all_markets.json")
+    else:
+        print(f"[LLMM] Saved {len(per_category)} <category>_markets.json files and all_markets.json to {args.out_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,8 @@ Limitless Exchange Cockpit
 - Connects WebSocket client
 - Starts refresh, probe, and silence monitor tasks
 - Provides a small helper to probe one market manually after connect
+- Profiler toggle: SIGUSR2 or `echo start|stop | nc 127.0.0.1 $PROFILER_PORT`
+- Warm restart: renders the last snapshot before connecting, snapshots every 30s
 """
 
 import asyncio
@@ -12,9 +14,35 @@ import json
 import os
 import sys
 from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from custom_websocket import CustomWebSocket
+from core.profiler import SamplingProfiler, install_signal_toggle, serve_profiler_control
+from core.memory_watchdog import MemoryWatchdog, trim_dict, trim_catalog
+from core.snapshot import load_snapshot, confirm_restored, SnapshotWriter
+from core.event_bus import bus, PRICES
 
 REFRESH_INTERVAL = 300  # seconds
+MAX_MARKET_TITLES = 5000
+
+def restore_snapshot(client):
+    """Load the last snapshot into the client before any network I/O and print it.
+    Returns (subscriptions, restored market keys)."""
+    snap = load_snapshot()
+    if snap is None:
+        return [], []
+    try:
+        n = snap.restore(client.markets, client.positions)
+        client.load_titles(snap.titles)
+        print(f"[LLMM] Restored {n} markets and {len(snap.positions)} positions from snapshot "
+              f"({int(snap.age or 0)}s old); reconciling with live data…")
+        for cid in snap.subscriptions:
+            m = client.markets.get(cid)
+            if m is not None:
+                print(f"[LLMM] {client._title(cid, cid[:6] + '…')} → YES={m.yes} | NO={m.no} (snapshot)")
+        return list(snap.subscriptions), snap.restored
+    finally:
+        snap.close()
 
 async def main():
     private_key = os.getenv("PRIVATE_KEY")
@@ -25,6 +53,28 @@ async def main():
     verbose = "--verbose" in sys.argv
     client = CustomWebSocket(private_key=private_key, verbose_logs=verbose)
 
+    profiler = SamplingProfiler().attach()
+    install_signal_toggle(profiler)
+    try:
+        await serve_profiler_control(profiler)
+    except OSError as e:
+        print(f"[LLMM] Profiler control socket unavailable ({e}); SIGUSR2 still toggles")
+
+    watchdog = MemoryWatchdog()
+    watchdog.register(
+        "market_titles", client.market_titles,
+        trim_dict(client.market_titles, MAX_MARKET_TITLES, protect=lambda: client.subscribed_markets),
+    )
+    watchdog.register("subscribed_markets", size=lambda: len(client.subscribed_markets))
+    watchdog.register("market_catalog", client.markets,
+                      trim_catalog(client.markets, MAX_MARKET_TITLES, protect=lambda: client.subscribed_markets))
+
+    snapshot_ids, restored = restore_snapshot(client)
+    confirm_feed = bus.subscribe(PRICES, name="snapshot-confirm")
+    snapshots = SnapshotWriter(lambda: {"titles": dict(client.market_titles),
+                                        "positions": client.positions.snapshot(),
+                                        "subscriptions": list(client.subscribed_markets)})
+
     try:
         await client.connect()
 
@@ -34,9 +84,10 @@ async def main():
                 data = json.load(f)
             if isinstance(data, dict):
                 condition_ids = list(data.keys())
-                client.market_titles.update(data)
+                client.load_titles(data)
             else:
                 condition_ids = data
+        condition_ids = condition_ids or snapshot_ids
 
         if condition_ids:
             await client.subscribe_markets(condition_ids)
@@ -50,6 +101,11 @@ async def main():
         asyncio.create_task(client.refresh_from_file("hourly_markets.json", REFRESH_INTERVAL))
         asyncio.create_task(client.periodic_probe(60))
         asyncio.create_task(client.monitor_silence(300))
+        asyncio.create_task(watchdog.run())
+        asyncio.create_task(snapshots.run())
+        # Restored markets that live data doesn't confirm within a minute are dropped again
+        asyncio.create_task(confirm_restored(
+            restored, confirm_feed, protect=lambda: set(client.subscribed_markets) | client.positions.markets()))
 
         print("📡 Listening for events... Press Ctrl+C to stop")
 
@@ -65,6 +121,10 @@ async def main():
         await client.wait()
 
     finally:
+        try:
+            snapshots.save()
+        except Exception as e:
+            print(f"[LLMM] Final snapshot failed: {e}")
         await client.close()
 
 if __name__ == "__main__":
@@ -1,44 +1,40 @@
 # scripts/live_ws_dashboard.py
-import asyncio, curses, json
+import asyncio, curses
 from core.socket_subs import LimitlessWebSocket
+from core.models import market_catalog
+from core.position_book import PositionBook
+from core.memory_watchdog import MemoryWatchdog, trim_dict, trim_catalog
+from core.event_bus import bus, PRICES, POSITIONS
 
 REFRESH_INTERVAL = 1
+MAX_QUEUE = 10000
+MAX_MARKETS = 2000
 
-async def ws_listener(client, q):
-    while True:
-        msg = await client.recv()
-        try:
-            data = json.loads(msg)
-            await q.put(data)
-        except Exception as e:
-            print("[LLMM] Parse fail:", e)
-
-async def draw(stdscr, q):
+async def draw(stdscr, sub, state):
     curses.curs_set(0); stdscr.nodelay(True)
-    state = {"positions": [], "markets": {}}
 
     while True:
-        while not q.empty():
-            d = await q.get()
-            ch = d.get("channel")
-            if ch == "positions":
-                state["positions"] = d.get("positions", [])
-            elif ch == "markets":
-                mid = d.get("marketId")
-                state["markets"][mid] = d
+        for topic, d in sub.drain():
+            if topic == POSITIONS:
+                state["positions"].apply(d)
+            elif topic == PRICES:
+                mid = d.get("marketId") or d.get("market")
+                m = state["markets"][mid] = market_catalog.upsert(dict(d, conditionId=d.get("conditionId") or mid))
+                state["positions"].on_price(m.condition_id, m.prices)
 
         stdscr.clear()
         stdscr.addstr(0, 0, "[LLMM] WebSocket cockpit — /markets")
         stdscr.addstr(2, 0, "[Positions]")
-        if not state["positions"]:
+        positions = state["positions"].snapshot()
+        if not positions:
             stdscr.addstr(3, 2, "No open positions.")
         else:
-            for i, p in enumerate(state["positions"], start=3):
-                stdscr.addstr(i, 2, f"{p.get('market')} | {p.get('side')} | {p.get('size')} | PnL {p.get('pnl')}")
+            for i, p in enumerate(positions, start=3):
+                stdscr.addstr(i, 2, f"{p.title or p.market} | {p.side} | {p.size:g} | PnL {p.pnl:+.2f}")
 
         stdscr.addstr(10, 0, "[Markets]")
         for i, (mid, m) in enumerate(state["markets"].items(), start=11):
-            stdscr.addstr(i, 2, f"{m.get('title')} | {m.get('prices')} | exp {m.get('expirationDate')}")
+            stdscr.addstr(i, 2, f"{m.title} | {list(m.prices)} | exp {m.expiration_date}")
 
         stdscr.refresh()
         await asyncio.sleep(REFRESH_INTERVAL)
@@ -49,11 +45,20 @@ async def main():
     await client.subscribe_positions()
     await client.subscribe_markets(["0xMARKETID1", "0xMARKETID2"])  # replace
 
-    q = asyncio.Queue()
+    sub = bus.subscribe((PRICES, POSITIONS), name="ws_dashboard", maxsize=MAX_QUEUE)
+    state = {"positions": PositionBook(), "markets": {}}
+    watchdog = MemoryWatchdog()
+    watchdog.register("dashboard.markets", state["markets"], trim_dict(state["markets"], MAX_MARKETS))
+    # The catalog holds the Market objects: trimming only the dict above would free nothing
+    watchdog.register("market_catalog", market_catalog,
+                      trim_catalog(market_catalog, MAX_MARKETS,
+                                   protect=lambda: set(state["markets"]) | state["positions"].markets()))
+    watchdog.register("dashboard.queue", size=sub.queue.qsize)
     await asyncio.gather(
-        ws_listener(client, q),
+        client.pump(bus),
         client.heartbeat(),
-        curses.wrapper(lambda s: asyncio.run(draw(s, q)))
+        watchdog.run(),
+        curses.wrapper(lambda s: asyncio.run(draw(s, sub, state)))
     )
 
 if __name__ == "__main__":
@@ -7,6 +7,7 @@ Features:
 - Uses canonical {"marketAddresses": [...]} subscribe payload and waits for server ack
 - Avoids emitting the same event name with different payload shapes
 - Optional single-market probe via request_market_snapshot (call/ack)
+- Local L2 order books from snapshot + delta payloads, resnapshotting on sequence gaps
 - Catch-all recursive JSON scanner that finds odds-like objects
 - Periodic probe, file-based refresh of market list, silence monitor, clean disconnect
 - REST snapshot fallback helper (uses aiohttp) for environments where socket stream doesn't produce prices
@@ -15,10 +16,18 @@ Features:
 import asyncio
 import json
 import os
+import sys
 import socketio
 from datetime import datetime
 from time import time
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.models import market_catalog, market_key
+from core.order_book import order_books, is_book_payload
+from core.event_bus import bus, PRICES, POSITIONS, SYSTEM, ORDERBOOK
+from core.position_book import PositionBook
+from core.session_cache import cached_cookie_for_key
+
 # Optional: only import aiohttp when REST fallback is used to avoid heavy dependency at import time
 try:
     import aiohttp  # used by rest_snapshot if needed
@@ -29,10 +38,14 @@ class CustomWebSocket:
     def __init__(self, websocket_url="wss://ws.limitless.exchange", private_key=None, verbose_logs=True):
         self.websocket_url = websocket_url
         self.private_key = private_key
-        self.session_cookie = None
+        # Reuse the REST login cached by limitless_auth.get_session() for the WS authenticate emit
+        self.session_cookie = cached_cookie_for_key(private_key)
         self.connected = False
         self.subscribed_markets = []
         self.market_titles = {}
+        self.markets = market_catalog
+        self.books = order_books
+        self.positions = PositionBook()
         self.last_non_system_event_ts = None
 
         self.sio = socketio.AsyncClient(
@@ -48,6 +61,8 @@ class CustomWebSocket:
         async def connect():
             self.connected = True
             print("✅ Connected to /markets")
+            # Re-read on every (re)connect: the REST login may have refreshed it
+            self.session_cookie = cached_cookie_for_key(self.private_key)
             if self.session_cookie:
                 await self.sio.emit("authenticate", f"Bearer {self.session_cookie}", namespace="/markets")
             if self.subscribed_markets:
@@ -61,8 +76,15 @@ class CustomWebSocket:
 
         @self.sio.event(namespace="/markets")
         async def system(data):
+            bus.publish(SYSTEM, data)
             print(f"[LLMM] System: {json.dumps(data)}")
 
+        @self.sio.event(namespace="/markets")
+        async def positions(data):
+            self.positions.apply(data)
+            bus.publish(POSITIONS, dict(data, kind="position") if isinstance(data, dict)
+                        else {"kind": "position", "positions": data})
+
         @self.sio.event(namespace="/markets")
         async def error(data):
             print(f"[LLMM] Server error on /markets: {json.dumps(data)}")
@@ -128,6 +150,10 @@ class CustomWebSocket:
             if event != "system":
                 self.last_non_system_event_ts = time()
 
+            if is_book_payload(data):
+                await self._on_book(event, data)
+                return
+
             if isinstance(data, dict):
                 keys = list(data.keys())
                 print(f"[LLMM] {ns} Raw event: {event} | Keys: {keys}")
@@ -175,7 +201,7 @@ class CustomWebSocket:
                     yes, no = prices[0], prices[1]
                 elif isinstance(prices, (str, int, float)):
                     yes = prices
-                title = self.market_titles.get(cid, (cid[:6] + "…") if isinstance(cid, str) else str(cid))
+                title = self._title(cid, (cid[:6] + "…") if isinstance(cid, str) else str(cid))
                 print(f"[LLMM] 🔎 Detected odds at {ns}:{event}:{path} → {title} | YES={yes} | NO={no}")
                 try:
                     snippet = json.dumps(raw, indent=2, sort_keys=True)
@@ -209,15 +235,50 @@ class CustomWebSocket:
         elif isinstance(prices, (str, int, float)):
             yes = prices
 
-        title = self.market_titles.get(cid, (cid[:6] + "…") if isinstance(cid, str) else "Unknown")
+        if isinstance(cid, str) and prices is not None:
+            self.markets.upsert({"conditionId": cid, "prices": prices, "volume": vol if isinstance(vol, (int, float)) else None})
+            bus.publish(PRICES, {"kind": "price", "market": cid, "prices": prices, "volume": vol}, market=cid)
+
+        title = self._title(cid, (cid[:6] + "…") if isinstance(cid, str) else "Unknown")
         print(f"[LLMM] {title} → YES={yes} | NO={no} | Vol={vol}")
 
+    async def _on_book(self, event, data):
+        """Feed a book snapshot/delta; on a sequence gap, resnapshot that market (one request
+        in flight, backing off while replies carry no book)."""
+        market = self.books.handle(event, data)
+        book_market = market_key(data)
+        if book_market is not None:
+            bus.publish(ORDERBOOK, data, market=book_market)
+        if market is None:
+            return
+        book = self.books.book(market)
+        try:
+            resp = await self.probe_one_market(market)
+            items = resp.get("markets") if isinstance(resp, dict) and isinstance(resp.get("markets"), list) else [resp]
+            for item in items:
+                if is_book_payload(item):
+                    book.apply_snapshot(item)
+        finally:
+            if book.resnapshot_inflight:
+                book.resnapshot_failed()
+
+    def _title(self, cid, default):
+        return self.market_titles.get(cid) or self.markets.title(cid, default)
+
+    def load_titles(self, mapping):
+        """Register {conditionId: title} (scanner output) as interned titles and catalog entries."""
+        for cid, title in mapping.items():
+            title = sys.intern(title) if isinstance(title, str) else title
+            self.market_titles[cid] = title
+            self.markets.upsert({"conditionId": cid, "title": title})
+
     async def connect(self, timeout=10, retries=3, retry_delay=3):
         """Connect with explicit headers, timeout and retries"""
         print(f"🔌 Connecting to {self.websocket_url}... (timeout={timeout}s, retries={retries})")
         connect_options = {"transports": ["websocket"]}
 
         headers = {"Origin": "https://limitless.exchange", "User-Agent": "LLMM/1.0"}
+        self.session_cookie = cached_cookie_for_key(self.private_key)
         if self.session_cookie:
             headers["Cookie"] = f"limitless_session={self.session_cookie}"
         connect_options["headers"] = headers
@@ -280,6 +341,8 @@ class CustomWebSocket:
 
         # Do NOT re-emit 'subscribe_market_prices' with different keys.
         # Optionally, probe single market via call-based snapshot if no prices flow in.
+        if self.session_cookie:
+            await self.sio.emit("subscribe_positions", payload, namespace="/markets")
         self.subscribed_markets = condition_ids
         print(f"[LLMM] Subscribed to {len(condition_ids)} markets (canonical only)")
 
@@ -332,7 +395,7 @@ class CustomWebSocket:
                         data = json.load(f)
                     if isinstance(data, dict):
                         new_ids = list(data.keys())
-                        self.market_titles.update(data)
+                        self.load_titles(data)
                     else:
                         new_ids = data
 
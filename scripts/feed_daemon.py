@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Feed daemon
+- Owns the exchange WebSocket (markets + positions channels)
+- Publishes latest prices and positions into the shared-memory feed table
+  (core.shm_table) so local tools read state without their own connections
+- --watch: attach as a reader and print the table (what any tool would do
+  with core.shm_table.FeedReader)
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.event_bus import bus, PRICES, POSITIONS
+from core.models import parse_prices
+from core.position_book import PositionBook, OUTCOMES
+from core.shm_table import FeedWriter, FeedReader, SHM_NAME, SHM_SLOTS
+
+HEARTBEAT = 1.0  # seconds
+
+async def serve(name, slots, market_ids):
+    from core.socket_subs import LimitlessWebSocket
+
+    table = FeedWriter(name, slots)
+    book = PositionBook()
+    sub = bus.subscribe((PRICES, POSITIONS), name="feed_daemon", maxsize=50000)
+    ws = LimitlessWebSocket()
+    await ws.connect()
+    await ws.subscribe_positions()
+    if market_ids:
+        await ws.subscribe_markets(market_ids)
+    asyncio.create_task(ws.heartbeat())
+    asyncio.create_task(ws.pump(bus))
+
+    async def beat():
+        while True:
+            table.beat()
+            await asyncio.sleep(HEARTBEAT)
+    asyncio.create_task(beat())
+
+    def write_position(market):
+        # One slot per market: NO shares count as negative size
+        yes, no = (book.positions.get((market, side)) for side in OUTCOMES)
+        if yes is None and no is None:
+            table.write_position(market, 0.0, 0.0, 0.0)
+        else:
+            table.write_position(market, (yes.size if yes else 0.0) - (no.size if no else 0.0),
+                                 (yes or no).avg_price, book.pnl(market))
+
+    print(f"[LLMM] Feed daemon publishing to shared memory '{name}' ({slots} slots)")
+    try:
+        async for topic, d in sub:
+            if topic == PRICES:
+                market = d.get("market")
+                if not market:
+                    continue
+                prices = parse_prices(d.get("prices"))
+                vol = d.get("volume")
+                table.write_price(market, prices[0] if prices else None,
+                                  prices[1] if len(prices) > 1 else None,
+                                  float(vol) if isinstance(vol, (int, float)) else None)
+                book.on_price(market, prices)
+                if book.holds(market):
+                    write_position(market)
+            else:
+                before = book.markets()
+                book.apply(d)
+                for market in before | book.markets():
+                    write_position(market)
+    finally:
+        table.close()
+
+def watch(name, interval):
+    reader = FeedReader(name)
+    try:
+        while True:
+            rows = reader.snapshot()
+            print(f"\033c[LLMM] {len(rows)} markets | daemon heartbeat {reader.age:.1f}s ago")
+            for key, r in list(rows.items())[:40]:
+                pos = f" | pos {r['size']:g} @ {r['avg_price']:.2f} PnL {r['pnl']:+.2f}" if r["size"] == r["size"] else ""
+                print(f"  {key[:10]}… YES={r['yes']:.3f} NO={r['no']:.3f}{pos}")
+            time.sleep(interval)
+    finally:
+        reader.close()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--name", default=SHM_NAME, help="Shared-memory block name")
+    parser.add_argument("--slots", type=int, default=SHM_SLOTS, help="Max markets in the table")
+    parser.add_argument("--markets", nargs="*", default=[], help="Market ids to subscribe")
+    parser.add_argument("--watch", action="store_true", help="Read and print the table instead of serving it")
+    parser.add_argument("--interval", type=float, default=1.0, help="--watch refresh seconds")
+    args = parser.parse_args()
+
+    if args.watch:
+        watch(args.name, args.interval)
+    else:
+        asyncio.run(serve(args.name, args.slots, args.markets))
+
+if __name__ == "__main__":
+    main()
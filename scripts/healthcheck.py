@@ -1 +1,95 @@
-import asyncio, json, requests, websocketsfrom core.config import LIMITLESS_API, MARKET_IDSdef test_rest():    try:        r = requests.get(f"{LIMITLESS_API}/auth/challenge", timeout=5)        if r.status_code == 200:            print("[LLMM] REST CONNECT OK")            print("Challenge response:", r.json())        else:            print(f"[LLMM] REST CONNECT FAIL (status {r.status_code})")    except Exception as e:        print(f"[LLMM] REST CONNECT ERROR: {e}")async def test_ws():    uri = f"{LIMITLESS_API.replace('https','wss')}/ws"    try:        async with websockets.connect(uri, ping_interval=None) as ws:            print("[LLMM] WS CONNECT OK")            if MARKET_IDS:                await ws.send(json.dumps({                    "action": "subscribe",                    "channel": "markets",                    "ids": [MARKET_IDS[0]]                }))                msg = await ws.recv()                print("[LLMM] WS SAMPLE EVENT:", msg)            else:                print("[LLMM] WS SUBSCRIBE SKIPPED (no MARKET_IDS in .env)")    except Exception as e:        print(f"[LLMM] WS CONNECT ERROR: {e}")def main():    print("[LLMM] Starting healthcheck...")    test_rest()    asyncio.run(test_ws())    print("[LLMM] Healthcheck complete.")if __name__ == "__main__":    main()
\ No newline at end of file
+#!/usr/bin/env python3
+"""
+LLMM Healthcheck
+- Scrapes the runner's Prometheus-text metrics endpoint
+- Prints per-stage latency, event rates, reconnects and drops
+- Exits non-zero when the endpoint is down or latency/flow is out of bounds
+"""
+
+import argparse
+import sys
+import urllib.request
+
+DEFAULT_URL = "http://127.0.0.1:9464/metrics"
+
+def fetch_metrics(url, timeout=3):
+    with urllib.request.urlopen(url, timeout=timeout) as r:
+        return r.read().decode()
+
+def parse_metrics(text):
+    """Parse Prometheus text into {(name, frozenset(labels)): value}."""
+    samples = {}
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        try:
+            head, value = line.rsplit(" ", 1)
+            value = float(value)
+        except ValueError:
+            continue
+        labels = {}
+        name = head
+        if "{" in head:
+            name, rest = head.split("{", 1)
+            for part in rest.rstrip("}").split(","):
+                if "=" in part:
+                    k, v = part.split("=", 1)
+                    labels[k] = v.strip('"')
+        samples[(name, frozenset(labels.items()))] = value
+    return samples
+
+def select(samples, name, **labels):
+    want = set((k, str(v)) for k, v in labels.items())
+    return [(dict(l), v) for (n, l), v in samples.items() if n == name and want <= l]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default=DEFAULT_URL, help="Metrics endpoint URL")
+    parser.add_argument("--max-p99-ms", type=float, default=1000.0,
+                        help="Fail if any end_to_end p99 exceeds this")
+    parser.add_argument("--min-rate", type=float, default=0.0,
+                        help="Fail if total events/sec is below this")
+    args = parser.parse_args()
+
+    try:
+        samples = parse_metrics(fetch_metrics(args.url))
+    except Exception as e:
+        print(f"[LLMM] UNHEALTHY: metrics endpoint unreachable ({e})")
+        return 2
+
+    problems = []
+    uptime = select(samples, "llmm_uptime_seconds")
+    print(f"[LLMM] Uptime: {uptime[0][1]:.0f}s" if uptime else "[LLMM] Uptime: ?")
+
+    print("[LLMM] Stage latency p50 / p99 (ms):")
+    stages = {}
+    for labels, v in select(samples, "llmm_stage_seconds"):
+        key = (labels.get("stage"), labels.get("type"))
+        stages.setdefault(key, {})[labels.get("quantile")] = v
+    for (stage, etype), qs in sorted(stages.items()):
+        p50 = qs.get("0.5", 0.0) * 1000
+        p99 = qs.get("0.99", 0.0) * 1000
+        print(f"  {stage:<13} {etype:<12} {p50:9.2f} / {p99:9.2f}")
+        if stage == "end_to_end" and p99 > args.max_p99_ms:
+            problems.append(f"{etype} end_to_end p99 {p99:.1f}ms > {args.max_p99_ms}ms")
+
+    total_rate = 0.0
+    for labels, v in select(samples, "llmm_events_per_second"):
+        print(f"[LLMM] Events/sec {labels.get('type')}: {v:.2f}")
+        total_rate += v
+    if total_rate < args.min_rate:
+        problems.append(f"event rate {total_rate:.2f}/s < {args.min_rate}/s")
+
+    for name in ("llmm_reconnects_total", "llmm_dropped_updates_total"):
+        for labels, v in select(samples, name):
+            print(f"[LLMM] {name}{{source={labels.get('source')}}} = {v:.0f}")
+
+    if problems:
+        for p in problems:
+            print(f"[LLMM] UNHEALTHY: {p}")
+        return 1
+    print("[LLMM] HEALTHY")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,23 @@
 import json
 import asyncio
-import datetime
 import requests
 import websockets
 import argparse
+import os
+import sys
 import time
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.rate_limiter import scheduler, MARKET_DATA
+from core.hour_scheduler import HourRollover, HOUR
+from core.models import parse_expiration
+
+# Optional: only the warm rollover feed needs it
+try:
+    import aiohttp
+except Exception:
+    aiohttp = None
+
 API_URL = "https://api.limitless.exchange"
 
 def list_active_markets(page=1, limit=50, retries=3):
@@ -15,7 +27,7 @@ def list_active_markets(page=1, limit=50, retries=3):
     print(f"[LLMM] Listing active markets: {url} {params}")
     for attempt in range(retries):
         try:
-            r = requests.get(url, params=params, timeout=30)
+            r = scheduler.request("GET", url, MARKET_DATA, params=params, timeout=30)
             if r.status_code == 200:
                 data = r.json()
                 markets = data.get("data", [])
@@ -47,65 +59,87 @@ def discover_hourly_market(page=1, limit=10):
     print(f"[LLMM] Selected Hourly market slug={m['slug']} id={m['id']} title={m['title']}")
     return m["slug"], m["id"]
 
-def test_rest_market(slug, label):
-    """Probe REST market endpoint for a given slug."""
-    url = f"{API_URL}/api-v1/markets/{slug}"
-    print(f"[LLMM] {label} REST market probe: {url}")
-    try:
-        r = requests.get(url, timeout=15)
-        print("[LLMM] Status:", r.status_code)
-        if r.status_code == 200:
-            try:
-                data = r.json()
-                print("[LLMM] REST MARKET OK")
-                print(json.dumps(data, indent=2)[:500], "...")
-            except Exception:
-                print("[LLMM] Response not JSON, body sample:", r.text[:200], "...")
-        else:
-            print("[LLMM] REST MARKET FAIL")
-            print("Body sample:", r.text[:200], "...")
-    except Exception as e:
-        print("[LLMM] REST ERROR:", e)
-
-async def test_ws(market_id):
-    """Subscribe to WS feed for a given market id."""
-    uri = f"{API_URL}/api-v1/ws".replace("https", "wss")
-    print(f"[LLMM] Testing WS: {uri}")
-    try:
-        async with websockets.connect(uri, ping_interval=None) as ws:
-            print("[LLMM] WS CONNECT OK")
-            sub = {
-                "action": "subscribe",
-                "channel": "markets",
-                "ids": [market_id]
-            }
-            await ws.send(json.dumps(sub))
-            print(f"[LLMM] Subscribed to market id={market_id}")
-            for _ in range(5):
-                msg = await ws.recv()
-                print("[LLMM] WS EVENT:", msg)
-    except Exception as e:
-        print("[LLMM] WS ERROR:", e)
+class WarmFeed:
+    """Keep-alive HTTP session and an open WS, established before the boundary."""
+
+    def __init__(self):
+        self.http = None
+        self.ws = None
+        self.drain_task = None
+        self.ws_uri = f"{API_URL}/api-v1/ws".replace("https", "wss")
+
+    async def prewarm(self):
+        if aiohttp is None:
+            raise RuntimeError("aiohttp not available; install aiohttp to run the hourly rollover")
+        t0 = time.perf_counter()
+        if self.http is None or self.http.closed:
+            self.http = aiohttp.ClientSession(connector=aiohttp.TCPConnector(keepalive_timeout=300, ttl_dns_cache=3600))
+        await self.fetch_hourly(limit=1)  # DNS + TCP + TLS now, not at the boundary
+        if self.ws is None or self.ws.closed:
+            self.ws = await websockets.connect(self.ws_uri, ping_interval=20)
+        print(f"[LLMM] Connections warm in {(time.perf_counter() - t0) * 1000:.0f}ms")
+
+    async def fetch_hourly(self, limit=10):
+        await scheduler.acquire_async(MARKET_DATA)
+        params = {"page": "1", "limit": str(limit), "sortBy": "newest"}
+        async with self.http.get(f"{API_URL}/markets/active", params=params,
+                                 timeout=aiohttp.ClientTimeout(total=10)) as r:
+            scheduler.observe(r.status, r.headers.get("Retry-After"))
+            if r.status != 200:
+                return []
+            data = await r.json(content_type=None)
+        return [m for m in data.get("data", []) if "Hourly" in m.get("categories", [])]
+
+    async def subscribe(self, market_id):
+        await self.ws.send(json.dumps({"action": "subscribe", "channel": "markets", "ids": [market_id]}))
+
+    async def drain(self, n=5):
+        for _ in range(n):
+            print("[LLMM] WS EVENT:", await self.ws.recv())
+
+    def start_drain(self):
+        """One drain task at a time: cancel the previous market's before starting the next."""
+        if self.drain_task is not None:
+            self.drain_task.cancel()
+        self.drain_task = asyncio.create_task(self.drain())
+
+    async def close(self):
+        if self.drain_task is not None:
+            self.drain_task.cancel()
+        if self.ws is not None:
+            await self.ws.close()
+        if self.http is not None:
+            await self.http.close()
 
 async def hourly_scanner(slug, market_id, fast_forward=False):
-    """Run probes at HH:59:55 and HH:00:15 (or fast-forward for testing)."""
-    while True:
-        if fast_forward:
-            before = datetime.datetime.now() + datetime.timedelta(seconds=10)
-            after = datetime.datetime.now() + datetime.timedelta(seconds=20)
-        else:
-            now = datetime.datetime.now()
-            next_hour = (now.replace(minute=0, second=0, microsecond=0)
-                         + datetime.timedelta(hours=1))
-            before = next_hour - datetime.timedelta(seconds=5)
-            after = next_hour + datetime.timedelta(seconds=15)
-
-        await asyncio.sleep((before - datetime.datetime.now()).total_seconds())
-        test_rest_market(slug, "PREVIOUS HOUR END")
-
-        await asyncio.sleep((after - datetime.datetime.now()).total_seconds())
-        test_rest_market(slug, "NEXT HOUR START")
-        await test_ws(market_id)
+    """Roll to each new Hourly market at the hour (every 30s in fast-forward mode)."""
+    feed = WarmFeed()
+    current = {"id": market_id, "slug": slug}
+
+    async def discover(boundary):
+        # The market for the coming hour is still open at the boundary and, outside
+        # fast-forward mode, closes within the hour after it; soonest expiry first
+        listed = []
+        for m in await feed.fetch_hourly():
+            exp = parse_expiration(m)
+            if exp is None or exp <= boundary or (not fast_forward and exp > boundary + HOUR):
+                continue
+            if fast_forward or m["id"] != current["id"]:
+                listed.append((exp, m))
+        return min(listed, key=lambda x: x[0])[1] if listed else None
+
+    async def subscribe(m):
+        await feed.subscribe(m["id"])
+        print(f"[LLMM] Subscribed to next Hourly market slug={m['slug']} id={m['id']}")
+        current.update(id=m["id"], slug=m["slug"])
+        feed.start_drain()
+
+    rollover = HourRollover(feed.prewarm, discover, subscribe,
+                            period=30 if fast_forward else HOUR, lead=10 if fast_forward else 30)
+    try:
+        await rollover.run()
+    finally:
+        await feed.close()
 
 def main():
     parser = argparse.ArgumentParser()
@@ -121,4 +155,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-s
\ No newline at end of file
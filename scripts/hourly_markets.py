@@ -5,40 +5,71 @@ Limitless Exchange Hourly Markets Continuous Scanner
 
 import time
 from limitless_auth import get_session
+from core.rate_limiter import scheduler, SCAN
+from core.catalog_sync import CatalogSync, ADDED, CHANGED, REMOVED
 
 API_URL = "https://api.limitless.exchange"
+PAGE_LIMIT = 50
+MAX_PAGES = 40  # safety stop for the pagination loop
 
-def fetch_active_markets(session, page=1, limit=50):
-    """Fetch active markets feed."""
+def fetch_active_markets(session, page=1, limit=PAGE_LIMIT):
+    """Fetch one page of the active markets feed; None when the request fails."""
     url = f"{API_URL}/markets/active"
     params = {"page": str(page), "limit": str(limit), "sortBy": "newest"}
-    r = session.get(url, params=params, timeout=30)
+    r = scheduler.request("GET", url, SCAN, session=session, params=params, timeout=30)
     if r.status_code != 200:
         print(f"[LLMM] Error fetching markets: {r.status_code}")
-        return []
+        return None
     try:
         return r.json().get("data", [])
     except Exception:
         print("[LLMM] Failed to parse JSON")
-        return []
+        return None
 
-def scan_hourly(session, seen_ids):
-    """Scan for Hourly markets and print new ones."""
-    markets = fetch_active_markets(session)
-    hourly = [m for m in markets if "Hourly" in m.get("categories", [])]
-    for m in hourly:
-        if m["id"] not in seen_ids:
+def print_deltas(deltas):
+    for d in deltas:
+        if d.kind == ADDED:
+            m = d.market
             print(f"[LLMM] NEW Hourly Market → ID {m['id']} | {m['title']} | Status: {m['status']}")
-            seen_ids.add(m["id"])
+        elif d.kind == CHANGED:
+            m = d.market
+            print(f"[LLMM] CHANGED Hourly Market → ID {m['id']} | {m['title']} | {', '.join(d.fields)}"
+                  f" | Status: {m['status']} | Prices: {m.get('prices')}")
+        elif d.kind == REMOVED:
+            print(f"[LLMM] REMOVED Hourly Market → ID {d.previous['id']} | {d.previous['title']}")
+
+def scan_hourly(session, sync):
+    """Scan every page of active markets for Hourly ones and publish added/changed/removed deltas.
+
+    Removals are only reported when every page was fetched; a failed or
+    truncated scan still reports additions and changes."""
+    markets, complete = [], False
+    for page in range(1, MAX_PAGES + 1):
+        batch = fetch_active_markets(session, page=page)
+        if batch is None:
+            break
+        markets.extend(batch)
+        if len(batch) < PAGE_LIMIT:
+            complete = True
+            break
+    if not markets:
+        return []  # failed fetch: don't report every market as removed
+    hourly = [m for m in markets if "Hourly" in m.get("categories", [])]
     if not hourly:
         print("[LLMM] No Hourly markets found at this refresh.")
+    if not complete:
+        print("[LLMM] Partial market scan; removals held until a full scan")
+    return sync.update(hourly, complete=complete)
 
 def main():
     session = get_session()
-    seen_ids = set()
+    sync = CatalogSync()
+    sync.subscribe(print_deltas)
     print("[LLMM] Starting continuous Hourly market scanner...")
     while True:
-        scan_hourly(session, seen_ids)
+        deltas = scan_hourly(session, sync)
+        if not deltas:
+            print(f"[LLMM] No changes ({len(sync.records)} Hourly markets tracked)")
         time.sleep(300)  # refresh every 5 minutes
 
 if __name__ == "__main__":
@@ -4,31 +4,72 @@ Hourly Market Scanner with Debug
 - Fetches active hourly markets
 - Saves {conditionId: title} mapping
 - Prints raw payload samples for operator clarity
+- --watch N: re-scan every page of active markets every N seconds
+  (`hourly_markets.scan_hourly`), print added/changed/removed deltas and
+  rewrite the mapping only when the set of markets or a title changed
 """
 
+import argparse
 import json
+import time
 from limitless_auth import get_session
+from core.rate_limiter import scheduler, SCAN
+from core.catalog_sync import CatalogSync, ADDED, REMOVED
+from hourly_markets import scan_hourly
 
 API_URL = "https://api.limitless.exchange"
 
 def get_hourly_markets(session):
     url = f"{API_URL}/markets/active/29"  # categoryId for hourly
-    r = session.get(url, timeout=30)
+    r = scheduler.request("GET", url, SCAN, session=session, timeout=30)
     r.raise_for_status()
     payload = r.json()
     return payload.get("markets", []) or payload.get("data", [])
 
-if __name__ == "__main__":
-    session = get_session()
-    hourly_markets = get_hourly_markets(session)
-
-    # Build mapping {conditionId: title}
+def build_market_map(markets):
+    """{conditionId: title} for every market that has both."""
     market_map = {}
-    for m in hourly_markets:
+    for m in markets:
         cid = m.get("conditionId")
         title = m.get("title")
         if cid and title:
             market_map[cid] = title
+    return market_map
+
+def save_market_map(market_map):
+    with open("hourly_markets.json", "w") as f:
+        json.dump(market_map, f, indent=2)
+
+def watch(session, interval):
+    sync = CatalogSync()
+
+    def on_deltas(deltas):
+        for d in deltas:
+            title = (d.market or d.previous).get("title")
+            print(f"[LLMM] {d.kind.upper():<7} {str(d.key)[:8]}… {title} {', '.join(d.fields)}")
+        if any(d.kind in (ADDED, REMOVED) or "title" in d.fields for d in deltas):
+            save_market_map(build_market_map(sync.records.values()))
+            print(f"[LLMM] Saved hourly_markets.json ({len(sync.records)} markets)")
+
+    sync.subscribe(on_deltas)
+    while True:
+        try:
+            scan_hourly(session, sync)
+        except Exception as e:
+            print(f"[LLMM] Poll failed: {e}")
+        time.sleep(interval)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--watch", type=int, metavar="SECONDS", help="Keep polling and apply deltas")
+    args = parser.parse_args()
+
+    session = get_session()
+    if args.watch:
+        watch(session, args.watch)
+
+    hourly_markets = get_hourly_markets(session)
+    market_map = build_market_map(hourly_markets)
 
     print(f"[LLMM] Hourly markets discovered: {len(market_map)}")
 
@@ -40,6 +81,5 @@ if __name__ == "__main__":
         print(f"   {cid[:6]}… → {title}")
 
     # Save mapping to file
-    with open("hourly_markets.json", "w") as f:
-        json.dump(market_map, f, indent=2)
+    save_market_map(market_map)
     print("[LLMM] Saved hourly_markets.json")
\ No newline at end of file
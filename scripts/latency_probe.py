@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Latency probe
+- Fires N concurrent samples at each endpoint, every sample on a fresh connection:
+    rest  GET  <API_URL>/markets/active
+    ws    socket.io /markets namespace (WebSocket upgrade → engine.io open → namespace ack)
+    rpc   POST eth_blockNumber to the Base RPC
+- Times each phase separately: dns, connect (TCP), tls, first_byte, total
+- Prints p50/p95/p99 per phase; several URLs per kind compare endpoints/regions
+- HTTP status >= 400 and JSON-RPC `error` replies count as errors, not latency samples
+- --every N repeats on a schedule; --out appends one JSON line per endpoint per round
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import socket
+import ssl
+import time
+from urllib.parse import urlsplit
+
+API_URL = os.getenv("API_URL", "https://api.limitless.exchange")
+WS_URL = os.getenv("WS_URL", "wss://ws.limitless.exchange")
+BASE_RPC = os.getenv("BASE_RPC", "https://mainnet.base.org")
+PHASES = ("dns", "connect", "tls", "first_byte", "total")
+HEADERS = {"Origin": "https://limitless.exchange", "User-Agent": "LLMM/1.0"}
+
+class ProbeError(Exception):
+    def __init__(self, phase, error):
+        super().__init__(f"{phase}: {type(error).__name__}: {error}")
+        self.phase = phase
+
+async def _open(url, timings, t0):
+    """DNS, TCP connect and TLS handshake as separate timed steps. Returns (reader, writer, host)."""
+    parts = urlsplit(url)
+    secure = parts.scheme in ("https", "wss")
+    host = parts.hostname
+    port = parts.port or (443 if secure else 80)
+    loop = asyncio.get_running_loop()
+    phase = "dns"
+    try:
+        infos = await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        timings["dns"] = time.perf_counter() - t0
+        phase = "connect"
+        family, type_, proto, _, addr = infos[0]
+        sock = socket.socket(family, type_, proto)
+        sock.setblocking(False)
+        try:
+            await loop.sock_connect(sock, addr)
+        except BaseException:
+            sock.close()
+            raise
+        reader, writer = await asyncio.open_connection(sock=sock)
+        timings["connect"] = time.perf_counter() - t0 - timings["dns"]
+        phase = "tls"
+        if secure:
+            t = time.perf_counter()
+            await writer.start_tls(ssl.create_default_context(), server_hostname=host)
+            timings["tls"] = time.perf_counter() - t
+        else:
+            timings["tls"] = 0.0
+    except Exception as e:
+        raise ProbeError(phase, e) from e
+    return reader, writer, host
+
+def _decode_body(raw):
+    """Body of a raw HTTP/1.1 response (handles chunked transfer encoding)."""
+    head, _, body = raw.partition(b"\r\n\r\n")
+    if b"transfer-encoding: chunked" not in head.lower():
+        return body
+    out = b""
+    while body:
+        size_line, _, rest = body.partition(b"\r\n")
+        try:
+            n = int(size_line.split(b";")[0], 16)
+        except ValueError:
+            break
+        if n == 0:
+            break
+        out += rest[:n]
+        body = rest[n + 2:]
+    return out
+
+def _request(method, parts, host, headers, body=b""):
+    path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+    lines = [f"{method} {path} HTTP/1.1", f"Host: {host}"]
+    lines += [f"{k}: {v}" for k, v in headers.items()]
+    if body:
+        lines.append(f"Content-Length: {len(body)}")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode() + body
+
+async def probe_http(url, method="GET", body=None):
+    """One HTTP sample on a fresh connection (Connection: close, body read to EOF)."""
+    timings = {}
+    t0 = time.perf_counter()
+    reader, writer, host = await _open(url, timings, t0)
+    phase = "first_byte"
+    try:
+        payload = json.dumps(body).encode() if body is not None else b""
+        headers = dict(HEADERS, Accept="application/json", Connection="close")
+        if body is not None:
+            headers["Content-Type"] = "application/json"
+        t = time.perf_counter()
+        writer.write(_request(method, urlsplit(url), host, headers, payload))
+        await writer.drain()
+        first = await reader.read(1)
+        if not first:
+            raise ConnectionError("connection closed before response")
+        timings["first_byte"] = time.perf_counter() - t
+        phase = "total"
+        status_line = first + await reader.readline()
+        raw = await reader.read()  # rest of headers + body until the server closes
+        timings["total"] = time.perf_counter() - t0
+        timings["status"] = int(status_line.split()[1])
+        if isinstance(body, dict) and "jsonrpc" in body:
+            try:
+                reply = json.loads(_decode_body(raw))
+            except ValueError:
+                reply = None
+            if isinstance(reply, dict) and reply.get("error"):
+                err = reply["error"]
+                timings["rpc_error"] = str(err.get("message", err) if isinstance(err, dict) else err)
+    except Exception as e:
+        raise ProbeError(phase, e) from e
+    finally:
+        writer.close()
+    return timings
+
+async def _ws_recv(reader):
+    """Next text frame payload from the server (unmasked frames; pings/others skipped)."""
+    while True:
+        b0, b1 = await reader.readexactly(2)
+        n = b1 & 0x7F
+        if n == 126:
+            n = int.from_bytes(await reader.readexactly(2), "big")
+        elif n == 127:
+            n = int.from_bytes(await reader.readexactly(8), "big")
+        data = await reader.readexactly(n)
+        if b0 & 0x0F == 0x1:
+            return data.decode()
+        if b0 & 0x0F == 0x8:
+            raise ConnectionError("websocket closed by server")
+
+def _ws_frame(text):
+    data = text.encode()
+    mask = os.urandom(4)
+    header = bytes([0x81, 0x80 | len(data)]) if len(data) < 126 else \
+        bytes([0x81, 0x80 | 126]) + len(data).to_bytes(2, "big")
+    return header + mask + bytes(b ^ mask[i % 4] for i, b in enumerate(data))
+
+async def probe_socketio(url, namespace="/markets"):
+    """One socket.io sample: first_byte = HTTP 101, total = namespace connect ack."""
+    timings = {}
+    t0 = time.perf_counter()
+    url = url.rstrip("/") + "/socket.io/?EIO=4&transport=websocket"
+    reader, writer, host = await _open(url, timings, t0)
+    phase = "first_byte"
+    try:
+        headers = dict(HEADERS, Upgrade="websocket", Connection="Upgrade",
+                       **{"Sec-WebSocket-Key": base64.b64encode(os.urandom(16)).decode(),
+                          "Sec-WebSocket-Version": "13"})
+        t = time.perf_counter()
+        writer.write(_request("GET", urlsplit(url), host, headers))
+        await writer.drain()
+        status_line = await reader.readline()
+        timings["first_byte"] = time.perf_counter() - t
+        timings["status"] = int(status_line.split()[1])
+        if timings["status"] != 101:
+            raise ConnectionError(f"upgrade refused: {status_line.decode().strip()}")
+        phase = "total"
+        while (await reader.readline()) not in (b"\r\n", b""):
+            pass
+        if not (await _ws_recv(reader)).startswith("0"):  # engine.io open
+            raise ConnectionError("no engine.io open packet")
+        writer.write(_ws_frame(f"40{namespace},"))
+        await writer.drain()
+        while True:
+            msg = await _ws_recv(reader)
+            if msg == "2":  # engine.io ping
+                writer.write(_ws_frame("3"))
+                continue
+            if msg.startswith(f"40{namespace}"):
+                break
+            if msg.startswith(f"44{namespace}"):
+                raise ConnectionError(f"namespace refused: {msg}")
+        timings["total"] = time.perf_counter() - t0
+        writer.write(bytes([0x88, 0x80]) + os.urandom(4))  # masked close frame, no payload
+    except ProbeError:
+        raise
+    except Exception as e:
+        raise ProbeError(phase, e) from e
+    finally:
+        writer.close()
+    return timings
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    k = max(0, min(len(sorted_values) - 1, -(-p * len(sorted_values) // 100) - 1))
+    return sorted_values[int(k)]
+
+def sample_error(s):
+    """Error key of a failed sample, None for a good one (HTTP >= 400 and JSON-RPC errors fail)."""
+    if isinstance(s, Exception):
+        return str(s) if isinstance(s, ProbeError) else f"{type(s).__name__}: {s}"
+    if s.get("status", 0) >= 400:
+        return f"HTTP {s['status']}"
+    if s.get("rpc_error"):
+        return f"rpc error: {s['rpc_error']}"
+    return None
+
+def summarize(samples):
+    ok = [s for s in samples if sample_error(s) is None]
+    out = {"samples": len(samples), "ok": len(ok), "errors": {}, "status": {}}
+    for s in samples:
+        if not isinstance(s, Exception) and "status" in s:
+            out["status"][s["status"]] = out["status"].get(s["status"], 0) + 1
+        key = sample_error(s)
+        if key is not None:
+            out["errors"][key[:120]] = out["errors"].get(key[:120], 0) + 1
+    for phase in PHASES:
+        values = sorted(s[phase] for s in ok if phase in s)
+        out[phase] = {f"p{p}": round(percentile(values, p) * 1000, 2) if values else None for p in (50, 95, 99)}
+    return out
+
+async def run_round(targets, samples, timeout):
+    async def sample(fn, *args):
+        try:
+            return await asyncio.wait_for(fn(*args), timeout)
+        except asyncio.TimeoutError:
+            return ProbeError("timeout", TimeoutError(f"no result within {timeout}s"))
+        except Exception as e:
+            return e
+
+    async def probe_target(kind, url, fn, args):
+        results = await asyncio.gather(*(sample(fn, *args) for _ in range(samples)))
+        return dict(summarize(results), kind=kind, url=url)
+
+    return await asyncio.gather(*(probe_target(*t) for t in targets))
+
+def build_targets(args):
+    targets = []
+    if "rest" in args.endpoints:
+        targets += [("rest", u, probe_http, (u.rstrip("/") + "/markets/active",)) for u in args.rest_url]
+    if "ws" in args.endpoints:
+        targets += [("ws", u, probe_socketio, (u, args.namespace)) for u in args.ws_url]
+    if "rpc" in args.endpoints:
+        rpc = {"jsonrpc": "2.0", "id": 1, "method": "eth_blockNumber", "params": []}
+        targets += [("rpc", u, probe_http, (u, "POST", rpc)) for u in args.rpc_url]
+    return targets
+
+def print_round(results, samples):
+    print(f"[LLMM] Latency probe {time.strftime('%H:%M:%S')} — {samples} concurrent samples per endpoint (ms)")
+    print(f"  {'endpoint':<46} {'ok':>5}  " + "  ".join(f"{p:>18}" for p in PHASES))
+    print(f"  {'':<46} {'':>5}  " + "  ".join(f"{'p50/p95/p99':>18}" for _ in PHASES))
+    for r in results:
+        def cell(phase):
+            v = r[phase]
+            if v["p50"] is None:
+                return f"{'-':>18}"
+            return f"{v['p50']:.0f}/{v['p95']:.0f}/{v['p99']:.0f}".rjust(18)
+        name = f"{r['kind']} {r['url']}"[:46]
+        print(f"  {name:<46} {r['ok']:>2}/{r['samples']:<2}  " + "  ".join(cell(p) for p in PHASES))
+        for err, n in r["errors"].items():
+            print(f"      {n}x {err}")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--endpoints", nargs="+", choices=("rest", "ws", "rpc"), default=["rest", "ws", "rpc"])
+    parser.add_argument("--rest-url", nargs="+", default=[API_URL], help="REST base URL(s)")
+    parser.add_argument("--ws-url", nargs="+", default=[WS_URL], help="socket.io base URL(s)")
+    parser.add_argument("--rpc-url", nargs="+", default=[BASE_RPC], help="Base RPC URL(s)")
+    parser.add_argument("--namespace", default="/markets", help="socket.io namespace")
+    parser.add_argument("-n", "--samples", type=int, default=20, help="Concurrent samples per endpoint")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Per-sample timeout, seconds")
+    parser.add_argument("--every", type=float, help="Repeat every N seconds")
+    parser.add_argument("--out", help="Append results to this JSONL file")
+    args = parser.parse_args()
+
+    targets = build_targets(args)
+
+    async def loop():
+        while True:
+            t0 = time.time()
+            results = await run_round(targets, args.samples, args.timeout)
+            print_round(results, args.samples)
+            if args.out:
+                with open(args.out, "a") as f:
+                    for r in results:
+                        f.write(json.dumps(dict(r, ts=t0)) + "\n")
+            if not args.every:
+                return
+            await asyncio.sleep(max(0.0, args.every - (time.time() - t0)))
+
+    try:
+        asyncio.run(loop())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
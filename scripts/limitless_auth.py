@@ -5,11 +5,18 @@ Limitless Exchange Authentication Script
 """
 
 import os
+import sys
+import threading
+import time
 import requests
 from dotenv import load_dotenv
 from eth_account import Account
 from eth_account.messages import encode_defunct
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core import session_cache
+from core.rate_limiter import scheduler, POSITIONS
+
 API_URL = "https://api.limitless.exchange"
 
 def banner(msg): 
@@ -17,7 +24,7 @@ def banner(msg):
 
 def get_signing_message():
     """Fetch signing message from API."""
-    r = requests.get(f"{API_URL}/auth/signing-message", timeout=15)
+    r = scheduler.request("GET", f"{API_URL}/auth/signing-message", POSITIONS, timeout=15)
     r.raise_for_status()
     return r.text
 
@@ -42,24 +49,19 @@ def login(account: str, message: str, signature: str):
     }
     body = {"client": "eoa"}
     s = requests.Session()
-    r = s.post(f"{API_URL}/auth/login", headers=headers, json=body, timeout=30)
+    r = scheduler.request("POST", f"{API_URL}/auth/login", POSITIONS, session=s, headers=headers, json=body, timeout=30)
     banner(f"Login status: {r.status_code}")
     banner(f"Login response: {r.text}")
     return s, r
 
 def verify_auth(session: requests.Session):
     """Verify session cookie."""
-    r = session.get(f"{API_URL}/auth/verify-auth", timeout=15)
+    r = scheduler.request("GET", f"{API_URL}/auth/verify-auth", POSITIONS, session=session, timeout=15)
     banner(f"Verify status: {r.status_code}")
     banner(f"Verify response: {r.text}")
 
-def get_session():
-    """Return an authenticated session object for reuse."""
-    load_dotenv()
-    pk = os.getenv("PRIVATE_KEY")
-    if not pk:
-        raise RuntimeError("PRIVATE_KEY missing in .env")
-
+def _handshake(pk):
+    """Full signing-message / sign / login / verify flow. Returns (session, account)."""
     message = get_signing_message()
     banner(f"Signing message:\n{message}")
 
@@ -68,6 +70,72 @@ def get_session():
 
     session, resp = login(account, message, signature)
     verify_auth(session)
+    return session, account
+
+class AuthSession(requests.Session):
+    """requests.Session that re-logs in on the calling thread shortly before the cookie expires.
+
+    The cookie swap happens under a lock in whichever thread sends the first
+    request past the refresh time, never from a background timer.
+    """
+
+    def __init__(self, account, pk):
+        super().__init__()
+        self.account = account
+        self._pk = pk
+        self.refresh_at = float("inf")
+        self._refresh_lock = threading.Lock()
+
+    def request(self, method, url, *args, **kwargs):
+        if time.time() >= self.refresh_at:
+            with self._refresh_lock:
+                if time.time() >= self.refresh_at:  # another thread may have refreshed meanwhile
+                    self._refresh()
+        return super().request(method, url, *args, **kwargs)
+
+    def _refresh(self):
+        try:
+            fresh, _ = _handshake(self._pk)
+        except Exception as e:
+            banner(f"Session refresh failed: {e}; retrying in 30s")
+            self.refresh_at = time.time() + 30
+            return
+        self.cookies.update(fresh.cookies)
+        banner("Session refreshed")
+        _cache(self)
+
+def _cache(session):
+    """Persist the session cookie with its expiry and set when `session` refreshes next."""
+    cookie, expires_at = session_cache.cookie_from_session(session)
+    if not cookie:
+        return
+    entry = session_cache.save(session.account, cookie=cookie, expires_at=expires_at)
+    session.refresh_at = entry["expires_at"] - session_cache.REFRESH_LEAD
+
+def get_session(use_cache=True):
+    """Return an authenticated session object for reuse.
+
+    A valid cached cookie skips the handshake entirely; otherwise log in and
+    cache the result. Either way the session re-logs in before expiry, on the
+    thread of the first request that needs it (`AuthSession`).
+    """
+    load_dotenv()
+    pk = os.getenv("PRIVATE_KEY")
+    if not pk:
+        raise RuntimeError("PRIVATE_KEY missing in .env")
+
+    account = Account.from_key(pk).address
+    entry = session_cache.load(account) if use_cache else None
+    session = AuthSession(account, pk)
+    if entry and entry.get("cookie"):
+        session.cookies.set(session_cache.COOKIE_NAME, entry["cookie"])
+        banner(f"Reusing cached session for {account} (expires in {int(entry['expires_at'] - time.time())}s)")
+        session.refresh_at = entry["expires_at"] - session_cache.REFRESH_LEAD
+        return session
+
+    fresh, _ = _handshake(pk)
+    session.cookies.update(fresh.cookies)
+    _cache(session)
     return session
 
 def main():
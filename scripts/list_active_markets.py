@@ -1,8 +1,13 @@
 import requests
 import json
 import argparse
+import os
+import sys
 import time
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.rate_limiter import scheduler, SCAN
+
 API_URL = "https://api.limitless.exchange/markets/active"
 
 def list_active_markets(page=1, limit=50, retries=3):
@@ -11,7 +16,7 @@ def list_active_markets(page=1, limit=50, retries=3):
     print(f"[LLMM] Listing active markets: {API_URL} {params}")
     for attempt in range(retries):
         try:
-            r = requests.get(API_URL, params=params, timeout=30)
+            r = scheduler.request("GET", API_URL, SCAN, params=params, timeout=30)
             if r.status_code == 200:
                 data = r.json()
                 markets = data.get("data", [])
@@ -1,10 +1,65 @@
+import asyncio
 import curses
+import logging
+import threading
 import time
 from core.limitless_client import LimitlessApiClient
+from core.models import market_catalog
+from core.position_book import PositionBook
+from core.socket_subs import LimitlessWebSocket
+from core.event_bus import bus, PRICES, POSITIONS
 
 REFRESH_INTERVAL = 5  # seconds
+POSITION_SILENCE = 30  # seconds without WS position/price events before falling back to REST
 
-def draw_dashboard(stdscr, client):
+def start_position_stream(book):
+    """Feed `book` from the WS positions and markets channels on a background thread.
+
+    The markets subscription follows the held positions: it is re-sent whenever
+    the set of markets in the book changes (stream deltas or a REST reseed)."""
+    async def stream():
+        sub = bus.subscribe((PRICES, POSITIONS), name="position_book")
+        ws = LimitlessWebSocket()
+        await ws.connect()
+        await ws.subscribe_positions()
+        subscribed = set()
+
+        async def follow_positions():
+            held = book.markets()
+            if held == subscribed:
+                return
+            try:
+                await ws.subscribe_markets(sorted(held))
+            except Exception as e:
+                logging.warning(f"[LLMM] Market subscription update failed: {e}")
+                return
+            subscribed.clear()
+            subscribed.update(held)
+
+        async def resubscribe_loop():
+            while True:
+                await follow_positions()
+                await asyncio.sleep(REFRESH_INTERVAL)
+
+        asyncio.create_task(ws.heartbeat())
+        asyncio.create_task(ws.pump(bus))
+        asyncio.create_task(resubscribe_loop())
+        async for topic, data in sub:
+            if topic == POSITIONS:
+                book.apply(data)
+                await follow_positions()
+            else:
+                book.on_price(data.get("market"), data.get("prices"))
+
+    def run():
+        try:
+            asyncio.run(stream())
+        except Exception as e:
+            logging.error(f"[LLMM] Position stream stopped: {e}; REST fallback only")
+
+    threading.Thread(target=run, name="position-stream", daemon=True).start()
+
+def draw_dashboard(stdscr, client, book):
     curses.curs_set(0)  # hide cursor
     stdscr.nodelay(True)
 
@@ -19,46 +74,50 @@ def draw_dashboard(stdscr, client):
 
         # --- Current Positions ---
         stdscr.addstr(5, 0, "[Current Positions]")
+        positions = []
         try:
-            positions = client.get_positions()
+            book.resync_if_silent(client.get_positions)
+            positions = book.snapshot()
             if not positions:
                 stdscr.addstr(6, 2, "No open positions.")
             else:
                 for i, p in enumerate(positions, start=6):
-                    market = p.get("market", {}).get("title")
-                    side = p.get("side")
-                    size = p.get("size")
-                    pnl = p.get("pnl")
-                    stdscr.addstr(i, 2, f"{market} | Side: {side} | Size: {size} | PnL: {pnl}")
+                    stdscr.addstr(i, 2, f"{p.title or p.market} | Side: {p.side} | Size: {p.size:g} | PnL: {p.pnl:+.2f}")
+                stdscr.addstr(6 + len(positions), 2,
+                              f"Exposure {book.total_exposure:.2f} | PnL {book.total_pnl:+.2f}"
+                              f"{' (REST fallback)' if book.stale else ''}")
         except Exception as e:
             stdscr.addstr(6, 2, f"Positions unavailable: {e}")
 
         # --- Hourly Markets ---
-        line = 8 + len(positions or [])
-        hourly = client.get_hourly_markets(limit=5)
+        line = 9 + len(positions)
+        hourly = market_catalog.upsert_many(client.get_hourly_markets(limit=5))
         stdscr.addstr(line, 0, "[Hourly Markets]")
         if not hourly:
             stdscr.addstr(line+1, 2, "No hourly markets found.")
         else:
             for i, m in enumerate(hourly, start=line+1):
-                stdscr.addstr(i, 2, f"{m['title']} | Prices: {m.get('prices')} | Exp: {m.get('expirationDate')}")
+                stdscr.addstr(i, 2, f"{m.title} | Prices: {list(m.prices)} | Exp: {m.expiration_date}")
 
         # --- Daily Markets ---
         line = line + len(hourly) + 3
-        daily = client.get_daily_markets(limit=5)
+        daily = market_catalog.upsert_many(client.get_daily_markets(limit=5))
         stdscr.addstr(line, 0, "[Daily Markets]")
         if not daily:
             stdscr.addstr(line+1, 2, "No daily markets found.")
         else:
             for i, m in enumerate(daily, start=line+1):
-                stdscr.addstr(i, 2, f"{m['title']} | Prices: {m.get('prices')} | Exp: {m.get('expirationDate')}")
+                stdscr.addstr(i, 2, f"{m.title} | Prices: {list(m.prices)} | Exp: {m.expiration_date}")
 
         stdscr.refresh()
         time.sleep(REFRESH_INTERVAL)
 
 def main():
     client = LimitlessApiClient()
-    curses.wrapper(draw_dashboard, client)
+    book = PositionBook(silence_after=POSITION_SILENCE)
+    book.seed(client.get_positions())
+    start_position_stream(book)
+    curses.wrapper(draw_dashboard, client, book)
 
 if __name__ == "__main__":
     main()
@@ -6,6 +6,7 @@ Uses the stable authentication from limitless_auth.py
 
 import json
 from limitless_auth import get_session
+from core.rate_limiter import scheduler, SCAN
 
 API_URL = "https://api.limitless.exchange"
 
@@ -13,7 +14,7 @@ def list_markets(session, page=1, limit=20):
     """Fetch active markets with pagination."""
     url = f"{API_URL}/markets/active"
     params = {"page": page, "limit": limit, "sortBy": "newest"}
-    r = session.get(url, params=params, timeout=30)
+    r = scheduler.request("GET", url, SCAN, session=session, params=params, timeout=30)
     print("[LLMM] Markets status:", r.status_code)
     try:
         data = r.json()
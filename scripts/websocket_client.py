@@ -7,10 +7,14 @@ Handles authentication, connection, subscription, and event streaming
 import asyncio
 import json
 import os
+import sys
 from typing import Optional, List
 
 import socketio
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.session_cache import cached_cookie_for_key
+
 class LimitlessWebSocket:
     """
     Streamlined WebSocket client for Limitless Exchange
@@ -19,7 +23,7 @@ class LimitlessWebSocket:
     def __init__(self, websocket_url: str = "wss://ws.limitless.exchange", private_key: Optional[str] = None):
         self.websocket_url = websocket_url
         self.private_key = private_key
-        self.session_cookie = None
+        self.session_cookie = cached_cookie_for_key(private_key)
         self.connected = False
         self.subscribed_markets: List[str] = []
         self.sio = socketio.AsyncClient(logger=False, engineio_logger=False)
@@ -32,6 +36,8 @@ class LimitlessWebSocket:
         async def connect():
             self.connected = True
             print("✅ Connected to /markets")
+            # Re-read on every (re)connect: the REST login may have refreshed it
+            self.session_cookie = cached_cookie_for_key(self.private_key)
             if self.session_cookie:
                 await self.sio.emit('authenticate', f'Bearer {self.session_cookie}', namespace='/markets')
             if self.subscribed_markets:
@@ -75,6 +81,7 @@ class LimitlessWebSocket:
         """Connect to WebSocket"""
         print(f"🔌 Connecting to {self.websocket_url}...")
         connect_options = {'transports': ['websocket']}
+        self.session_cookie = cached_cookie_for_key(self.private_key)
         if self.session_cookie:
             connect_options['headers'] = {'Cookie': f'limitless_session={self.session_cookie}'}
             print("🍪 Adding session cookie to connection headers")